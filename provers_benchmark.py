@@ -1,11 +1,19 @@
 import argparse
 import json
+import os
+import sys
 import time
 
+from src.admission import AdmissionController
 from src.benchmark import Benchmark
+from src import daemon
 from src.config import Config
+from src.daemon import Daemon
+from src.errors import BenchmarkException
+from src.distributed import Coordinator, Worker, parse_address
 from src.log import init_log, get_logger
-from src.statistics.json_encoder import ClassAsDictJSONEncoder
+from src.plan import Plan
+from src.statistics import serializer
 from src.tests import TestInput
 
 
@@ -16,16 +24,85 @@ def parse_args():
                         version="%(prog)s Pre-alpha 0.1",
                         help="Prints current version")
     parser.add_argument("-f", "--file", default="config.toml", help="config file")
+    parser.add_argument("--authkey", default=os.environ.get('PROVERS_BENCHMARK_AUTHKEY'),
+                        help="shared secret of coordinator and workers "
+                             "(default: PROVERS_BENCHMARK_AUTHKEY environment variable)")
+    parser.add_argument("--plan", help="write plan (jobs, identical jobs and estimated times) to this file as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="print plan and exit without running it")
+    parser.add_argument("--history", help="output of previous benchmark for estimates of plan "
+                                          "(default: output_dir from config)")
+    subparsers = parser.add_subparsers(dest="command")
+    coordinator = subparsers.add_parser("coordinator", help="hand out jobs from config to workers")
+    coordinator.add_argument("--listen", default="localhost:7777", help="host:port to listen on")
+    worker = subparsers.add_parser("worker", help="run jobs handed out by coordinator")
+    worker.add_argument("--connect", required=True, help="host:port of coordinator")
+    worker.add_argument("-j", "--jobs", type=int, default=1, help="number of concurrently running jobs")
+    serve = subparsers.add_parser("serve", help="keep configs loaded and run benchmarks submitted over unix socket")
+    serve.add_argument("--socket", default="benchmark.sock", help="unix socket path")
+    serve.add_argument("-j", "--jobs", type=int, default=1, help="number of concurrently running jobs")
+    submit = subparsers.add_parser("submit", help="submit config (-f) to server started with serve")
+    submit.add_argument("--socket", default="benchmark.sock", help="unix socket path")
+    submit.add_argument("--suite", action="append", default=[], help="run only test suite with this name")
+    submit.add_argument("--run", action="append", default=[], help="run only test run with this name")
+    submit.add_argument("--wait", action="store_true", help="wait until benchmark finishes and write its results")
+    submit.add_argument("-o", "--output", help="output file for --wait (default: output_dir from config)")
+    status = subparsers.add_parser("status", help="print status of benchmark submitted to server")
+    status.add_argument("--socket", default="benchmark.sock", help="unix socket path")
+    status.add_argument("id", type=int)
+    results = subparsers.add_parser("results", help="write results of benchmark submitted to server")
+    results.add_argument("--socket", default="benchmark.sock", help="unix socket path")
+    results.add_argument("-o", "--output", help="output file (default: stdout)")
+    results.add_argument("id", type=int)
 
     return parser.parse_args()
 
 
 if __name__ == '__main__':
     args = parse_args()
-    init_log()
+    # dry run does not write anything, not even log
+    init_log(filename=None if args.dry_run else 'benchmark.log')
     logger = get_logger()
 
-    config = Config(config_file=args.file)
+    authkey = args.authkey.encode() if args.authkey else None
+    if args.command is not None and authkey is None:
+        # server and workers run executables of received configs, they are never open with public secret
+        logger.error(f'{args.command} needs secret set with --authkey or PROVERS_BENCHMARK_AUTHKEY')
+        sys.exit(1)
+    if args.command == 'worker':
+        Worker(address=parse_address(args.connect), slots=args.jobs, authkey=authkey).run()
+        sys.exit(0)
+    if args.command == 'serve':
+        Daemon(socket_path=args.socket, workers=args.jobs, authkey=authkey).serve()
+        sys.exit(0)
+    if args.command in ('submit', 'status', 'results'):
+        try:
+            if args.command == 'submit':
+                submission = daemon.submit(args.socket, args.file, test_suites=args.suite, test_runs=args.run,
+                                           authkey=authkey)
+                logger.info(f"Submitted benchmark {submission['id']}")
+                if args.wait:
+                    submission = daemon.wait(args.socket, submission['id'], authkey=authkey)
+                    if submission['state'] == 'failed':
+                        logger.error(f"Benchmark {submission['id']} failed: {submission['error']}")
+                        sys.exit(1)
+                    output = args.output or submission['output_dir']
+                    with open(output, 'wb') as outfile:
+                        logger.info(f'writing results to {output}')
+                        outfile.write(daemon.results(args.socket, submission['id'], authkey=authkey))
+            elif args.command == 'status':
+                print(json.dumps(daemon.status(args.socket, args.id, authkey=authkey), indent=2))
+            elif args.output:
+                with open(args.output, 'wb') as outfile:
+                    outfile.write(daemon.results(args.socket, args.id, authkey=authkey))
+            else:
+                sys.stdout.buffer.write(daemon.results(args.socket, args.id, authkey=authkey))
+                sys.stdout.flush()
+        except BenchmarkException as e:
+            logger.error(e)
+            sys.exit(1)
+        sys.exit(0)
+
+    config = Config(config_file=args.file, read_only=args.dry_run)
     config.load_config()
     inputs = len(config.test_inputs)
     translators = len(TestInput.translators)
@@ -38,12 +115,45 @@ if __name__ == '__main__':
                 f'{test_suites} test suites, '
                 f'{test_cases} test cases')
 
-    start = time.time()
-    benchmark = Benchmark(test_suite=config.test_suites)
     if config.test_case_timeout:
         Benchmark.test_case_timeout = config.test_case_timeout
+    plan = Plan.compile(config.test_suites, config.test_case_timeout_ladder or [Benchmark.test_case_timeout],
+                        history=args.history or config.output_dir)
+    plan.log()
+    if args.plan:
+        logger.info(f'writing plan to {args.plan}')
+        serializer.dump(plan.statistics(), args.plan)
+    if args.dry_run:
+        print(plan.table())
+        sys.exit(0)
+
+    start = time.time()
+    if args.command == 'coordinator':
+        with open(config.config_file) as config_file:
+            config_text = config_file.read()
+        benchmark = Coordinator(test_suite=config.test_suites,
+                                timeout_ladder=config.test_case_timeout_ladder,
+                                time_budget=config.time_budget,
+                                deduplicate=config.deduplicate_inputs,
+                                pruning=config.pruning,
+                                report_interval=config.report_interval,
+                                max_interference_requeues=config.interference_requeues,
+                                plan=plan,
+                                config_text=config_text,
+                                address=parse_address(args.listen),
+                                authkey=authkey)
+    else:
+        benchmark = Benchmark(test_suite=config.test_suites,
+                              timeout_ladder=config.test_case_timeout_ladder,
+                              time_budget=config.time_budget,
+                              deduplicate=config.deduplicate_inputs,
+                              pruning=config.pruning,
+                              report_interval=config.report_interval,
+                              max_interference_requeues=config.interference_requeues,
+                              plan=plan,
+                              admission=AdmissionController(max_workers=config.workers,
+                                                            reserve_memory=config.memory_reserve * 1024 * 1024))
     stats = benchmark.run()
-    with open(config.output_dir, 'w') as outfile:
-        logger.info(f'writing results to {config.output_dir}')
-        json.dump(stats, outfile, indent=2, cls=ClassAsDictJSONEncoder)
+    logger.info(f'writing results to {config.output_dir}')
+    serializer.dump(stats, config.output_dir, config.output_format)
     logger.info(f'Benchmark was running for {time.time() - start:.2f} seconds in total')
@@ -0,0 +1,107 @@
+"""Compare memory and serialization time of statistics records
+
+Slotted records serialized with generated serializers are compared with the same records backed by __dict__
+serialized with previous encoder (which converted __dict__ of every object).
+Usage: python scripts/benchmark_serializer.py [number of test runs]
+"""
+import dataclasses
+import datetime
+import json
+import os
+import sys
+import time
+import tracemalloc
+from enum import Enum
+from inspect import isclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from src.statistics import stats, serializer  # noqa: E402
+from src.statistics.json_encoder import ClassAsDictJSONEncoder  # noqa: E402
+
+
+class LegacyJSONEncoder(json.JSONEncoder):
+    """Encoder used before serializers were generated"""
+
+    def default(self, o):
+        if isinstance(o, Enum):
+            return o.value
+        if hasattr(o, '__dict__'):
+            return self._as_plain_dict(o)
+        return super().default(o)
+
+    def _as_plain_dict(self, o):
+        class_dict = o.__dict__.copy()
+        for key, value in o.__dict__.items():
+            if key.startswith('_') or key.startswith(self.__class__.__name__):
+                class_dict.pop(key)
+                continue
+            if isinstance(value, datetime.datetime):
+                class_dict[key] = value.isoformat()
+            elif isclass(value):
+                class_dict[key] = self._as_plain_dict(value)
+        return class_dict
+
+
+def unslotted(cls):
+    """The same dataclass backed by __dict__"""
+    namespace = {'__annotations__': {f.name: f.type for f in dataclasses.fields(cls)}}
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            namespace[f.name] = f.default
+        elif f.default_factory is not dataclasses.MISSING:
+            namespace[f.name] = dataclasses.field(default_factory=f.default_factory)
+    return dataclasses.dataclass(type(cls.__name__, (), namespace))
+
+
+def build(test_runs: int, slotted: bool):
+    classes = {cls.__name__: cls if slotted else unslotted(cls)
+               for cls in (stats.ExecutionStatistics, stats.MinimalSATStatistics, stats.OutputStatistics,
+                           stats.SpassMetrics, stats.TestRunStatistics)}
+    statistics = stats.Statistics(date=datetime.datetime(2020, 1, 1))
+    suite = stats.TestSuiteStatistics(program_name='SPASS', program_version='3.9')
+    statistics.test_suites.append(suite)
+    for i in range(test_runs):
+        execution = classes['ExecutionStatistics'](execution_time=0.5 + i, peak_memory=1000 + i, disk_reads=3,
+                                                   disk_writes=4, returncode=0, cpu_time=(1.0, 2.0, 0.0, 0.0))
+        output = classes['OutputStatistics'](status=stats.SATStatus.UNSATISFIABLE, stdout='', stderr='')
+        output.metrics = classes['SpassMetrics'](derived=i, backtracked=0, kept=i // 2,
+                                                 total_time=0.1)
+        suite.test_run.append(classes['TestRunStatistics'](
+            name='run', command=['SPASS', f'/inputs/{i}.p'], execution_statistics=execution,
+            minimal_input_statistics=classes['MinimalSATStatistics'](name='inputs', path=f'/inputs/{i}.p',
+                                                                     format='tptp'),
+            output=output, timeout=300))
+    return statistics
+
+
+def measure(test_runs: int, slotted: bool, encoder) -> tuple:
+    tracemalloc.start()
+    statistics = build(test_runs, slotted)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    encoded = json.dumps(statistics, indent=2, cls=encoder)
+    return memory, time.perf_counter() - start, encoded
+
+
+def main():
+    test_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy_memory, legacy_time, legacy = measure(test_runs, slotted=False, encoder=LegacyJSONEncoder)
+    memory, dump_time, encoded = measure(test_runs, slotted=True, encoder=ClassAsDictJSONEncoder)
+    print(f'{test_runs} test runs')
+    print(f'__dict__ records, previous encoder: {legacy_memory / 2 ** 20:8.1f} MiB {legacy_time:8.3f} s')
+    print(f'slotted records, serializers:       {memory / 2 ** 20:8.1f} MiB {dump_time:8.3f} s')
+    print(f'output is identical: {legacy == encoded}')
+    for output_format in serializer.output_formats[1:]:
+        try:
+            statistics = build(test_runs, slotted=True)
+            start = time.perf_counter()
+            serializer.dumps(statistics, output_format)
+            print(f'{output_format}: {time.perf_counter() - start:8.3f} s')
+        except Exception as e:
+            print(f'{output_format}: {e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Callable, Hashable
+
+import psutil
+
+from src.log import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class RunningJob:
+    key: Hashable
+    predicted_memory: int
+    started: float = field(default_factory=time.monotonic)
+    memory: int = 0
+    """last observed peak RSS"""
+    evict: bool = False
+    """set when job was chosen to be killed because of memory pressure"""
+    requeue: bool = False
+    """job was killed while other jobs were running, so it should be run again"""
+
+
+@dataclass
+class AdmissionController:
+    """Decide when next job can be started, so concurrent jobs do not run out of memory
+    Memory needed by job is predicted from peak RSS of finished jobs with the same key.
+    Job is admitted only if available memory minus expected growth of running jobs covers the prediction.
+    Under memory pressure concurrency is lowered, if memory is nearly exhausted the youngest job is killed
+    and should be requeued by caller.
+    """
+    max_workers: int = 1
+    reserve_memory: int = 256 * 1024 * 1024
+    """memory that should always stay available"""
+    kill_threshold: int = 100 * 1024 * 1024
+    """kill youngest job if available memory drops below this value"""
+    history: Dict[Hashable, int] = field(default_factory=dict)
+    """Dict[job key, highest peak RSS]"""
+
+    def __post_init__(self):
+        self.slots = self.max_workers
+        self._running: Dict[int, RunningJob] = {}
+        self._tickets = itertools.count()
+        self._lock = threading.Lock()
+        self._last_slot_change = time.monotonic()
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def predict(self, key: Hashable) -> int:
+        """Predicted peak RSS of job, jobs with unknown key are assumed to need as much as the largest job so far"""
+        if key in self.history:
+            return self.history[key]
+        return max(self.history.values(), default=0)
+
+    def admit(self, key: Hashable) -> Optional[int]:
+        """:return: ticket for job if it can be started now, None otherwise"""
+        with self._lock:
+            if len(self._running) >= self.slots:
+                return None
+            predicted = self.predict(key)
+            if self._running:
+                growth = sum(max(0, job.predicted_memory - job.memory) for job in self._running.values())
+                headroom = psutil.virtual_memory().available - growth - self.reserve_memory
+                if headroom < predicted:
+                    return None
+            ticket = next(self._tickets)
+            self._running[ticket] = RunningJob(key=key, predicted_memory=predicted)
+            return ticket
+
+    def guard(self, ticket: int) -> Callable[[MonitoredProcess], bool]:
+        """:return: callback for polling loop of job, it records RSS of job and returns True if job should be killed"""
+        job = self._running[ticket]
+
+        def memory_guard(proc: MonitoredProcess) -> bool:
+            job.memory = proc.get_statistics().peak_memory or 0
+            return job.evict
+
+        return memory_guard
+
+    def check_pressure(self) -> None:
+        """Lower concurrency (or evict youngest job) when memory is low, restore it when pressure is gone"""
+        available = psutil.virtual_memory().available
+        now = time.monotonic()
+        with self._lock:
+            # wait until previously evicted job releases its memory
+            if available < self.kill_threshold and self._running \
+                    and not any(job.evict for job in self._running.values()):
+                victim = max(self._running.values(), key=lambda job: job.started)
+                victim.evict = True
+                # job that ran alone would run out of memory again
+                victim.requeue = len(self._running) > 1
+                logger.warning(f'Available memory {available // 2 ** 20}MB, killing youngest job {victim.key}')
+            if available < self.reserve_memory:
+                slots = max(1, len(self._running) - 1)
+                if slots < self.slots:
+                    logger.info(f'Memory pressure, lowering concurrency to {slots}')
+                    self.slots = slots
+                    self._last_slot_change = now
+            elif self.slots < self.max_workers and available > 2 * self.reserve_memory \
+                    and now - self._last_slot_change > 1:
+                self.slots += 1
+                self._last_slot_change = now
+
+    def finish(self, ticket: int, peak_memory: Optional[int]) -> bool:
+        """Release ticket
+        :return: True if job was killed by controller and should be requeued
+        """
+        with self._lock:
+            job = self._running.pop(ticket)
+            if peak_memory is not None:
+                self.history[job.key] = max(self.history.get(job.key, 0), peak_memory)
+            return job.requeue
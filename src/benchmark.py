@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, ClassVar
+import copy
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass, field
+from queue import Queue, Empty
+from threading import Thread
+from typing import List, ClassVar, Optional, NoReturn, Dict, Tuple
 
+from src.admission import AdmissionController
 from src.log import get_logger
-from src.statistics.stats import Statistics, SATStatus
+from src.plan import Plan
+from src.pruning import Pruning
+from src.statistics.aggregates import Aggregator
+from src.statistics.stats import Statistics, SATStatus, TestSuiteStatistics, TestRunStatistics
 
 logger = get_logger()
 
@@ -12,13 +21,86 @@ logger = get_logger()
 @dataclass
 class Benchmark:
     test_suite: List[TestSuite]
+    timeout_ladder: List[int] = field(default_factory=list)
+    """increasing timeouts, only jobs that timed out are rerun with next timeout"""
+    time_budget: Optional[float] = None
+    """wall clock limit (seconds) for whole benchmark"""
+    workers: int = 1
+    """maximal number of concurrently running jobs"""
+    admission: AdmissionController = None
+    max_memory_requeues: int = 3
+    """how many times job killed to free memory is run again before it is recorded as out of memory"""
+    max_interference_requeues: int = 0
+    """how many times job disturbed by other load is run again before its result is recorded"""
+    deduplicate: bool = False
+    """run equivalent inputs once (per test run) and reuse the result for the others"""
+    pruning: Pruning = None
+    """skip larger instances of problem families after smaller ones timed out"""
+    report_interval: Optional[float] = 60
+    """how often (seconds) aggregates of results are logged, None logs them only at the end"""
+    plan: Plan = None
+    """compiled plan of test suites, it is compiled by run if not set"""
     test_case_timeout: ClassVar[int] = 300
 
+    def __post_init__(self):
+        if self.admission is None:
+            self.admission = AdmissionController(max_workers=self.workers)
+
     def run(self) -> Statistics:
         statistics = Statistics()
+        plan = self.plan or Plan.compile(self.test_suite, self.timeout_ladder or [Benchmark.test_case_timeout])
+        statistics.plan = plan.statistics(with_jobs=False)
+        jobs = plan.jobs
+        results = [None for _ in jobs]
+        self._aliases = plan.aliases
+        duplicates = dict(plan.aliases)
+        if self.deduplicate:
+            equivalent, statistics.duplicates = self._duplicates(jobs, plan.aliases)
+            duplicates.update(equivalent)
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        if self.pruning is not None:
+            self.pruning.reset()
+        self.aggregator = Aggregator(report_interval=self.report_interval)
+        try:
+            self._run_stages(jobs, results, deadline, duplicates)
+        except KeyboardInterrupt:
+            logger.info("Keyboard interrupt")
+        statistics.aggregates = self.aggregator.statistics()
+        self.aggregator.report()
+        for sweep in self._sweeps(jobs):
+            sweep.evaluate([result for job, result in zip(jobs, results)
+                            if result is not None and job.test_run.sweep is sweep])
+            statistics.sweeps[sweep.name] = sweep.configurations
+
+        for test_input in self._sampled_inputs(jobs):
+            statistics.samples[test_input.name] = test_input.sample.statistics(
+                [(job.test_suite.executable, result) for job, result in zip(jobs, results)
+                 if result is not None and job.test_input is test_input])
+
+        if self.pruning is not None:
+            statistics.pruning = self.pruning.statistics()
+            logger.info(f'Pruning skipped {statistics.pruning.pruned_runs} runs, '
+                        f'saved up to {statistics.pruning.saved_time:.0f} seconds')
+
+        for test_input in self._family_inputs(jobs):
+            statistics.scaling.extend(test_input.family.statistics(
+                test_input.name, [(job.test_suite.executable, result) for job, result in zip(jobs, results)
+                                  if result is not None and job.test_input is test_input]))
+
+        suites_statistics = {}
         for test_suite in self.test_suite:
-            test_suite_stats = test_suite.run()
-            statistics.test_suites.extend(test_suite_stats)
+            suites_statistics[id(test_suite)] = TestSuiteStatistics(program_name=test_suite.executable,
+                                                                    program_version=test_suite.version)
+            statistics.test_suites.append(suites_statistics[id(test_suite)])
+        for job, result in zip(jobs, results):
+            if result is not None:
+                if job.translator is not None:
+                    # jobs may run on remote workers, translations are done by this process before jobs run
+                    result.minimal_input_statistics.translation = job.test_input.translation(job.test_run.format,
+                                                                                             job.original_path)
+                suites_statistics[id(job.test_suite)].test_run.append(result)
+        for test_input in self._translated_inputs(jobs):
+            statistics.translations.extend(test_input.translation_throughput())
 
         unsat = 0
         sat = 0
@@ -38,3 +120,253 @@ class Benchmark:
                     f'{different} ended with different status')
 
         return statistics
+
+    @staticmethod
+    def _duplicates(jobs: List[Job], aliases: Dict[int, int]) -> Tuple[Dict[int, int], List[List[str]]]:
+        """Find jobs of the same test run with equivalent inputs, aliases (jobs identical to other jobs) are skipped
+        :return: Dict[job index, index of first equivalent job] and groups of equivalent input files
+        """
+        first = {}
+        duplicates = {}
+        groups = {}
+        for index, job in enumerate(jobs):
+            if index in aliases:
+                continue
+            canonical_hash = job.test_input.canonical_hash(job.original_path)
+            group = groups.setdefault(canonical_hash, [])
+            if job.original_path not in group:
+                group.append(job.original_path)
+            key = id(job.test_suite), id(job.test_run), canonical_hash
+            if key in first:
+                duplicates[index] = first[key]
+            else:
+                first[key] = index
+        groups = [group for group in groups.values() if len(group) > 1]
+        if groups:
+            logger.info(f'{sum(len(group) - 1 for group in groups)} inputs are equivalent to other inputs, '
+                        f'{len(duplicates)} of {len(jobs)} jobs will reuse results')
+        return duplicates, groups
+
+    def _store(self, jobs: List[Job], results: List[Optional[TestRunStatistics]], index: int,
+               result: TestRunStatistics):
+        """Write result of job to results and aggregates"""
+        job = jobs[index]
+        self.aggregator.replace(job.test_suite.name, job.test_run.name, results[index], result)
+        results[index] = result
+
+    def _fan_out(self, jobs: List[Job], results: List[Optional[TestRunStatistics]], duplicates: Dict[int, int]):
+        """Copy results of jobs to identical jobs (aliases) and to jobs with equivalent inputs"""
+        # originals precede their duplicates, so duplicate of duplicate gets result after it
+        for index, original in sorted(duplicates.items()):
+            if results[index] is not None or results[original] is None:
+                continue
+            job = jobs[index]
+            result = copy.deepcopy(results[original])
+            result.minimal_input_statistics, result.input_statistics = job.test_input.get_file_statistics(
+                file_path=job.original_path)
+            result.minimal_input_statistics.translated_with = job.translator
+            if index in self._aliases:
+                result.name = job.test_run.name
+                result.command = job.test_run.build_command(executable=job.test_suite.executable,
+                                                            input_filepath=job.input_path,
+                                                            suite_options=job.test_suite.options)
+                result.alias_of = f'{jobs[original].test_suite.name}/{jobs[original].test_run.name}'
+            else:
+                result.duplicate_of = jobs[original].original_path
+            self._store(jobs, results, index, result)
+
+    @staticmethod
+    def _translated_inputs(jobs: List[Job]) -> List[TestInput]:
+        test_inputs = []
+        for job in jobs:
+            if job.translator is not None and all(job.test_input is not test_input for test_input in test_inputs):
+                test_inputs.append(job.test_input)
+        return test_inputs
+
+    @staticmethod
+    def _family_inputs(jobs: List[Job]) -> List[TestInput]:
+        test_inputs = []
+        for job in jobs:
+            if job.test_input.family is not None and all(job.test_input is not test_input
+                                                         for test_input in test_inputs):
+                test_inputs.append(job.test_input)
+        return test_inputs
+
+    @staticmethod
+    def _sampled_inputs(jobs: List[Job]) -> List[TestInput]:
+        test_inputs = []
+        for job in jobs:
+            if job.test_input.sample is not None and all(job.test_input is not test_input
+                                                         for test_input in test_inputs):
+                test_inputs.append(job.test_input)
+        return test_inputs
+
+    @staticmethod
+    def _sweeps(jobs: List[Job]) -> List[Sweep]:
+        sweeps = []
+        for job in jobs:
+            if job.test_run.sweep is not None and all(job.test_run.sweep is not sweep for sweep in sweeps):
+                sweeps.append(job.test_run.sweep)
+        return sweeps
+
+    def _run_stages(self, jobs: List[Job], results: List[Optional[TestRunStatistics]],
+                    deadline: Optional[float], duplicates: Dict[int, int] = None) -> NoReturn:
+        """Run jobs in successive halving rounds of sweeps, other jobs run in first round
+        after every round only the best configurations of every sweep continue
+        duplicates (Dict[job index, index of equivalent job]) are not run, they get result of the equivalent job
+        """
+        duplicates = duplicates or {}
+        for sweep in self._sweeps(jobs):
+            sweep.reset()
+        positions = defaultdict(int)
+        stages = []
+        for job in jobs:
+            sweep = job.test_run.sweep
+            stages.append(0 if sweep is None else sweep.stage(positions[id(job.test_run)]))
+            positions[id(job.test_run)] += 1
+
+        pruned = set()
+        for stage in range(max(stages, default=-1) + 1):
+            pending = [index for index, job in enumerate(jobs)
+                       if stages[index] == stage and (id(job.test_run.sweep), job.test_run.name) not in pruned
+                       and index not in duplicates]
+            self._run_jobs(jobs, pending, results, deadline)
+            self._fan_out(jobs, results, duplicates)
+            if stage == max(stages):
+                break
+            for sweep in self._sweeps(jobs):
+                sweep_results = [result for job, result in zip(jobs, results)
+                                 if result is not None and job.test_run.sweep is sweep]
+                for name in sweep.prune(sweep_results):
+                    logger.info(f"Sweep '{sweep.name}': pruning configuration '{name}' after round {stage}")
+                    pruned.add((id(sweep), name))
+
+    def _run_jobs(self, jobs: List[Job], pending: List[int], results: List[Optional[TestRunStatistics]],
+                  deadline: Optional[float]) -> NoReturn:
+        """Run jobs[pending] with every timeout from ladder, next step reruns only jobs that timed out
+        result of last run of every job is written to results, results of jobs that were never run stay None
+        """
+        ladder = self.timeout_ladder or [Benchmark.test_case_timeout]
+        for tier, tier_timeout in enumerate(ladder):
+            if not pending or deadline is not None and time.monotonic() >= deadline:
+                break
+            logger.info(f'Running {len(pending)} jobs with timeout {tier_timeout}s (tier {tier})')
+            pending = self._run_tier(jobs, pending, results, tier, tier_timeout, min(ladder), deadline)
+
+    def _run_tier(self, jobs: List[Job], pending: List[int], results: List[Optional[TestRunStatistics]], tier: int,
+                  tier_timeout: float, min_timeout: float, deadline: Optional[float]) -> List[int]:
+        """Run jobs[pending] concurrently as admission controller allows, results are written to results list
+        jobs killed by admission controller are requeued
+        :return: indexes of jobs that timed out or were pruned
+        """
+        if self.pruning is not None:
+            pending = self.pruning.order(jobs, pending)
+        queue = deque(pending)
+        finished = Queue()
+        memory_requeues = defaultdict(int)
+        interference_requeues = defaultdict(int)
+        timed_out = []
+        running = 0
+        budget_exhausted = False
+
+        def run_job(index: int, ticket: int, timeout: float):
+            try:
+                result = jobs[index].run(timeout=timeout, memory_guard=self.admission.guard(ticket))
+            except Exception as e:
+                # other jobs keep running, job gets error result
+                logger.exception(f'Job {jobs[index].key} {jobs[index].original_path} failed: {e!r}')
+                finished.put((index, ticket, failed_result(jobs[index], timeout, e)))
+            except BaseException as e:
+                finished.put((index, ticket, e))
+            else:
+                finished.put((index, ticket, result))
+
+        while running or queue and not budget_exhausted:
+            self.admission.check_pressure()
+            while queue and not budget_exhausted:
+                timeout = self._budgeted_timeout(tier_timeout, min_timeout, deadline,
+                                                 len(queue) + running, self.admission.slots)
+                if timeout is None:
+                    logger.warning(f'Time budget exhausted, {len(queue)} jobs were not run with timeout '
+                                   f'{tier_timeout}s')
+                    budget_exhausted = True
+                    break
+                pruned = self._prune(jobs, queue[0], tier, timeout)
+                if pruned is not None:
+                    self._store(jobs, results, queue[0], pruned)
+                    timed_out.append(queue.popleft())
+                    continue
+                ticket = self.admission.admit(jobs[queue[0]].key)
+                if ticket is None:
+                    break
+                thread = Thread(target=run_job, args=(queue.popleft(), ticket, timeout))
+                thread.daemon = True
+                thread.start()
+                running += 1
+
+            try:
+                index, ticket, result = finished.get(timeout=0.1)
+            except Empty:
+                continue
+            running -= 1
+            if result is None or isinstance(result, BaseException):
+                self.admission.finish(ticket, peak_memory=None)
+                if result is None:
+                    continue
+                raise result
+            requeue = self.admission.finish(ticket, peak_memory=result.execution_statistics.peak_memory)
+            if requeue and memory_requeues[index] < self.max_memory_requeues:
+                memory_requeues[index] += 1
+                logger.info(f'Requeuing job {jobs[index].key} {jobs[index].original_path} killed to free memory')
+                queue.appendleft(index)
+                continue
+            if result.interference and interference_requeues[index] < self.max_interference_requeues:
+                interference_requeues[index] += 1
+                logger.info(f'Requeuing job {jobs[index].key} {jobs[index].original_path} disturbed by '
+                            f'{", ".join(result.interference)}')
+                # run it after the other jobs, so the load may go away
+                queue.append(index)
+                continue
+            result.timeout_tier = tier
+            result.memory_requeues = memory_requeues[index]
+            result.interference_requeues = interference_requeues[index]
+            self._store(jobs, results, index, result)
+            if self.pruning is not None:
+                self.pruning.record(index, result)
+            if result.output.status == SATStatus.TIMEOUT:
+                timed_out.append(index)
+        return timed_out
+
+    def _prune(self, jobs: List[Job], index: int, tier: int, timeout: float) -> Optional[TestRunStatistics]:
+        """:return: result of job if it is pruned"""
+        if self.pruning is None:
+            return None
+        result = self.pruning.prune(jobs, index, timeout)
+        if result is not None:
+            result.timeout_tier = tier
+            logger.info(f'Pruned job {jobs[index].key} {jobs[index].original_path}')
+        return result
+
+    @staticmethod
+    def _budgeted_timeout(tier_timeout: float, min_timeout: float, deadline: Optional[float],
+                          jobs_left: int, workers: int) -> Optional[float]:
+        """Timeout for next job, remaining time budget of all workers is shared equally by jobs left in tier,
+        but job gets at least the smallest timeout of the ladder (jobs that finish early give time back)
+        :return: None if budget is exhausted
+        """
+        if deadline is None:
+            return tier_timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        share = max(remaining * workers / jobs_left, min_timeout)
+        return min(tier_timeout, share, remaining)
+
+
+def failed_result(job: Job, timeout: float, error: Exception) -> Optional[TestRunStatistics]:
+    """Error result of job that raised error, None if even that can not be made"""
+    try:
+        return job.failed(timeout, f'{type(error).__name__}: {error}')
+    except Exception as e:
+        logger.warning(f'Error result of job {job.key} {job.original_path} could not be made: {e!r}')
+        return None
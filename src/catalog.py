@@ -0,0 +1,241 @@
+"""Index of input files, so config loading does not glob and stat every input file
+
+Catalog stores every scanned directory with its modification time, subdirectories and files (size, modification
+time and lazily computed content hash). On next run only directories with changed modification time are read again.
+Note that modifying file in place does not change modification time of its directory, such file keeps old size
+until its directory changes (content hash is always checked against file modification time).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterator, Pattern, NoReturn, ClassVar
+
+from src import input_files
+from src.log import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class DirectoryEntry:
+    mtime: int
+    subdirectories: List[str] = field(default_factory=list)
+    files: Dict[str, list] = field(default_factory=dict)
+    """Dict[file name, [size, mtime, content hash or None]]"""
+
+
+@dataclass
+class InputCatalog:
+    path: str
+    """file catalog is persisted to"""
+    directories: Dict[str, DirectoryEntry] = field(default_factory=dict)
+    archives: Dict[str, list] = field(default_factory=dict)
+    """Dict[archive path, [size, mtime, member names]]"""
+
+    version: ClassVar[int] = 2
+
+    def __post_init__(self):
+        self.rescanned = 0
+        self._checked = {}
+        """Dict[directory, depth] checked during this run"""
+        self._changed = False
+        self._lock = threading.RLock()
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as fp:
+                    catalog = json.load(fp)
+                if catalog.get('version') == InputCatalog.version:
+                    self.directories = {directory: DirectoryEntry(**entry)
+                                        for directory, entry in catalog['directories'].items()}
+                    self.archives = catalog['archives']
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f'Input catalog {self.path} is corrupted, it will be rebuilt: {e}')
+
+    def refresh(self) -> NoReturn:
+        """Check modification times of directories again on next match (catalog is kept by long running process)"""
+        with self._lock:
+            self._checked.clear()
+
+    def save(self) -> NoReturn:
+        """Write catalog to file if it changed"""
+        with self._lock:
+            if not self._changed:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as fp:
+                json.dump({'version': InputCatalog.version,
+                           'directories': {directory: entry.__dict__ for directory, entry in self.directories.items()},
+                           'archives': self.archives},
+                          fp)
+            os.replace(tmp_path, self.path)
+            self._changed = False
+
+    def match(self, directory: str, pattern: str) -> List[str]:
+        """Like glob.glob(os.path.join(directory, pattern), recursive=True), but only files are returned (sorted)
+        'archive_pattern:member_pattern' matches files in archives, they are returned in archive order
+        """
+        archive_pattern, member_pattern = input_files.split_member(pattern)
+        if member_pattern is not None:
+            regex = _translate(member_pattern)
+            return [f'{archive}{input_files.ARCHIVE_SEPARATOR}{member}'
+                    for archive in self.match(directory, archive_pattern)
+                    for member in self.archive_members(archive) if regex.fullmatch(member)]
+
+        parts = pattern.replace(os.sep, '/').split('/')
+        static = []
+        while parts and not _has_magic(parts[0]):
+            static.append(parts.pop(0))
+        base = os.path.normpath(os.path.join(directory, *static))
+        if not parts:
+            # pattern without wildcards
+            parent, name = os.path.split(base)
+            with self._lock:
+                self._scan(parent, depth=0)
+                entry = self.directories.get(parent)
+            return [base] if entry is not None and name in entry.files else []
+
+        depth = None if '**' in parts else len(parts) - 1
+        regex = _translate('/'.join(parts))
+        with self._lock:
+            self._scan(base, depth)
+            return sorted(os.path.join(base, relative) for relative in self._walk(base, depth)
+                          if regex.fullmatch(relative))
+
+    def archive_members(self, archive: str) -> List[str]:
+        """Files in archive, list is read again only if archive changed"""
+        stat = os.stat(archive)
+        with self._lock:
+            entry = self.archives.get(archive)
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                return entry[2]
+        members = input_files.list_members(archive)
+        with self._lock:
+            self.archives[archive] = [stat.st_size, stat.st_mtime_ns, members]
+            self._changed = True
+        return members
+
+    def size(self, file_path: str) -> Optional[int]:
+        entry = self._file_entry(file_path)
+        return None if entry is None else entry[0]
+
+    def content_hash(self, file_path: str) -> str:
+        """Hash of file content, it is computed once and stored in catalog"""
+        file_path = os.path.normpath(os.path.abspath(file_path))
+        stat = os.stat(file_path)
+        with self._lock:
+            entry = self._file_entry(file_path)
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns and entry[2]:
+                return entry[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        with self._lock:
+            entry = self._file_entry(file_path)
+            if entry is not None:
+                entry[:] = [stat.st_size, stat.st_mtime_ns, content_hash]
+                self._changed = True
+        return content_hash
+
+    def _file_entry(self, file_path: str) -> Optional[list]:
+        directory, name = os.path.split(os.path.normpath(os.path.abspath(file_path)))
+        entry = self.directories.get(directory)
+        return None if entry is None else entry.files.get(name)
+
+    def _scan(self, directory: str, depth: Optional[int]) -> NoReturn:
+        """Read directory (and its subdirectories up to depth, None for all) if its modification time changed"""
+        checked = self._checked.get(directory, -1)
+        if checked is None or depth is not None and checked >= depth:
+            return
+        self._checked[directory] = depth
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            if self.directories.pop(directory, None) is not None:
+                self._changed = True
+            return
+
+        entry = self.directories.get(directory)
+        if entry is None or entry.mtime != mtime:
+            old_files = {} if entry is None else entry.files
+            entry = DirectoryEntry(mtime=mtime)
+            with os.scandir(directory) as directory_entries:
+                for directory_entry in directory_entries:
+                    if directory_entry.is_dir():
+                        entry.subdirectories.append(directory_entry.name)
+                    elif directory_entry.is_file():
+                        stat = directory_entry.stat()
+                        old = old_files.get(directory_entry.name)
+                        content_hash = old[2] if old and old[0] == stat.st_size and old[1] == stat.st_mtime_ns \
+                            else None
+                        entry.files[directory_entry.name] = [stat.st_size, stat.st_mtime_ns, content_hash]
+            entry.subdirectories.sort()
+            self.directories[directory] = entry
+            self.rescanned += 1
+            self._changed = True
+
+        if depth is None or depth > 0:
+            for subdirectory in entry.subdirectories:
+                self._scan(os.path.join(directory, subdirectory), None if depth is None else depth - 1)
+
+    def _walk(self, directory: str, depth: Optional[int], prefix: str = '') -> Iterator[str]:
+        """Relative paths of files in catalog under directory"""
+        entry = self.directories.get(directory)
+        if entry is None:
+            return
+        for name in entry.files:
+            yield prefix + name
+        if depth is None or depth > 0:
+            for subdirectory in entry.subdirectories:
+                yield from self._walk(os.path.join(directory, subdirectory), None if depth is None else depth - 1,
+                                      prefix + subdirectory + '/')
+
+
+def _has_magic(part: str) -> bool:
+    return any(char in part for char in '*?[')
+
+
+def _translate(pattern: str) -> Pattern:
+    """Translate glob pattern with '/' separators to regex, '**' matches any number of directories,
+    wildcards do not match hidden files (as in glob)
+    """
+    regex = ''
+    parts = pattern.split('/')
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == '**':
+            regex += '(?!\\.)(?:[^/]*/(?!\\.))*[^/]*' if last else '(?:(?!\\.)[^/]+/)*'
+            continue
+        if part and part[0] in '*?[':
+            regex += '(?!\\.)'
+        i = 0
+        while i < len(part):
+            char = part[i]
+            i += 1
+            if char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif char == '[':
+                end = part.find(']', i + 1 if i < len(part) and part[i] in '!]' else i)
+                if end == -1:
+                    regex += '\\['
+                    continue
+                characters = part[i:end].replace('\\', '\\\\')
+                if characters.startswith('!'):
+                    characters = '^' + characters[1:]
+                regex += f'[{characters}]'
+                i = end + 1
+            else:
+                regex += re.escape(char)
+        if not last:
+            regex += '/'
+    return re.compile(regex)
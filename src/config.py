@@ -1,18 +1,37 @@
 import copy
-import glob
+import importlib
+import importlib.util
 import logging
 import os
+import re
 from dataclasses import dataclass, field
 from pprint import pprint
-from typing import List, Dict, Type, NoReturn
+from typing import List, Dict, Type, NoReturn, Optional
 
 import toml
 
+from src import page_cache
+from src.catalog import InputCatalog
 from src.errors import ConfigException, BenchmarkException
-from src.tests import TestRun, TestSuite, TestInput
+from src.parsers.parsers import get_registry, get_output_parser, RuleOutputParser, OutputRule, Formats
+from src.parsers.statistics_parsers.tptp_parser import TPTPParser
+from src.pruning import Pruning
+from src.scratch import Scratch
+from src.statistics import serializer
+from src.statistics.machine_state import Interference
+from src.statistics.perf_counters import PerfStat
+from src.statistics.stats import SATStatus
+from src.tests import TestRun, TestSuite, TestInput, Sweep, Sample, ProblemFamily
 from src.translators import Translator
 
 
+def _status(status: str) -> SATStatus:
+    try:
+        return SATStatus(status.lower())
+    except ValueError:
+        raise BenchmarkException(f"status {status} should be one of {[status.value for status in SATStatus]}")
+
+
 @dataclass
 class DictPoper:
     """Convenience class for removing items from dictionary
@@ -55,7 +74,12 @@ class DictPoper:
             message = f"Missing required key: '{variable}'"
             self._error(message)
 
-        if value is not None and type_check is not None and type(value) != type_check:
+        # toml returns whole numbers as int, e.g. interval = 1
+        if type_check == float and type(value) == int:
+            value = float(value)
+        # toml returns inline tables as subclass of dict
+        if value is not None and type_check is not None and type(value) != type_check \
+                and not (type_check == dict and isinstance(value, dict)):
             ok = False
             message = f"'{variable}'"
             f" should be {type_check.__name__},"
@@ -94,6 +118,17 @@ class Config:
     test_suites: List[TestSuite] = field(default_factory=list)
     test_inputs: List[TestInput] = field(default_factory=list)
     test_case_timeout: int = None
+    test_case_timeout_ladder: List[int] = field(default_factory=list)
+    time_budget: int = None
+    workers: int = 1
+    memory_reserve: int = 256
+    deduplicate_inputs: bool = False
+    output_format: str = 'json'
+    pruning: Optional[Pruning] = None
+    report_interval: Optional[float] = 60
+    interference_requeues: int = 0
+    read_only: bool = False
+    """nothing is written while config is loaded (input catalog is not saved), e.g. for dry run"""
 
     _load_errors_occured: bool = False
     _logger: logging.Logger = logging.getLogger('BenchmarkConfig')
@@ -101,19 +136,25 @@ class Config:
     def __post_init__(self):
         self._logger.setLevel(logging.DEBUG)
 
-    def load_config(self) -> NoReturn:
-        """Load and config"""
+    def load_config(self, config_text: str = None) -> NoReturn:
+        """Load and config
+        config is read from config_text if specified (config_file is used only for logging), otherwise from file
+        """
         self._load_errors_occured = False
-        if not os.path.isfile(self.config_file):
+        if config_text is not None:
+            benchmark_config = toml.loads(config_text)
+        elif not os.path.isfile(self.config_file):
             raise BenchmarkException(f"Config file '{self.config_file}'' is not found/not a file")
-
-        benchmark_config = toml.load(self.config_file)
+        else:
+            benchmark_config = toml.load(self.config_file)
 
         with DictPoper(benchmark_config, self._logger, self.config_file) as poper:
             general_config, _ = poper.pop_key('general', required=True, type_check=dict)
             self._load_general(general_config)
             translators_config, _ = poper.pop_key('translators', required=False, type_check=list)
             self._load_translators(translators_config)
+            solvers_config, _ = poper.pop_key('solvers', required=False, type_check=list)
+            self._load_solvers(solvers_config)
             test_inputs_config, _ = poper.pop_key('testInputs', required=True, type_check=list)
             self._load_test_inputs(test_inputs_config)
             test_suites_config, _ = poper.pop_key('testSuites', required=True, type_check=list)
@@ -137,8 +178,228 @@ class Config:
                                                       default=None,
                                                       required=False,
                                                       type_check=int)
+
+            self.test_case_timeout_ladder, ok = poper.pop_key(variable="test_case_timeout_ladder",
+                                                              default=[],
+                                                              required=False,
+                                                              type_check=list)
+            if ok and (any(type(timeout) != int or timeout <= 0 for timeout in self.test_case_timeout_ladder)
+                       or self.test_case_timeout_ladder != sorted(set(self.test_case_timeout_ladder))):
+                self._error(f"test_case_timeout_ladder should be list of increasing positive integers, "
+                            f"in {poper.log_context}")
+
+            self.time_budget, _ = poper.pop_key(variable="time_budget",
+                                                default=None,
+                                                required=False,
+                                                type_check=int)
+
+            self.workers, ok = poper.pop_key(variable="workers",
+                                             default=self.workers,
+                                             required=False,
+                                             type_check=int)
+            if ok and self.workers < 1:
+                self._error(f"workers should be positive, in {poper.log_context}")
+
+            self.memory_reserve, _ = poper.pop_key(variable="memory_reserve",
+                                                   default=self.memory_reserve,
+                                                   required=False,
+                                                   type_check=int)
+
+            self.deduplicate_inputs, _ = poper.pop_key(variable="deduplicate_inputs",
+                                                       default=False,
+                                                       required=False,
+                                                       type_check=bool)
+
+            self.output_format, _ = poper.pop_key(variable="output_format",
+                                                  default=self.output_format,
+                                                  required=False,
+                                                  type_check=str)
+            if self.output_format not in serializer.output_formats:
+                self._error(f"output_format should be one of {serializer.output_formats}, in {poper.log_context}")
+            elif self.output_format != 'json' and importlib.util.find_spec(self.output_format) is None:
+                self._error(f"{self.output_format} package is required for output_format {self.output_format}, "
+                            f"in {poper.log_context}")
+
+            resource_sampling, _ = poper.pop_key(variable="resource_sampling",
+                                                 default=None,
+                                                 required=False,
+                                                 type_check=dict)
+            perf_counters, _ = poper.pop_key(variable="perf_counters",
+                                             default=None,
+                                             required=False,
+                                             type_check=str)
+            TestRun.perf_stat = None
+            if perf_counters is not None:
+                if perf_counters not in PerfStat.modes:
+                    self._error(f"perf_counters should be one of {PerfStat.modes}, in {poper.log_context}")
+                else:
+                    TestRun.perf_stat = PerfStat(mode=perf_counters)
+                    if not TestRun.perf_stat.available:
+                        self._logger.warning("perf stat is not available, runs will not have performance counters")
+
+            pruning_config, _ = poper.pop_key(variable="pruning",
+                                              default=None,
+                                              required=False,
+                                              type_check=dict)
+            self.pruning = None if pruning_config is None else self._load_pruning(pruning_config)
+
+            self.report_interval, _ = poper.pop_key(variable="report_interval",
+                                                    default=self.report_interval,
+                                                    required=False,
+                                                    type_check=int)
+            if self.report_interval is not None and self.report_interval <= 0:
+                self._error(f"report_interval should be positive, in {poper.log_context}")
+
+            TestRun.page_cache, _ = poper.pop_key(variable="page_cache",
+                                                  default=None,
+                                                  required=False,
+                                                  type_check=str)
+            if TestRun.page_cache is not None and TestRun.page_cache not in page_cache.modes:
+                self._error(f"page_cache should be one of {page_cache.modes}, in {poper.log_context}")
+
+            scratch_config, _ = poper.pop_key(variable="scratch",
+                                              default=None,
+                                              required=False,
+                                              type_check=dict)
+            TestRun.scratch = None
+            if scratch_config is not None:
+                self._load_scratch(scratch_config)
+
+            interference_config, _ = poper.pop_key(variable="interference",
+                                                   default=None,
+                                                   required=False,
+                                                   type_check=dict)
+            TestRun.interference = None
+            self.interference_requeues = 0
+            if interference_config is not None:
+                self._load_interference(interference_config)
+
+            TestRun.resource_sampling_interval = None
+            if resource_sampling is not None:
+                self._load_resource_sampling(resource_sampling)
+
+            tptp_root, ok = poper.pop_key(variable="tptp_root",
+                                          default=None,
+                                          required=False,
+                                          type_check=str)
+            if tptp_root is not None:
+                if not os.path.isdir(tptp_root):
+                    self._error(f"tptp_root {tptp_root} is not a directory, in {poper.log_context}")
+                TPTPParser.tptp_root = os.path.abspath(tptp_root)
+            TPTPParser.cache_dir = os.path.join(TestInput.cache_path, 'tptp_axioms')
             # todo check is is writeable (should be dir or file?
 
+    def _load_pruning(self, pruning_config: Dict) -> Optional[Pruning]:
+        with DictPoper(pruning_config, self._logger, "[general.pruning]",
+                       copy.deepcopy(pruning_config)) as poper:
+            after_timeouts, _ = poper.pop_key(variable="after_timeouts",
+                                              default=2,
+                                              required=False,
+                                              type_check=int)
+            if after_timeouts is not None and after_timeouts < 1:
+                self._error(f"pruning after_timeouts should be positive, in {poper.log_context}")
+
+            pattern, _ = poper.pop_key(variable="pattern",
+                                       default=None,
+                                       required=False,
+                                       type_check=str)
+            if pattern is not None:
+                try:
+                    pattern = re.compile(pattern)
+                    if 'size' not in pattern.groupindex:
+                        self._error(f"pruning pattern should have named group size, in {poper.log_context}")
+                except re.error as e:
+                    self._error(f"pruning pattern is not valid regex: {e}, in {poper.log_context}")
+
+            size_key, _ = poper.pop_key(variable="size",
+                                        default=None,
+                                        required=False,
+                                        type_check=str)
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return None
+
+        return Pruning(after_timeouts=after_timeouts, pattern=pattern, size_key=size_key)
+
+    def _load_resource_sampling(self, resource_sampling_config: Dict) -> NoReturn:
+        with DictPoper(resource_sampling_config, self._logger, "[general.resource_sampling]",
+                       copy.deepcopy(resource_sampling_config)) as poper:
+            interval, _ = poper.pop_key(variable="interval",
+                                        default=0.05,
+                                        required=False,
+                                        type_check=float)
+            # processes are polled every 10 ms
+            if interval is not None and interval < 0.01:
+                self._error(f"resource_sampling interval should be at least 0.01, in {poper.log_context}")
+
+            max_samples, _ = poper.pop_key(variable="max_samples",
+                                           default=TestRun.resource_max_samples,
+                                           required=False,
+                                           type_check=int)
+            if max_samples is not None and max_samples < 2:
+                self._error(f"resource_sampling max_samples should be at least 2, in {poper.log_context}")
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return
+
+        TestRun.resource_sampling_interval = interval
+        TestRun.resource_max_samples = max_samples
+
+    def _load_scratch(self, scratch_config: Dict) -> NoReturn:
+        with DictPoper(scratch_config, self._logger, "[general.scratch]",
+                       copy.deepcopy(scratch_config)) as poper:
+            root, _ = poper.pop_key(variable="root",
+                                    default=None,
+                                    required=False,
+                                    type_check=str)
+            max_size, _ = poper.pop_key(variable="max_size",
+                                        default=None,
+                                        required=False,
+                                        type_check=int)
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return
+
+        try:
+            TestRun.scratch = Scratch(root=root, max_size=None if max_size is None else max_size * 1024 * 1024)
+        except BenchmarkException as e:
+            self._error(e)
+
+    def _load_interference(self, interference_config: Dict) -> NoReturn:
+        with DictPoper(interference_config, self._logger, "[general.interference]",
+                       copy.deepcopy(interference_config)) as poper:
+            enabled, _ = poper.pop_key(variable="enabled",
+                                       default=True,
+                                       required=False,
+                                       type_check=bool)
+            thresholds = {}
+            for variable in ('steal', 'cpu_pressure', 'memory_pressure', 'min_frequency', 'min_window'):
+                thresholds[variable], _ = poper.pop_key(variable=variable,
+                                                        default=getattr(Interference, variable),
+                                                        required=False,
+                                                        type_check=float)
+            governors, _ = poper.pop_key(variable="governors",
+                                         default=['powersave'],
+                                         required=False,
+                                         type_check=list)
+            requeue, _ = poper.pop_key(variable="requeue",
+                                       default=0,
+                                       required=False,
+                                       type_check=int)
+            if requeue is not None and requeue < 0:
+                self._error(f"interference requeue should not be negative, in {poper.log_context}")
+            if thresholds['min_window'] is not None and thresholds['min_window'] < 0:
+                self._error(f"interference min_window should not be negative, in {poper.log_context}")
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return
+
+        TestRun.interference = Interference(governors=governors, **thresholds) if enabled else None
+        self.interference_requeues = requeue if enabled else 0
+
     def _load_translators(self, translators_config: List) -> NoReturn:
         if not translators_config:
             return
@@ -203,12 +464,101 @@ class Config:
                 else:
                     TestInput.translators.append(translator)
 
+    def _load_solvers(self, solvers_config: List) -> NoReturn:
+        """Register output parsers of solvers defined by rules (or by parser class) in config"""
+        if not solvers_config:
+            return
+        for solver_config in solvers_config:
+            with DictPoper(solver_config, self._logger, "[[solvers]]", copy.deepcopy(solver_config)) as poper:
+                name, _ = poper.pop_key(variable="name",
+                                        required=True,
+                                        type_check=str)
+
+                executable_pattern, _ = poper.pop_key(variable="executable_pattern",
+                                                      required=False,
+                                                      type_check=str)
+
+                parser_name, _ = poper.pop_key(variable="parser",
+                                               required=False,
+                                               type_check=str)
+
+                rules_config, _ = poper.pop_key(variable="rules",
+                                                default=[],
+                                                required=False,
+                                                type_check=list)
+
+                default, _ = poper.pop_key(variable="default",
+                                           default=SATStatus.UNKOWN.value,
+                                           required=False,
+                                           type_check=str)
+
+                verdict, _ = poper.pop_key(variable="verdict",
+                                           required=False,
+                                           type_check=str)
+
+                if poper.errors_occured:
+                    self._load_errors_occured = True
+                    continue
+
+            try:
+                if parser_name is not None:
+                    if rules_config:
+                        raise BenchmarkException("parser and rules are mutually exclusive", name)
+                    if verdict is not None:
+                        raise BenchmarkException("verdict of parser is defined by its verdict_pattern", name)
+                    module_name, _, class_name = parser_name.partition(':')
+                    parser = getattr(importlib.import_module(module_name), class_name)
+                else:
+                    if not rules_config:
+                        raise BenchmarkException("solver needs rules or parser", name)
+                    parser = RuleOutputParser(rules=[self._load_output_rule(rule_config, name)
+                                                     for rule_config in rules_config],
+                                              default=_status(default),
+                                              verdict_pattern=None if verdict is None else re.compile(verdict))
+                if executable_pattern is not None:
+                    re.compile(executable_pattern)
+            except (BenchmarkException, ImportError, AttributeError, ValueError, re.error) as e:
+                self._error(e if isinstance(e, BenchmarkException) else f"[[solvers]] {name}: {e}")
+            else:
+                get_registry().register_output_parser(name, parser, executable_pattern)
+
+    def _load_output_rule(self, rule_config: Dict, name: str) -> OutputRule:
+        with DictPoper(rule_config, self._logger, "[[solvers.rules]]", name, copy.deepcopy(rule_config)) as poper:
+            pattern, _ = poper.pop_key(variable="pattern",
+                                       required=True,
+                                       type_check=str)
+
+            status, _ = poper.pop_key(variable="status",
+                                      required=True,
+                                      type_check=str)
+
+            stream, _ = poper.pop_key(variable="stream",
+                                      default='stdout',
+                                      required=False,
+                                      type_check=str)
+
+            returncode, _ = poper.pop_key(variable="returncode",
+                                          required=False,
+                                          type_check=int)
+
+            if poper.errors_occured:
+                raise BenchmarkException("invalid rule", name, rule_config)
+        if stream not in OutputRule.streams:
+            raise BenchmarkException(f"rule stream should be one of {OutputRule.streams}", name)
+        return OutputRule(pattern=re.compile(pattern, re.MULTILINE), status=_status(status), stream=stream,
+                          returncode=returncode)
+
     def _load_test_inputs(self, test_inputs_config: Dict) -> NoReturn:
         # test_inputs_config = config.pop("testInputs", None)
         if not test_inputs_config:
             self._error("You must define at least one testInput")
             return
 
+        if TestInput.catalog is None:
+            TestInput.catalog = InputCatalog(path=os.path.join(TestInput.cache_path, 'catalog.json'))
+        TestInput.catalog.refresh()
+        rescanned = TestInput.catalog.rescanned
+
         for test_input_config in test_inputs_config:
             with DictPoper(test_input_config, self._logger, "[[testInputs]]",
                            copy.deepcopy(test_input_config)) as poper:
@@ -216,15 +566,27 @@ class Config:
                                         required=True,
                                         type_check=str)
 
+                family_config, _ = poper.pop_key(variable="family",
+                                                 required=False,
+                                                 type_check=dict)
+                family = None if family_config is None else self._load_family(family_config, name)
+
+                # generated problems are written to cache
                 path, _ = poper.pop_key(variable="path",
+                                        default=os.path.join(TestInput.cache_path, name, 'family')
+                                        if family_config is not None else None,
                                         required=True,
                                         type_check=str)
 
                 format, _ = poper.pop_key(variable="format",
+                                          default=Formats.TPTP.value if family_config is not None else None,
                                           required=True,
                                           type_check=str)
+                if family_config is not None and format.lower() != Formats.TPTP.value:
+                    self._error(f"problem family is generated in TPTP format, in {poper.log_context}")
 
                 patterns, _ = poper.pop_key(variable="files",
+                                            default=[] if family_config is not None else None,
                                             required=True,
                                             type_check=list)
                 gather_statistics_from_json_file, _ = poper.pop_key(
@@ -233,15 +595,22 @@ class Config:
                 gather_statistics_from_formula_file, _ = poper.pop_key(
                     variable="gather_statistics_from_formula_file",
                     required=False, type_check=bool)
+                sample_config, _ = poper.pop_key(variable="sample",
+                                                 required=False,
+                                                 type_check=dict)
+
+                if family_config is not None and family is None:
+                    continue
 
                 files = []
                 prefix = path if os.path.isabs(path) else os.path.join(os.getcwd(), path)
+                if family is not None:
+                    files.extend(family.generate(prefix))
                 for pattern in patterns:
-                    wildcard = os.path.join(prefix, pattern)
-                    resolved_paths = glob.glob(wildcard, recursive=True)
+                    resolved_paths = TestInput.catalog.match(prefix, pattern)
 
                     if not resolved_paths:
-                        self._logger.warning(f"pattern '{wildcard}' did not match any file")
+                        self._logger.warning(f"pattern '{os.path.join(prefix, pattern)}' did not match any file")
                     else:
                         files.extend(resolved_paths)
 
@@ -256,12 +625,25 @@ class Config:
                 test_input = TestInput(
                     name=name, path=prefix, format=format.lower(), files=files,
                     gather_statistics_from_formula_file=gather_statistics_from_formula_file,
-                    gather_statistics_from_json_file=gather_statistics_from_json_file)
+                    gather_statistics_from_json_file=gather_statistics_from_json_file, family=family,
+                    check_files=False)
+                if sample_config is not None:
+                    test_input.sample = self._load_sample(sample_config, name)
+                    if test_input.sample is not None:
+                        test_input.files = test_input.sample.select(test_input)
             except BenchmarkException as e:
                 self._error(e)
             else:
                 self.test_inputs.append(test_input)
 
+        self._logger.info(f"Input catalog: {TestInput.catalog.rescanned - rescanned} directories read")
+        if self.read_only:
+            return
+        try:
+            TestInput.catalog.save()
+        except OSError as e:
+            self._logger.warning(f"Input catalog could not be saved: {e}")
+
     def _load_test_suites(self, test_suites_config: Dict) -> NoReturn:
         if test_suites_config is None:
             self._error("You must define at least one testSuite")
@@ -297,13 +679,21 @@ class Config:
                                                   type_check=bool,
                                                   required=False)
 
+                solver, _ = poper.pop_key(variable="solver",
+                                          required=False,
+                                          type_check=str)
+                if solver is not None and get_output_parser(solver) is None:
+                    self._error(f"solver {solver} is not known, in {poper.log_context}")
+                    continue
+
                 if poper.errors_occured:
                     continue
 
                 try:
                     test_suite = TestSuite(name=name, PATH=PATH, version=version, executable=executable,
                                            options=[option.strip() for option in static_options],
-                                           test_inputs=self.test_inputs, capture_stdout=capture_stdout)
+                                           test_inputs=self.test_inputs, capture_stdout=capture_stdout,
+                                           solver=solver)
                     self._load_test_runs(test_suite_config, test_suite)
                 except BenchmarkException as e:
                     self._error(e)
@@ -363,6 +753,15 @@ class Config:
                                            required=True,
                                            type_check=list)
 
+                flatten_includes, _ = poper.pop_key(variable="flatten_includes",
+                                                    default=False,
+                                                    required=False,
+                                                    type_check=bool)
+
+                sweep_config, _ = poper.pop_key(variable="sweep",
+                                                required=False,
+                                                type_check=dict)
+
                 if poper.errors_occured:
                     continue
 
@@ -373,12 +772,126 @@ class Config:
                                    input_as_last_argument=input_as_last_arg,
                                    exclude=exclude,
                                    include_only=include_only,
-                                   options=options)
+                                   options=options,
+                                   flatten_includes=flatten_includes)
+                sweep = self._load_sweep(sweep_config, name) if sweep_config is not None else None
             except BenchmarkException as e:
                 self._error(e)
                 # self._logger.error(f"{e.args[0]} in {e.args[1:]}")
             else:
-                test_suite.test_runs.append(test_run)
+                if sweep is not None:
+                    test_suite.test_runs.extend(sweep.expand(test_run))
+                else:
+                    test_suite.test_runs.append(test_run)
+
+    def _load_sweep(self, sweep_config: Dict, name: str) -> Optional[Sweep]:
+        with DictPoper(sweep_config, self._logger, "[testSuites.testRuns.sweep]", name,
+                       copy.deepcopy(sweep_config)) as poper:
+            options, _ = poper.pop_key(variable="options",
+                                       required=True,
+                                       type_check=dict)
+
+            mode, _ = poper.pop_key(variable="mode",
+                                    default="grid",
+                                    required=False,
+                                    type_check=str)
+
+            samples, _ = poper.pop_key(variable="samples",
+                                       required=False,
+                                       type_check=int)
+
+            seed, _ = poper.pop_key(variable="seed",
+                                    default=0,
+                                    required=False,
+                                    type_check=int)
+
+            prune_after, _ = poper.pop_key(variable="prune_after",
+                                           default=0,
+                                           required=False,
+                                           type_check=int)
+
+            keep, _ = poper.pop_key(variable="keep",
+                                    default=0.5,
+                                    required=False,
+                                    type_check=float)
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return None
+
+        return Sweep(name=name, options=options, mode=mode, samples=samples, seed=seed, prune_after=prune_after,
+                     keep=keep)
+
+    def _load_family(self, family_config: Dict, name: str) -> Optional[ProblemFamily]:
+        with DictPoper(family_config, self._logger, "[testInputs.family]", name,
+                       copy.deepcopy(family_config)) as poper:
+            kind, _ = poper.pop_key(variable="kind",
+                                    required=True,
+                                    type_check=str)
+
+            sizes, _ = poper.pop_key(variable="sizes",
+                                     required=True,
+                                     type_check=list)
+
+            instances, _ = poper.pop_key(variable="instances",
+                                         default=1,
+                                         required=False,
+                                         type_check=int)
+
+            seed, _ = poper.pop_key(variable="seed",
+                                    default=0,
+                                    required=False,
+                                    type_check=int)
+
+            k, _ = poper.pop_key(variable="k",
+                                 default=3,
+                                 required=False,
+                                 type_check=int)
+
+            clause_ratio, _ = poper.pop_key(variable="clause_ratio",
+                                            default=4.26,
+                                            required=False,
+                                            type_check=float)
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return None
+
+        try:
+            return ProblemFamily(kind=kind, sizes=sizes, instances=instances, seed=seed, k=k,
+                                 clause_ratio=clause_ratio)
+        except BenchmarkException as e:
+            self._error(e)
+            return None
+
+    def _load_sample(self, sample_config: Dict, name: str) -> Optional[Sample]:
+        with DictPoper(sample_config, self._logger, "[testInputs.sample]", name,
+                       copy.deepcopy(sample_config)) as poper:
+            size, _ = poper.pop_key(variable="size",
+                                    required=True,
+                                    type_check=int)
+
+            seed, _ = poper.pop_key(variable="seed",
+                                    default=0,
+                                    required=False,
+                                    type_check=int)
+
+            strata, _ = poper.pop_key(variable="strata",
+                                      default=list(Sample.strata_kinds),
+                                      required=False,
+                                      type_check=list)
+
+            # difficulty is taken from output of previous benchmark by default
+            history, _ = poper.pop_key(variable="history",
+                                       default=self.output_dir,
+                                       required=False,
+                                       type_check=str)
+
+            if poper.errors_occured:
+                self._load_errors_occured = True
+                return None
+
+        return Sample(size=size, seed=seed, strata=strata, history=history)
 
     def _error(self, message):
         self._load_errors_occured = True
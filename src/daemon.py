@@ -0,0 +1,265 @@
+"""Resident benchmark server
+
+Server keeps loaded configs (with resolved input files, input statistics and translated files)
+and memory history of admission controller between benchmarks, so they are not rebuilt for every run.
+Configs set process wide settings (class variables, translators and solvers of parser registry), settings of every
+loaded config are kept with it and restored before its benchmark, every config is loaded from the same defaults.
+Benchmarks are submitted over unix socket and run one after another on worker slots of the server.
+Submitted configs run any executable as the user of the server, so the socket is readable and writable only by
+this user (mode 0600) and connections are authenticated by secret authkey (there is no default).
+"""
+from __future__ import annotations
+
+import copy
+import dataclasses
+import itertools
+import os
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from multiprocessing.connection import Listener, Client, Connection
+from queue import Queue
+from typing import List, Dict, Tuple, Optional
+
+from src.admission import AdmissionController
+from src.benchmark import Benchmark
+from src.config import Config
+from src.errors import BenchmarkException
+from src.log import get_logger
+from src.parsers.parsers import get_registry
+from src.parsers.statistics_parsers.tptp_parser import TPTPParser
+from src.statistics import serializer
+from src.tests import TestInput, TestRun
+
+logger = get_logger()
+
+_settings = [(TestRun, 'scratch'), (TestRun, 'page_cache'), (TestRun, 'perf_stat'),
+             (TestRun, 'resource_sampling_interval'), (TestRun, 'resource_max_samples'), (TestRun, 'interference'),
+             (TPTPParser, 'tptp_root'), (TPTPParser, 'cache_dir')]
+"""(class, variable) set by config"""
+
+
+@dataclass
+class Submission:
+    id: int
+    config_file: str
+    test_suites: List[str] = field(default_factory=list)
+    """names of test suites to run, all if empty"""
+    test_runs: List[str] = field(default_factory=list)
+    """names of test runs (or sweeps) to run, all if empty"""
+    state: str = 'queued'
+    """queued, running, finished or failed"""
+    submitted: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    error: str = None
+    output_dir: str = None
+    """output_dir from config"""
+    output_format: str = None
+    """output_format from config"""
+    result: bytes = None
+    """statistics serialized in output_format"""
+
+    def status(self) -> dict:
+        status = dataclasses.asdict(self)
+        status.pop('result')
+        return status
+
+
+@dataclass
+class Daemon:
+    socket_path: str
+    workers: int = 1
+    authkey: bytes = None
+    """secret of server and its clients"""
+
+    def __post_init__(self):
+        _check_authkey(self.authkey)
+        self.admission = AdmissionController(max_workers=self.workers)
+        self._configs: Dict[str, Tuple[float, Config, dict]] = {}
+        """Dict[config path, (mtime, config, settings)]"""
+        self._defaults = _save_settings()
+        self._submissions: Dict[int, Submission] = {}
+        self._queue = Queue()
+        self._ids = itertools.count(1)
+        self._stopped = threading.Event()
+
+    def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # socket is created with mode 0600 (umask is set before any thread of server starts)
+        umask = os.umask(0o177)
+        try:
+            listener = Listener(self.socket_path, family='AF_UNIX', authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        logger.info(f'Serving on {self.socket_path} with {self.workers} worker slots')
+        runner = threading.Thread(target=self._run_submissions)
+        runner.daemon = True
+        runner.start()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    connection = listener.accept()
+                except OSError:
+                    break
+                except Exception as e:
+                    logger.warning(f'Rejected connection: {e}')
+                    continue
+                thread = threading.Thread(target=self._serve, args=(connection, listener))
+                thread.daemon = True
+                thread.start()
+        finally:
+            listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _serve(self, connection: Connection, listener: Listener):
+        try:
+            while True:
+                message = connection.recv()
+                connection.send(self._handle(message, listener))
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+
+    def _handle(self, message: tuple, listener: Listener) -> tuple:
+        command = message[0]
+        if command == 'submit':
+            _, config_file, test_suites, test_runs = message
+            submission = Submission(id=next(self._ids), config_file=os.path.abspath(config_file),
+                                    test_suites=test_suites, test_runs=test_runs)
+            self._submissions[submission.id] = submission
+            self._queue.put(submission)
+            logger.info(f'Submitted benchmark {submission.id} of {submission.config_file}')
+            return 'status', submission.status()
+        if command in ('status', 'results'):
+            submission = self._submissions.get(message[1])
+            if submission is None:
+                return 'error', f'no benchmark {message[1]}'
+            if command == 'status':
+                return 'status', submission.status()
+            if submission.state != 'finished':
+                return 'error', f'benchmark {submission.id} is {submission.state}'
+            return 'results', submission.result
+        if command == 'shutdown':
+            self._stopped.set()
+            listener.close()
+            return 'status', None
+        return 'error', f'unknown command {command}'
+
+    def _run_submissions(self):
+        while True:
+            submission = self._queue.get()
+            submission.state = 'running'
+            submission.started = time.time()
+            try:
+                statistics = self._run(submission)
+                submission.result = serializer.dumps(statistics, submission.output_format)
+                submission.state = 'finished'
+            except Exception as e:
+                logger.error(f'Benchmark {submission.id} failed: {e}')
+                submission.error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+                submission.state = 'failed'
+            submission.finished = time.time()
+
+    def _config(self, config_file: str) -> Config:
+        """Config loaded from file, it is reloaded only if file was modified"""
+        mtime = os.path.getmtime(config_file)
+        if config_file not in self._configs or self._configs[config_file][0] != mtime:
+            _restore_settings(self._defaults)
+            config = Config(config_file=config_file)
+            config.load_config()
+            self._configs[config_file] = mtime, config, _save_settings()
+        _, config, settings = self._configs[config_file]
+        # settings are shared by all runs, use settings of this config
+        _restore_settings(settings)
+        return config
+
+    def _run(self, submission: Submission):
+        config = self._config(submission.config_file)
+        submission.output_dir = os.path.abspath(config.output_dir)
+        submission.output_format = config.output_format
+        test_suites = []
+        for test_suite in config.test_suites:
+            if submission.test_suites and test_suite.name not in submission.test_suites:
+                continue
+            test_runs = [test_run for test_run in test_suite.test_runs
+                         if not submission.test_runs or test_run.name in submission.test_runs
+                         or test_run.sweep is not None and test_run.sweep.name in submission.test_runs]
+            if test_runs:
+                test_suite = copy.copy(test_suite)
+                test_suite.test_runs = test_runs
+                test_suites.append(test_suite)
+        if not test_suites:
+            raise BenchmarkException('No test suite or test run matches submission')
+
+        Benchmark.test_case_timeout = config.test_case_timeout or 300
+        benchmark = Benchmark(test_suite=test_suites,
+                              timeout_ladder=config.test_case_timeout_ladder,
+                              time_budget=config.time_budget,
+                              deduplicate=config.deduplicate_inputs,
+                              pruning=config.pruning,
+                              report_interval=config.report_interval,
+                              max_interference_requeues=config.interference_requeues,
+                              admission=self.admission)
+        return benchmark.run()
+
+
+def _save_settings() -> dict:
+    settings = {(owner, variable): getattr(owner, variable) for owner, variable in _settings}
+    settings['translators'] = list(TestInput.translators)
+    settings['registry'] = get_registry().state()
+    return settings
+
+
+def _restore_settings(settings: dict):
+    for owner, variable in _settings:
+        setattr(owner, variable, settings[owner, variable])
+    TestInput.translators[:] = settings['translators']
+    get_registry().restore(settings['registry'])
+
+
+def _check_authkey(authkey: Optional[bytes]):
+    if not authkey:
+        raise BenchmarkException('secret authkey of server is required')
+
+
+def request(socket_path: str, message: tuple, authkey: bytes) -> tuple:
+    """Send message to server and return its response"""
+    _check_authkey(authkey)
+    with Client(socket_path, family='AF_UNIX', authkey=authkey) as connection:
+        connection.send(message)
+        return connection.recv()
+
+
+def submit(socket_path: str, config_file: str, test_suites: List[str] = None, test_runs: List[str] = None,
+           authkey: bytes = None) -> dict:
+    _, status = request(socket_path, ('submit', config_file, test_suites or [], test_runs or []), authkey)
+    return status
+
+
+def status(socket_path: str, submission_id: int, authkey: bytes = None) -> dict:
+    kind, response = request(socket_path, ('status', submission_id), authkey)
+    if kind == 'error':
+        raise BenchmarkException(response)
+    return response
+
+
+def wait(socket_path: str, submission_id: int, authkey: bytes = None, interval: float = 0.1) -> dict:
+    """Poll server until benchmark is finished or failed"""
+    while True:
+        response = status(socket_path, submission_id, authkey)
+        if response['state'] in ('finished', 'failed'):
+            return response
+        time.sleep(interval)
+
+
+def results(socket_path: str, submission_id: int, authkey: bytes = None) -> bytes:
+    """:return: statistics of finished benchmark in output_format of its config"""
+    kind, response = request(socket_path, ('results', submission_id), authkey)
+    if kind == 'error':
+        raise BenchmarkException(response)
+    return response
@@ -0,0 +1,387 @@
+"""Run one benchmark on many machines
+
+Coordinator loads config, expands jobs and hands them out to workers over TCP,
+workers have to see the same file system layout (inputs, translated files, provers) as coordinator,
+coordinator translates (and flattens) inputs of jobs before it leases them, workers only run them.
+Messages are pickled tuples sent by multiprocessing.connection, connections are authenticated by authkey.
+Unpickling runs code, so authkey is a required secret (there is no default) shared by coordinator and workers.
+Every job is leased to a worker, lease is extended by heartbeats, job of a worker that stopped sending heartbeats
+(or disconnected) is given to another worker.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass, field
+from multiprocessing.connection import Listener, Client, Connection
+from queue import Queue, Empty
+from typing import List, Optional, Tuple, Dict
+
+from src.admission import AdmissionController
+from src.benchmark import Benchmark, failed_result
+from src.config import Config
+from src.errors import BenchmarkException
+from src.log import get_logger
+from src.statistics.stats import Statistics, HardwareStatistics, SATStatus, TestRunStatistics
+from src.tests import Job
+
+logger = get_logger()
+
+
+def check_authkey(authkey: Optional[bytes]):
+    if not authkey:
+        raise BenchmarkException('secret authkey of coordinator and workers is required')
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' -> ('host', port)"""
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+@dataclass
+class JobSpec:
+    """Job description sent to worker, suite, run and input are indexes in config"""
+    test_suite: int
+    test_run: int
+    test_input: int
+    original_path: str
+    input_path: str
+    translator: Optional[Translator] = None
+    translated_path: Optional[str] = None
+
+    @staticmethod
+    def from_job(job: Job, test_suites: List[TestSuite]) -> JobSpec:
+        test_suite = next(i for i, test_suite in enumerate(test_suites) if test_suite is job.test_suite)
+        test_run = next(i for i, test_run in enumerate(job.test_suite.test_runs) if test_run is job.test_run)
+        test_input = next(i for i, test_input in enumerate(job.test_suite.test_inputs)
+                          if test_input is job.test_input)
+        return JobSpec(test_suite=test_suite, test_run=test_run, test_input=test_input,
+                       original_path=job.original_path, input_path=job.input_path, translator=job.translator,
+                       translated_path=job.translated_path)
+
+    def to_job(self, config: Config) -> Job:
+        test_suite = config.test_suites[self.test_suite]
+        return Job(test_suite=test_suite, test_run=test_suite.test_runs[self.test_run],
+                   test_input=test_suite.test_inputs[self.test_input], original_path=self.original_path,
+                   input_path=self.input_path, translator=self.translator, translated_path=self.translated_path)
+
+
+@dataclass
+class Lease:
+    index: int
+    connection: int
+    """id of connection that holds lease"""
+    timeout: float
+    expires: float
+
+
+@dataclass
+class Coordinator(Benchmark):
+    """Benchmark that runs jobs on remote workers instead of locally"""
+    config_text: str = ''
+    """config sent to workers, it has to be the config test_suite was loaded from"""
+    address: Tuple[str, int] = ('localhost', 7777)
+    authkey: bytes = None
+    """secret shared by coordinator and workers"""
+    heartbeat_interval: float = 5
+    """lease of job expires after 3 heartbeat intervals without heartbeat"""
+    workers_hardware: Dict[str, HardwareStatistics] = field(default_factory=dict)
+
+    def __post_init__(self):
+        super().__post_init__()
+        check_authkey(self.authkey)
+        self._condition = threading.Condition()
+        self._jobs: List[Job] = []
+        self._queue = deque()
+        self._leases: Dict[int, Lease] = {}
+        self._finished = Queue()
+        self._tier = None
+        self._connections = 0
+        self._done = False
+
+    def run(self) -> Statistics:
+        listener = Listener(self.address, authkey=self.authkey)
+        logger.info(f'Coordinator listening on {self.address[0]}:{self.address[1]}')
+        accept_thread = threading.Thread(target=self._accept, args=(listener,))
+        accept_thread.daemon = True
+        accept_thread.start()
+        try:
+            statistics = super().run()
+        finally:
+            with self._condition:
+                self._done = True
+                # let connected workers ask for next job and receive 'done'
+                self._condition.wait_for(lambda: self._connections == 0, timeout=3 * self.heartbeat_interval)
+            listener.close()
+        statistics.workers.update(self.workers_hardware)
+        return statistics
+
+    def _run_tier(self, jobs: List[Job], pending: List[int], results: List[Optional[TestRunStatistics]], tier: int,
+                  tier_timeout: float, min_timeout: float, deadline: Optional[float]) -> List[int]:
+        pending = self._prepare(jobs, pending, results, tier, tier_timeout)
+        if self.pruning is not None:
+            pending = self.pruning.order(jobs, pending)
+        with self._condition:
+            self._jobs = jobs
+            self._queue = deque(pending)
+            self._leases.clear()
+            self._finished = Queue()
+            self._tier = (tier, tier_timeout, min_timeout, deadline)
+        timed_out = []
+        interference_requeues = defaultdict(int)
+        remaining = len(pending)
+        while remaining:
+            self._expire_leases()
+            try:
+                index, result = self._finished.get(timeout=1)
+            except Empty:
+                continue
+            if result is not None and result.interference \
+                    and interference_requeues[index] < self.max_interference_requeues:
+                interference_requeues[index] += 1
+                logger.info(f'Requeuing job {index} disturbed by {", ".join(result.interference)}')
+                with self._condition:
+                    self._queue.append(index)
+                    self._condition.notify_all()
+                continue
+            remaining -= 1
+            if result is None:
+                continue
+            result.timeout_tier = tier
+            result.interference_requeues = interference_requeues[index]
+            self._store(jobs, results, index, result)
+            if self.pruning is not None:
+                self.pruning.record(index, result)
+            if result.output.status in (SATStatus.TIMEOUT, SATStatus.PRUNED):
+                timed_out.append(index)
+        return timed_out
+
+    def _prepare(self, jobs: List[Job], pending: List[int], results: List[Optional[TestRunStatistics]], tier: int,
+                 timeout: float) -> List[int]:
+        """Translate inputs of pending jobs (once), jobs that could not be prepared get error result"""
+        prepared = []
+        for index in pending:
+            try:
+                jobs[index].prepare()
+            except Exception as e:
+                logger.exception(f'Input of job {index} could not be prepared: {e!r}')
+                result = jobs[index].failed(timeout, f'{type(e).__name__}: {e}')
+                result.timeout_tier = tier
+                self._store(jobs, results, index, result)
+                continue
+            prepared.append(index)
+        return prepared
+
+    def _accept(self, listener: Listener):
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError as e:
+                if self._done:
+                    # listener closed
+                    return
+                logger.warning(f'Rejected worker connection: {e!r}')
+                continue
+            except Exception as e:
+                logger.warning(f'Rejected worker connection: {e}')
+                continue
+            thread = threading.Thread(target=self._serve, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, connection: Connection):
+        worker = None
+        with self._condition:
+            self._connections += 1
+        try:
+            _, worker, hardware = connection.recv()
+            logger.info(f'Worker {worker} connected')
+            self.workers_hardware[worker] = hardware
+            connection.send(('config', self.config_text, self.heartbeat_interval))
+            while True:
+                message = connection.recv()
+                if message[0] == 'request':
+                    response = self._lease(id(connection))
+                    connection.send(response)
+                    if response[0] == 'done':
+                        return
+                elif message[0] == 'heartbeat':
+                    self._heartbeat(id(connection), *message[1:])
+                elif message[0] == 'result':
+                    self._complete(*message[1:])
+        except (EOFError, OSError) as e:
+            logger.warning(f'Worker {worker} disconnected: {e!r}')
+        finally:
+            connection.close()
+            with self._condition:
+                self._connections -= 1
+                for lease in [lease for lease in self._leases.values() if lease.connection == id(connection)]:
+                    logger.info(f'Reassigning job {lease.index} of worker {worker}')
+                    del self._leases[lease.index]
+                    self._queue.appendleft(lease.index)
+                self._condition.notify_all()
+
+    def _lease(self, connection: int) -> tuple:
+        with self._condition:
+            if self._done:
+                return 'done',
+            if not self._queue or self._tier is None:
+                return 'wait', 1
+            tier, tier_timeout, min_timeout, deadline = self._tier
+            timeout = self._budgeted_timeout(tier_timeout, min_timeout, deadline,
+                                             len(self._queue) + len(self._leases), max(1, self._connections))
+            if timeout is None:
+                logger.warning(f'Time budget exhausted, {len(self._queue)} jobs were not run with timeout '
+                               f'{tier_timeout}s')
+                while self._queue:
+                    self._finished.put((self._queue.popleft(), None))
+                return 'wait', 1
+            index = self._queue.popleft()
+            pruned = self._prune(self._jobs, index, tier, timeout)
+            while pruned is not None:
+                self._finished.put((index, pruned))
+                if not self._queue:
+                    return 'wait', 1
+                index = self._queue.popleft()
+                pruned = self._prune(self._jobs, index, tier, timeout)
+            self._leases[index] = Lease(index=index, connection=connection, timeout=timeout,
+                                        expires=time.monotonic() + 3 * self.heartbeat_interval)
+            return 'job', tier, index, JobSpec.from_job(self._jobs[index], self.test_suite), timeout
+
+    def _heartbeat(self, connection: int, tier: int, index: int):
+        with self._condition:
+            lease = self._leases.get(index)
+            if self._tier[0] == tier and lease is not None and lease.connection == connection:
+                lease.expires = time.monotonic() + 3 * self.heartbeat_interval
+
+    def _complete(self, tier: int, index: int, result: TestRunStatistics):
+        with self._condition:
+            if self._tier[0] != tier:
+                return
+            # result of reassigned job can come after the job was given to other worker
+            if self._leases.pop(index, None) is None:
+                if index not in self._queue:
+                    return
+                self._queue.remove(index)
+            self._finished.put((index, result))
+
+    def _expire_leases(self):
+        with self._condition:
+            now = time.monotonic()
+            for lease in [lease for lease in self._leases.values() if lease.expires < now]:
+                logger.warning(f'Lease of job {lease.index} expired, reassigning it')
+                del self._leases[lease.index]
+                self._queue.appendleft(lease.index)
+
+
+@dataclass
+class Worker:
+    """Connect to coordinator and run jobs it hands out, every slot runs one job at a time"""
+    address: Tuple[str, int]
+    slots: int = 1
+    authkey: bytes = None
+    """secret shared by coordinator and workers"""
+    name: str = f'{socket.gethostname()}:{os.getpid()}'
+    max_memory_requeues: int = 3
+
+    def __post_init__(self):
+        check_authkey(self.authkey)
+        self.admission = AdmissionController(max_workers=self.slots)
+        self._config = None
+        self._config_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self):
+        threads = [threading.Thread(target=self._serve_slot) for _ in range(self.slots)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                self.admission.check_pressure()
+                time.sleep(0.1)
+        finally:
+            self._stopped.set()
+        logger.info(f'Worker {self.name} finished')
+
+    def _load_config(self, config_text: str) -> Config:
+        with self._config_lock:
+            if self._config is None:
+                self._config = Config(config_file=f'config of {self.address[0]}:{self.address[1]}')
+                self._config.load_config(config_text=config_text)
+            return self._config
+
+    def _serve_slot(self):
+        connection = Client(self.address, authkey=self.authkey)
+        send_lock = threading.Lock()
+        try:
+            connection.send(('hello', self.name, HardwareStatistics()))
+            _, config_text, heartbeat_interval = connection.recv()
+            config = self._load_config(config_text)
+            while not self._stopped.is_set():
+                with send_lock:
+                    connection.send(('request',))
+                message = connection.recv()
+                if message[0] == 'done':
+                    return
+                if message[0] == 'wait':
+                    time.sleep(message[1])
+                    continue
+                _, tier, index, job_spec, timeout = message
+                job_done = threading.Event()
+                heartbeat = threading.Thread(target=self._heartbeat,
+                                             args=(connection, send_lock, job_done, heartbeat_interval, tier, index))
+                heartbeat.daemon = True
+                heartbeat.start()
+                job = None
+                try:
+                    job = job_spec.to_job(config)
+                    result = self._run_job(job, timeout)
+                except Exception as e:
+                    # slot keeps serving, coordinator counts job as finished
+                    logger.exception(f'Job {index} failed: {e!r}')
+                    result = None if job is None else failed_result(job, timeout, e)
+                finally:
+                    job_done.set()
+                if result is not None:
+                    result.worker = self.name
+                with send_lock:
+                    connection.send(('result', tier, index, result))
+        except (EOFError, OSError) as e:
+            logger.warning(f'Connection to coordinator lost: {e!r}')
+        finally:
+            connection.close()
+
+    def _run_job(self, job: Job, timeout: float) -> TestRunStatistics:
+        """Run job when there is enough memory for it, rerun it if it was killed to free memory"""
+        memory_requeues = 0
+        while True:
+            ticket = self.admission.admit(job.key)
+            while ticket is None:
+                time.sleep(0.1)
+                ticket = self.admission.admit(job.key)
+            try:
+                result = job.run(timeout=timeout, memory_guard=self.admission.guard(ticket), prepare=False)
+            except BaseException:
+                self.admission.finish(ticket, peak_memory=None)
+                raise
+            requeue = self.admission.finish(ticket, peak_memory=result.execution_statistics.peak_memory)
+            if requeue and memory_requeues < self.max_memory_requeues:
+                memory_requeues += 1
+                continue
+            result.memory_requeues = memory_requeues
+            return result
+
+    @staticmethod
+    def _heartbeat(connection: Connection, send_lock: threading.Lock, job_done: threading.Event,
+                   interval: float, tier: int, index: int):
+        while not job_done.wait(interval):
+            try:
+                with send_lock:
+                    connection.send(('heartbeat', tier, index))
+            except OSError:
+                return
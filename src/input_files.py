@@ -0,0 +1,149 @@
+"""Access to compressed input files and to files stored in archives
+
+Compressed file is any file with .gz, .xz, .bz2 or .zst extension.
+File in archive is addressed as 'archive_path:member_path', supported archives are tar (optionally compressed,
+e.g. .tar.gz, .tgz, .tar.zst) and zip.
+Tar archives are compressed streams, so they are read sequentially, reader remembers its position in archive and
+reading members in archive order does not decompress the archive again.
+.zst files require zstandard package.
+"""
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+from typing import Optional, Tuple, List, IO, Dict, Iterator
+
+from src.errors import BenchmarkException
+
+ARCHIVE_SEPARATOR = ':'
+
+_archive_member = re.compile(r'^(.*?\.(?:tar|tar\.gz|tgz|tar\.xz|txz|tar\.bz2|tbz2|tar\.zst|tzst|zip)):(.+)$')
+_compression_suffixes = ('.gz', '.xz', '.bz2', '.zst')
+
+
+def split_member(path: str) -> Tuple[str, Optional[str]]:
+    """'archive:member' -> ('archive', 'member'), other paths -> (path, None)"""
+    match = _archive_member.match(path)
+    if match is None:
+        return path, None
+    return match.group(1), match.group(2)
+
+
+def is_plain(path: str) -> bool:
+    """File can be opened directly (it is not compressed nor stored in archive)"""
+    return split_member(path)[1] is None and not path.endswith(_compression_suffixes)
+
+
+def plain_name(path: str) -> str:
+    """Path of file after decompression, archive is treated as directory"""
+    archive, member = split_member(path)
+    if member is not None:
+        path = os.path.join(archive, member)
+    for suffix in _compression_suffixes:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def open_compressed(path: str) -> IO[bytes]:
+    """Open (possibly) compressed file for binary reading"""
+    if path.endswith(('.gz', '.tgz')):
+        return gzip.open(path, 'rb')
+    if path.endswith(('.xz', '.txz')):
+        return lzma.open(path, 'rb')
+    if path.endswith(('.bz2', '.tbz2')):
+        return bz2.open(path, 'rb')
+    if path.endswith(('.zst', '.tzst')):
+        try:
+            import zstandard
+        except ImportError:
+            raise BenchmarkException(f"zstandard package is required to read {path}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def read_input(path: str) -> bytes:
+    """Decompressed content of file or archive member"""
+    archive, member = split_member(path)
+    if member is None:
+        with open_compressed(path) as fp:
+            return fp.read()
+    if archive.endswith('.zip'):
+        with zipfile.ZipFile(archive) as zip_file:
+            return zip_file.read(member)
+    return _tar_reader(archive).read(member)
+
+
+def list_members(archive: str) -> List[str]:
+    """Names of regular files in archive, in archive order"""
+    if archive.endswith('.zip'):
+        with zipfile.ZipFile(archive) as zip_file:
+            return [info.filename for info in zip_file.infolist() if not info.is_dir()]
+    with open_compressed(archive) as fp, tarfile.open(fileobj=fp, mode='r|') as tar:
+        return [member.name for member in tar if member.isfile()]
+
+
+@contextmanager
+def materialize(path: str) -> Iterator[str]:
+    """Path of plain file with content of path, compressed files and archive members are decompressed
+    to temporary file which is removed on exit
+    """
+    if is_plain(path):
+        yield path
+        return
+    handle, temporary_path = tempfile.mkstemp(suffix=os.path.basename(plain_name(path)))
+    try:
+        with os.fdopen(handle, 'wb') as fp:
+            fp.write(read_input(path))
+        yield temporary_path
+    finally:
+        os.unlink(temporary_path)
+
+
+class _TarReader:
+    """Sequential reader of tar archive that keeps its position between reads"""
+
+    def __init__(self, archive: str):
+        self.archive = archive
+        self.lock = threading.Lock()
+        self._fp = None
+        self._tar = None
+        self._members = None
+
+    def read(self, name: str) -> bytes:
+        with self.lock:
+            for _ in range(2):
+                if self._tar is None:
+                    self._fp = open_compressed(self.archive)
+                    self._tar = tarfile.open(fileobj=self._fp, mode='r|')
+                    self._members = iter(self._tar)
+                for member in self._members:
+                    if member.name == name:
+                        return self._tar.extractfile(member).read()
+                # member is before current position (or not in archive), start from the beginning
+                self._close()
+            raise BenchmarkException(f"{name} not found in archive {self.archive}")
+
+    def _close(self):
+        self._tar.close()
+        self._fp.close()
+        self._tar = self._fp = self._members = None
+
+
+_tar_readers: Dict[str, _TarReader] = {}
+_tar_readers_lock = threading.Lock()
+
+
+def _tar_reader(archive: str) -> _TarReader:
+    with _tar_readers_lock:
+        if archive not in _tar_readers:
+            _tar_readers[archive] = _TarReader(archive)
+        return _tar_readers[archive]
@@ -0,0 +1,59 @@
+"""Launch of solver and translator processes
+
+Executable is resolved to absolute path once per (executable, PATH) and all its processes get the same immutable
+environment, so os.environ is not modified and PATH is not searched for every run.
+Popen can start process with posix_spawn (Python 3.8+) or vfork (Python 3.10+) instead of fork only if executable
+is absolute path and close_fds is False. File descriptors opened by Python are not inheritable,
+so process still gets only its stdin, stdout and stderr.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, List, Optional, Dict, Tuple
+
+from src.log import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class Launcher:
+    executable: str
+    """absolute path of executable, name if it was not found (process start fails as before)"""
+    env: Mapping[str, str]
+
+    def command(self, command: List[str]) -> List[str]:
+        """Command with resolved executable"""
+        return [self.executable, *command[1:]]
+
+    @property
+    def options(self) -> dict:
+        """Keyword arguments of Popen"""
+        return {'env': self.env, 'close_fds': False}
+
+
+_launchers: Dict[Tuple[str, Optional[str]], Launcher] = {}
+_launchers_lock = threading.Lock()
+
+
+def get_launcher(executable: str, PATH: Optional[str] = None) -> Launcher:
+    """Launcher of executable, PATH is searched before PATH of environment"""
+    key = executable, PATH
+    launcher = _launchers.get(key)
+    if launcher is not None:
+        return launcher
+    with _launchers_lock:
+        if key not in _launchers:
+            env = dict(os.environ)
+            if PATH:
+                env['PATH'] = PATH + os.pathsep + env.get('PATH', os.defpath)
+            resolved = shutil.which(executable, path=env.get('PATH', os.defpath))
+            if resolved is None:
+                logger.warning(f'{executable} not found in {env.get("PATH")}')
+            _launchers[key] = Launcher(executable=os.path.abspath(resolved) if resolved else executable,
+                                       env=MappingProxyType(env))
+        return _launchers[key]
@@ -2,10 +2,13 @@ import logging
 
 
 def init_log(level=logging.DEBUG, filename='benchmark.log'):
+    """Log to stderr and to filename (only to stderr if None)"""
     logging.basicConfig(level=level)
 
     logger = logging.getLogger('ProverBenchmark')
     logger.setLevel(logging.DEBUG)
+    if filename is None:
+        return
     hdlr = logging.FileHandler(filename)
     formatter = logging.Formatter('%(asctime)s:%(levelname)s:%(message)s')
     hdlr.setFormatter(formatter)
@@ -0,0 +1,55 @@
+"""Page cache state of input files before solver run
+
+warm - file is read to page cache before the run, so no run pays for reading it from disk
+cold - file is evicted from page cache before the run, so every run reads it from disk
+(only clean pages can be evicted, so file is synced first, pages shared with other running jobs may stay cached)
+Requires posix_fadvise (not available on macOS and Windows), policy is not applied without it.
+"""
+import os
+import threading
+from typing import Optional
+
+from src import input_files
+from src.log import get_logger
+
+logger = get_logger()
+
+modes = ['warm', 'cold']
+
+_warned = threading.Event()
+_chunk_size = 1024 * 1024
+
+
+def prepare(path: str, mode: Optional[str]) -> Optional[str]:
+    """Apply page cache policy to file that will be read by solver
+    compressed files and archives are prepared as whole
+    :return: applied mode, None if no policy was applied
+    """
+    if mode is None:
+        return None
+    if not hasattr(os, 'posix_fadvise'):
+        if not _warned.is_set():
+            _warned.set()
+            logger.warning(f'posix_fadvise is not available, page cache policy {mode} is not applied')
+        return None
+    path, _ = input_files.split_member(path)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        logger.warning(f'Page cache policy {mode} was not applied to {path}: {e}')
+        return None
+    try:
+        if mode == 'warm':
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            # WILLNEED only starts asynchronous readahead, read file to be sure it is cached
+            while os.read(fd, _chunk_size):
+                pass
+        else:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError as e:
+        logger.warning(f'Page cache policy {mode} was not applied to {path}: {e}')
+        return None
+    finally:
+        os.close(fd)
+    return mode
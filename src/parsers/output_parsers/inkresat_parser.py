@@ -1,10 +1,22 @@
+import re
 from typing import Optional
 
-from src.parsers.parsers import OutputParser
-from src.statistics.stats import SATStatus
+from src.parsers.parsers import OutputParser, scan_metrics
+from src.statistics.stats import SATStatus, InkresatMetrics
+
+_scanner = re.compile(r"""
+    ^variables\ added:\ (?P<variables_added>\d+)
+    | ^clauses\ added:\ (?P<clauses_added>\d+)
+    | ^SAT\ cycles:\ (?P<sat_cycles>\d+)
+    | ^pattern\ store\ hits:\ (?P<pattern_store_hits>\d+)
+    | ^pattern\ store\ misses:\ (?P<pattern_store_misses>\d+)
+    | ^time:\ (?P<time>[\d.eE+-]+)
+""", re.VERBOSE | re.MULTILINE)
 
 
 class InkresatParser(OutputParser):
+    verdict_pattern = re.compile(r'^(UN)?SATISFIABLE\s*$')
+
     @staticmethod
     def parse_output(returncode: int, stdout: Optional[str], stderr: Optional[str]) -> SATStatus:
         """Inkresat example output:
@@ -18,8 +30,16 @@ class InkresatParser(OutputParser):
         """
         if returncode != 0:
             return SATStatus.ERROR
-        if 'SATISFIABLE' in stdout:
-            return SATStatus.SATISFIABLE
-        elif 'UNSATISFIABLE' in stdout:
+        # UNSATISFIABLE contains SATISFIABLE
+        if 'UNSATISFIABLE' in stdout:
             return SATStatus.UNSATISFIABLE
+        elif 'SATISFIABLE' in stdout:
+            return SATStatus.SATISFIABLE
         return SATStatus.UNKOWN
+
+    @staticmethod
+    def parse_metrics(stdout: Optional[str], stderr: Optional[str]) -> Optional[InkresatMetrics]:
+        metrics = scan_metrics(_scanner, stdout, InkresatMetrics())
+        if metrics is not None and metrics.sat_cycles is not None and metrics.time:
+            metrics.cycles_per_second = metrics.sat_cycles / metrics.time
+        return metrics
@@ -1,10 +1,19 @@
+import re
 from typing import Optional
 
-from src.parsers.parsers import OutputParser
-from src.statistics.stats import SATStatus
+from src.parsers.parsers import OutputParser, scan_metrics
+from src.statistics.stats import SATStatus, Prover9Metrics
+
+_scanner = re.compile(r"""
+    ^Given=(?P<given>\d+)\.\ Generated=(?P<generated>\d+)\.\ Kept=(?P<kept>\d+)\.\ proofs=(?P<proofs>\d+)\.
+    | ^Megabytes=(?P<megabytes>[\d.]+)\.
+    | ^User_CPU=(?P<user_cpu>[\d.]+),\ System_CPU=(?P<system_cpu>[\d.]+),\ Wall_clock=(?P<wall_clock>\d+)\.
+""", re.VERBOSE | re.MULTILINE)
 
 
 class Prover9Parser(OutputParser):
+    verdict_pattern = re.compile(r'^(THEOREM PROVED|SEARCH FAILED)')
+
     @staticmethod
     def parse_output(returncode: int, stdout: Optional[str], stderr: Optional[str]) -> SATStatus:
         """Prover9: Exit Code	Reason for Termination (from https://www.cs.unm.edu/~mccune/prover9/manual/2009-11A/)
@@ -31,3 +40,15 @@ class Prover9Parser(OutputParser):
             return SATStatus.TIMEOUT
         else:
             return SATStatus.UNSATISFIABLE
+
+    @staticmethod
+    def parse_metrics(stdout: Optional[str], stderr: Optional[str]) -> Optional[Prover9Metrics]:
+        """Prover9 statistics section:
+        Given=12. Generated=161. Kept=59. proofs=1.
+        Megabytes=0.09.
+        User_CPU=0.01, System_CPU=0.00, Wall_clock=0.
+        """
+        metrics = scan_metrics(_scanner, stdout, Prover9Metrics())
+        if metrics is not None and metrics.generated is not None and metrics.user_cpu:
+            metrics.clauses_per_second = metrics.generated / metrics.user_cpu
+        return metrics
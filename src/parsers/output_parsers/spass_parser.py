@@ -1,10 +1,37 @@
+import re
 from typing import Optional
 
-from src.parsers.parsers import OutputParser
-from src.statistics.stats import SATStatus
+from src.parsers.parsers import OutputParser, scan_metrics
+from src.statistics.stats import SATStatus, SpassMetrics
+
+_scanner = re.compile(r"""
+    ^SPASS\ derived\ (?P<derived>\d+)\ clauses,\ backtracked\ (?P<backtracked>\d+)\ clauses,
+        \ performed\ (?P<splits>\d+)\ splits\ and\ kept\ (?P<kept>\d+)\ clauses\.
+    | ^SPASS\ allocated\ (?P<allocated_kilobytes>\d+)\ KBytes\.
+    | ^SPASS\ spent\s+(?P<total_time>[\d:.]+)\ on\ the\ problem\.
+    | ^\s+(?P<input_time>[\d:.]+)\ for\ the\ input\.
+    | ^\s+(?P<translation_time>[\d:.]+)\ for\ the\ FLOTTER\ CNF\ translation\.
+    | ^\s+(?P<inference_time>[\d:.]+)\ for\ inferences\.
+    | ^\s+(?P<backtracking_time>[\d:.]+)\ for\ the\ backtracking\.
+    | ^\s+(?P<reduction_time>[\d:.]+)\ for\ the\ reduction\.
+""", re.VERBOSE | re.MULTILINE)
+
+
+def _seconds(time: str) -> float:
+    """h:mm:ss.ss -> seconds"""
+    seconds = 0
+    for part in time.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+_converters = {name: _seconds for name in ('total_time', 'input_time', 'translation_time', 'inference_time',
+                                           'backtracking_time', 'reduction_time')}
 
 
 class SpassParser(OutputParser):
+    verdict_pattern = re.compile(r'^SPASS beiseite')
+
     @staticmethod
     def parse_output(returncode: int, stdout: Optional[str], stderr: Optional[str]) -> SATStatus:
         """SPASS is an automated theorem prover for first-order logic with equality.
@@ -19,3 +46,20 @@ class SpassParser(OutputParser):
         elif 'SPASS beiseite: Completion found' in stdout:
             return SATStatus.UNSATISFIABLE
         return SATStatus.UNKOWN
+
+    @staticmethod
+    def parse_metrics(stdout: Optional[str], stderr: Optional[str]) -> Optional[SpassMetrics]:
+        """SPASS statistics:
+        SPASS derived 7 clauses, backtracked 0 clauses, performed 0 splits and kept 12 clauses.
+        SPASS allocated 85056 KBytes.
+        SPASS spent	0:00:00.03 on the problem.
+                0:00:00.01 for the input.
+                0:00:00.00 for the FLOTTER CNF translation.
+                0:00:00.00 for inferences.
+                0:00:00.00 for the backtracking.
+                0:00:00.00 for the reduction.
+        """
+        metrics = scan_metrics(_scanner, stdout, SpassMetrics(), _converters)
+        if metrics is not None and metrics.derived is not None and metrics.total_time:
+            metrics.clauses_per_second = metrics.derived / metrics.total_time
+        return metrics
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import os
+import re
+import threading
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Union, Optional
+from typing import Union, Optional, Pattern, Dict, Callable, Any, List, Tuple, ClassVar, NoReturn
+
+from src.log import get_logger
+from src.statistics.stats import SATStatus
+
+logger = get_logger()
 
 
 class StatisticParser(ABC):
@@ -13,11 +22,40 @@ class StatisticParser(ABC):
 
 
 class OutputParser(ABC):
+    verdict_pattern: ClassVar[Optional[Pattern]] = None
+    """output line that announces result of search, time of its first occurrence is recorded"""
+
     @staticmethod
     @abstractmethod
     def parse_output(returncode: int, stdout: Optional[str], stderr: Optional[str]) -> SATStatus:
         pass
 
+    @staticmethod
+    def parse_metrics(stdout: Optional[str], stderr: Optional[str]) -> Optional[SolverMetrics]:
+        """Search statistics printed by solver, None if solver does not print them"""
+        return None
+
+
+def scan_metrics(scanner: Pattern, text: Optional[str], metrics: SolverMetrics,
+                 converters: Dict[str, Callable[[str], Any]] = None) -> Optional[SolverMetrics]:
+    """Set attributes of metrics from named groups of scanner matches, text is scanned once (last value wins)
+    values are converted to int or float unless there is converter for the group
+    :return: metrics or None if scanner did not match
+    """
+    converters = converters or {}
+    matched = False
+    for match in scanner.finditer(text or ''):
+        matched = True
+        for name, value in match.groupdict().items():
+            if value is None:
+                continue
+            if name in converters:
+                value = converters[name](value)
+            else:
+                value = int(value) if value.isdigit() else float(value)
+            setattr(metrics, name, value)
+    return metrics if matched else None
+
 
 class Formats(Enum):
     TPTP = 'tptp'
@@ -32,37 +70,150 @@ class Solvers(Enum):
     INKRESAT = 'inkresat'
 
 
+@dataclass
+class OutputRule:
+    """Output matching pattern means status, rule can be limited to return code"""
+    pattern: Pattern
+    status: SATStatus
+    stream: str = 'stdout'
+    """stdout, stderr or both"""
+    returncode: Optional[int] = None
+
+    streams: ClassVar[List[str]] = ['stdout', 'stderr', 'both']
+
+
+@dataclass
+class RuleOutputParser(OutputParser):
+    """Parser of solver defined in config by rules, first matching rule sets status"""
+    rules: List[OutputRule] = field(default_factory=list)
+    default: SATStatus = SATStatus.UNKOWN
+    verdict_pattern: Optional[Pattern] = None
+
+    def parse_output(self, returncode: int, stdout: Optional[str], stderr: Optional[str]) -> SATStatus:
+        for rule in self.rules:
+            if rule.returncode is not None and rule.returncode != returncode:
+                continue
+            if rule.stream in ('stdout', 'both') and rule.pattern.search(stdout or '') \
+                    or rule.stream in ('stderr', 'both') and rule.pattern.search(stderr or ''):
+                return rule.status
+        return self.default
+
+
+@dataclass
+class ParserRegistry:
+    """Parsers of solvers (by name) and of input formats, filled once with built-in parsers,
+    parsers of installed plugins (entry points) and parsers registered by config
+    solver is looked up by name, by basename of executable and by executable patterns
+    """
+    output_parsers: Dict[str, OutputParser] = field(default_factory=dict)
+    statistics_parsers: Dict[str, StatisticParser] = field(default_factory=dict)
+    executable_patterns: List[Tuple[Pattern, str]] = field(default_factory=list)
+    """(pattern of executable basename, solver name), later registered patterns are tried first"""
+    _resolved: Dict[str, Optional[OutputParser]] = field(default_factory=dict, repr=False)
+
+    output_entry_point: ClassVar[str] = 'provers_benchmark.output_parsers'
+    statistics_entry_point: ClassVar[str] = 'provers_benchmark.statistics_parsers'
+
+    def register_output_parser(self, solver: str, parser: OutputParser, executable_pattern: str = None) -> NoReturn:
+        self.output_parsers[solver.lower()] = parser
+        if executable_pattern is not None:
+            self.executable_patterns.insert(0, (re.compile(executable_pattern, re.IGNORECASE), solver.lower()))
+        self._resolved.clear()
+
+    def register_statistics_parser(self, format_name: str, parser: Optional[StatisticParser]) -> NoReturn:
+        self.statistics_parsers[format_name.lower()] = parser
+
+    def output_parser(self, solver: str) -> Optional[OutputParser]:
+        if solver not in self._resolved:
+            self._resolved[solver] = self._output_parser(solver)
+        return self._resolved[solver]
+
+    def _output_parser(self, solver: str) -> Optional[OutputParser]:
+        name = solver.lower()
+        if name in self.output_parsers:
+            return self.output_parsers[name]
+        basename = os.path.basename(name)
+        if basename in self.output_parsers:
+            return self.output_parsers[basename]
+        for pattern, pattern_solver in self.executable_patterns:
+            if pattern.fullmatch(basename):
+                return self.output_parsers[pattern_solver]
+        return None
+
+    def state(self) -> tuple:
+        """Copy of registered parsers, see restore()"""
+        return dict(self.output_parsers), dict(self.statistics_parsers), list(self.executable_patterns)
+
+    def restore(self, state: tuple) -> NoReturn:
+        """Registered parsers are replaced by state() taken earlier, e.g. solvers of other config are removed"""
+        output_parsers, statistics_parsers, executable_patterns = state
+        self.output_parsers.clear()
+        self.output_parsers.update(output_parsers)
+        self.statistics_parsers.clear()
+        self.statistics_parsers.update(statistics_parsers)
+        self.executable_patterns[:] = executable_patterns
+        self._resolved.clear()
+
+    def load_entry_points(self) -> NoReturn:
+        """Register parsers of installed plugins, entry point name is solver (format) name"""
+        for group, register in ((ParserRegistry.output_entry_point, self.register_output_parser),
+                                (ParserRegistry.statistics_entry_point, self.register_statistics_parser)):
+            for entry_point in _entry_points(group):
+                try:
+                    register(entry_point.name, entry_point.load())
+                except Exception as e:
+                    logger.warning(f'Parser plugin {entry_point.name} of {group} could not be loaded: {e}')
+
+
+def _entry_points(group: str) -> list:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return []
+        return list(iter_entry_points(group))
+    entry_points = entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+
+_registry: Optional[ParserRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ParserRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from src.parsers.statistics_parsers.tptp_parser import TPTPParser
+            from src.parsers.statistics_parsers.inkresat_cnf_json_parser import InkresatCNFPTLStatisticParser
+            from src.parsers.output_parsers.prover9_parser import Prover9Parser
+            from src.parsers.output_parsers.spass_parser import SpassParser
+            from src.parsers.output_parsers.inkresat_parser import InkresatParser
+            registry = ParserRegistry()
+            registry.register_statistics_parser(Formats.TPTP.value, TPTPParser)
+            registry.register_statistics_parser(Formats.LADR.value, None)
+            registry.register_statistics_parser(Formats.INKRESAT.value, InkresatCNFPTLStatisticParser)
+            # executables are often named with version (SPASS-3.9, prover9-2009-11A)
+            registry.register_output_parser(Solvers.PROVER9.value, Prover9Parser, r'prover9([-_.].*)?')
+            registry.register_output_parser(Solvers.SPASS.value, SpassParser, r'spass([-_.]?[0-9].*)?')
+            registry.register_output_parser(Solvers.INKRESAT.value, InkresatParser, r'inkresat([-_.].*)?')
+            registry.load_entry_points()
+            _registry = registry
+        return _registry
+
+
 def get_statistics_parser(format_name: Union[str, Formats]) -> Optional[InputParser]:
-    format_name = format_name.lower()
-    from src.parsers.statistics_parsers.tptp_parser import TPTPParser
-    from src.parsers.statistics_parsers.inkresat_cnf_json_parser import InkresatCNFPTLStatisticParser
-    __format_info_lookup = {
-        Formats.TPTP: TPTPParser,
-        Formats.TPTP.value: TPTPParser,
-        Formats.LADR: None,
-        Formats.LADR.value: None,
-        Formats.INKRESAT: InkresatCNFPTLStatisticParser,
-        Formats.INKRESAT.value: InkresatCNFPTLStatisticParser,
-    }
-    key = format_name
-    if isinstance(key, str):
-        key = format_name.lower()
-    return __format_info_lookup.get(key)
+    if isinstance(format_name, Formats):
+        format_name = format_name.value
+    return get_registry().statistics_parsers.get(format_name.lower())
 
 
 def get_output_parser(solver: Union[str, Solvers]) -> Optional[OutputParser]:
-    from src.parsers.output_parsers.prover9_parser import Prover9Parser
-    from src.parsers.output_parsers.spass_parser import SpassParser
-    from src.parsers.output_parsers.inkresat_parser import InkresatParser
-    __solvers_lookup_table = {
-        Solvers.PROVER9: Prover9Parser,
-        Solvers.PROVER9.value: Prover9Parser,
-        Solvers.SPASS: SpassParser,
-        Solvers.SPASS.value: SpassParser,
-        Solvers.INKRESAT: InkresatParser,
-        Solvers.INKRESAT.value: InkresatParser,
-    }
-    key = solver
-    if isinstance(key, str):
-        key = solver.lower()
-    return __solvers_lookup_table.get(key)
+    """Parser of solver given by name or executable (path)"""
+    if isinstance(solver, Solvers):
+        solver = solver.value
+    return get_registry().output_parser(solver)
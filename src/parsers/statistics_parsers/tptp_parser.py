@@ -1,16 +1,148 @@
+"""TPTP statistics
+
+Statistics are read from JSON file (written by formula generator) or counted from formulas.
+include() directives are resolved against directory of including file and then TPTP root.
+Included axiom files are parsed once, their counts are kept in memory and persisted to cache_dir,
+statistics of problems are composed from counts of problem formulas and counts of included files.
+"""
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple, Iterator, ClassVar, NoReturn, Callable
 
+from src import input_files
+from src.log import get_logger
 from src.parsers.parsers import StatisticParser
 from src.statistics.stats import ConjunctiveNormalFormFirstOrderLogicSATStatistics, SATType
 
+logger = get_logger()
+
+_token = re.compile(r"""
+    (?P<skip>\s+|%[^\n]*|/\*.*?\*/)
+    | (?P<token>'(?:[^'\\]|\\.)*'
+        | "(?:[^"\\]|\\.)*"
+        | [+-]?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?(?:/[0-9]+)?
+        | \$*[A-Za-z0-9_]+
+        | <=>|<~>|=>|<=|~\||~&|!=|!>|\?\*|-->|:=
+        | \S)
+""", re.VERBOSE | re.DOTALL)
+
+# most expressive language of problem determines its type
+_languages = {'cnf': SATType.CNF, 'fof': SATType.FOF, 'tff': SATType.TFF, 'thf': SATType.THF}
+
+
+@dataclass
+class TPTPCounts:
+    """Counts of TPTP formulas, counts of more formulas are summed and their symbols merged
+    only cnf and fof formulas are counted in detail, other languages only by number of formulas
+    """
+    formulas: Dict[str, int] = field(default_factory=dict)
+    """Dict[language, number of formulas]"""
+    number_of_atoms: int = 0
+    number_of_variables: int = 0
+    """distinct variables of every formula"""
+    clause_lengths: Dict[int, int] = field(default_factory=dict)
+    term_instances_depths: Dict[int, int] = field(default_factory=dict)
+    """Dict[depth, number of atom arguments with this depth], constant and variable has depth 1"""
+    predicates: Set[Tuple[str, int]] = field(default_factory=set)
+    functors: Set[Tuple[str, int]] = field(default_factory=set)
+
+    def add(self, other: TPTPCounts) -> NoReturn:
+        for counts, other_counts in ((self.formulas, other.formulas),
+                                     (self.clause_lengths, other.clause_lengths),
+                                     (self.term_instances_depths, other.term_instances_depths)):
+            for key, value in other_counts.items():
+                counts[key] = counts.get(key, 0) + value
+        self.number_of_atoms += other.number_of_atoms
+        self.number_of_variables += other.number_of_variables
+        self.predicates |= other.predicates
+        self.functors |= other.functors
+
+    def to_dict(self) -> dict:
+        return {'formulas': self.formulas, 'number_of_atoms': self.number_of_atoms,
+                'number_of_variables': self.number_of_variables,
+                'clause_lengths': list(self.clause_lengths.items()),
+                'term_instances_depths': list(self.term_instances_depths.items()),
+                'predicates': sorted(self.predicates), 'functors': sorted(self.functors)}
+
+    @staticmethod
+    def from_dict(counts: dict) -> TPTPCounts:
+        return TPTPCounts(formulas=counts['formulas'], number_of_atoms=counts['number_of_atoms'],
+                          number_of_variables=counts['number_of_variables'],
+                          clause_lengths=dict(counts['clause_lengths']),
+                          term_instances_depths=dict(counts['term_instances_depths']),
+                          predicates={tuple(symbol) for symbol in counts['predicates']},
+                          functors={tuple(symbol) for symbol in counts['functors']})
+
+
+@dataclass
+class TPTPFile:
+    """Parsed TPTP file"""
+    path: str
+    size: int = None
+    mtime: int = None
+    includes: List[Tuple[str, Optional[List[str]]]] = field(default_factory=list)
+    """(file name, names of selected formulas or None for all formulas) of every include directive"""
+    formulas: List[Tuple[str, TPTPCounts]] = field(default_factory=list)
+    """(name, counts) of every formula"""
+    total: TPTPCounts = field(default_factory=TPTPCounts)
+
+    @staticmethod
+    def parse(path: str, text: str) -> TPTPFile:
+        tptp_file = TPTPFile(path=path)
+        for _, _, tokens in _statements(text):
+            try:
+                if tokens[0] == 'include':
+                    tptp_file.includes.append(_include(tokens))
+                    continue
+                name, formula = _annotated_formula(tokens)
+            except (IndexError, ValueError):
+                logger.warning(f"Skipping malformed TPTP statement {' '.join(tokens[:8])}... in {path}")
+                continue
+            try:
+                counts = _count_formula(tokens[0], formula)
+            except (IndexError, ValueError):
+                logger.debug(f'Formula {name} in {path} could not be counted')
+                counts = TPTPCounts(formulas={tokens[0]: 1})
+            tptp_file.formulas.append((name, counts))
+            tptp_file.total.add(counts)
+        return tptp_file
+
+    def to_dict(self) -> dict:
+        return {'path': self.path, 'size': self.size, 'mtime': self.mtime, 'includes': self.includes,
+                'formulas': [(name, counts.to_dict()) for name, counts in self.formulas]}
+
+    @staticmethod
+    def from_dict(tptp_file: dict) -> TPTPFile:
+        parsed = TPTPFile(path=tptp_file['path'], size=tptp_file['size'], mtime=tptp_file['mtime'],
+                          includes=[(name, selection) for name, selection in tptp_file['includes']])
+        for name, counts in tptp_file['formulas']:
+            counts = TPTPCounts.from_dict(counts)
+            parsed.formulas.append((name, counts))
+            parsed.total.add(counts)
+        return parsed
+
 
 class TPTPParser(StatisticParser):
+    tptp_root: ClassVar[Optional[str]] = os.environ.get('TPTP')
+    """directory include() is resolved against when file is not found next to including file"""
+    cache_dir: ClassVar[Optional[str]] = None
+    """directory parsed axiom files are persisted to, they are only kept in memory if None"""
+
+    _axioms: ClassVar[Dict[str, TPTPFile]] = {}
+    _flattened_axioms: ClassVar[Dict[Tuple[str, Optional[tuple]], str]] = {}
+    # parsing is CPU bound, one lock only prevents parsing the same axiom file by more threads
+    _axioms_lock: ClassVar[threading.RLock] = threading.RLock()
+
     @staticmethod
     def get_file_input_statistics(file_path: str) -> ConjunctiveNormalFormFirstOrderLogicSATStatistics:
-        assert file_path.endswith('.json'), 'expected json files for statistics'
+        if not file_path.endswith('.json'):
+            return TPTPParser.get_formula_statistics(file_path)
         with open(file_path, 'r') as fp:
             dict = json.load(fp)
         stats = ConjunctiveNormalFormFirstOrderLogicSATStatistics()
@@ -22,6 +154,185 @@ class TPTPParser(StatisticParser):
                 setattr(stats, key, val)
         return stats
 
+    @staticmethod
+    def get_formula_statistics(file_path: str) -> ConjunctiveNormalFormFirstOrderLogicSATStatistics:
+        """Count formulas of problem together with formulas of included files"""
+        problem = TPTPFile.parse(file_path, input_files.read_input(file_path).decode())
+        counts = TPTPCounts()
+        counts.add(problem.total)
+        included, unresolved = [], []
+        TPTPParser._add_includes(counts, problem, included, unresolved, set())
+
+        stats = ConjunctiveNormalFormFirstOrderLogicSATStatistics()
+        languages = [language for language in _languages if language in counts.formulas]
+        stats.SAT_type = _languages[languages[-1]] if languages else None
+        stats.number_of_formulas = sum(counts.formulas.values())
+        stats.number_of_clauses = counts.formulas.get('cnf', 0)
+        stats.number_of_atoms = counts.number_of_atoms
+        stats.clause_lengths = dict(sorted(counts.clause_lengths.items()))
+        stats.number_of_predicates = len(counts.predicates)
+        stats.predicate_arities = _arities(counts.predicates)
+        stats.number_of_functors = len(counts.functors)
+        stats.functor_arities = _arities(counts.functors)
+        stats.number_of_variables = counts.number_of_variables
+        stats.term_instances_depths = dict(sorted(counts.term_instances_depths.items()))
+        stats.included_files = included
+        if unresolved:
+            stats.unresolved_includes = unresolved
+        return stats
+
+    @staticmethod
+    def resolve_include(name: str, including_path: str) -> Optional[str]:
+        """Path of included file, it is looked up next to including file, then in tptp_root"""
+        directories = [os.path.dirname(including_path)]
+        if TPTPParser.tptp_root:
+            directories.append(TPTPParser.tptp_root)
+        for directory in directories:
+            path = os.path.normpath(os.path.join(directory, name))
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def axiom_file(path: str) -> TPTPFile:
+        """Parsed included file, it is parsed again only if it changed"""
+        stat = os.stat(path)
+        with TPTPParser._axioms_lock:
+            axioms = TPTPParser._axioms.get(path)
+            if axioms is None or axioms.size != stat.st_size or axioms.mtime != stat.st_mtime_ns:
+                axioms = TPTPParser._load_axioms(path, stat)
+                TPTPParser._axioms[path] = axioms
+            return axioms
+
+    @staticmethod
+    def flatten(file_path: str, out_file_path: str) -> NoReturn:
+        """Write copy of problem with include directives replaced by included formulas"""
+        text = input_files.read_input(file_path).decode()
+        with open(out_file_path, 'w') as fp:
+            fp.write(TPTPParser._flatten_text(text, file_path, [file_path]))
+
+    @staticmethod
+    def canonical_hash(file_path: str) -> str:
+        """Hash that is equal for problems that differ only by names of symbols and variables
+        and by order of clauses and literals, other formulas than cnf have to be equal token by token
+        (with the same language and role, conjecture is not axiom)
+        equal hashes mean equivalent problems, some equivalent problems (with symmetric symbols) can get different hashes
+        """
+        text = input_files.read_input(file_path).decode()
+        clauses, others, includes = [], [], []
+        for _, _, tokens in _statements(text):
+            try:
+                if tokens[0] == 'include':
+                    name, selection = _include(tokens)
+                    path = TPTPParser.resolve_include(name, file_path)
+                    includes.append(f"{path or name} {sorted(selection) if selection is not None else ''}")
+                    continue
+                _, formula = _annotated_formula(tokens)
+                if tokens[0] == 'cnf':
+                    clauses.append(_clause(formula))
+                    continue
+                # language and role
+                formula = tokens[0:1] + tokens[4:5] + formula
+            except (IndexError, ValueError):
+                formula = tokens
+            others.append(' '.join(formula))
+        digest = hashlib.blake2b(digest_size=16)
+        for part in [_canonical_clauses(clauses)] + sorted(others) + sorted(includes):
+            digest.update(part.encode())
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    @staticmethod
+    def _add_includes(counts: TPTPCounts, tptp_file: TPTPFile, included: List[str], unresolved: List[str],
+                      fully_included: Set[str]):
+        for name, selection in tptp_file.includes:
+            path = TPTPParser.resolve_include(name, tptp_file.path)
+            if path is None:
+                logger.warning(f"Included file '{name}' of {tptp_file.path} not found "
+                               f"(TPTP root is {TPTPParser.tptp_root})")
+                unresolved.append(name)
+                continue
+            if path in fully_included:
+                continue
+            if path not in included:
+                included.append(path)
+            axioms = TPTPParser.axiom_file(path)
+            if selection is None:
+                fully_included.add(path)
+                counts.add(axioms.total)
+                TPTPParser._add_includes(counts, axioms, included, unresolved, fully_included)
+            else:
+                for formula_name, formula_counts in axioms.formulas:
+                    if formula_name in selection:
+                        counts.add(formula_counts)
+
+    @staticmethod
+    def _load_axioms(path: str, stat: os.stat_result) -> TPTPFile:
+        cache_path = None
+        if TPTPParser.cache_dir is not None:
+            cache_path = os.path.join(TPTPParser.cache_dir,
+                                      hashlib.blake2b(path.encode(), digest_size=8).hexdigest() + '.json')
+            try:
+                with open(cache_path, 'r') as fp:
+                    axioms = TPTPFile.from_dict(json.load(fp))
+                if axioms.path == path and axioms.size == stat.st_size and axioms.mtime == stat.st_mtime_ns:
+                    return axioms
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        logger.info(f'Parsing included file {path}')
+        with open(path, 'r') as fp:
+            axioms = TPTPFile.parse(path, fp.read())
+        axioms.size, axioms.mtime = stat.st_size, stat.st_mtime_ns
+        if cache_path is not None:
+            try:
+                os.makedirs(TPTPParser.cache_dir, exist_ok=True)
+                tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w') as fp:
+                    json.dump(axioms.to_dict(), fp)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f'Parsed included file could not be cached: {e}')
+        return axioms
+
+    @staticmethod
+    def _flatten_text(text: str, path: str, stack: List[str]) -> str:
+        """Text with include directives replaced, stack holds files being flattened (to stop include cycles)"""
+        pieces = []
+        position = 0
+        for start, end, tokens in _statements(text):
+            if tokens[0] != 'include':
+                continue
+            pieces.append(text[position:start])
+            position = end
+            name, selection = _include(tokens)
+            included_path = TPTPParser.resolve_include(name, path)
+            if included_path is None or included_path in stack:
+                logger.warning(f"Included file '{name}' of {path} not found or included recursively, "
+                               f"it is kept as include")
+                pieces.append(text[start:end])
+                continue
+            pieces.append(f'% {text[start:end]}\n')
+            pieces.append(TPTPParser._flattened_axiom_text(included_path, selection, stack))
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+    @staticmethod
+    def _flattened_axiom_text(path: str, selection: Optional[List[str]], stack: List[str]) -> str:
+        key = path, None if selection is None else tuple(selection)
+        with TPTPParser._axioms_lock:
+            if key not in TPTPParser._flattened_axioms:
+                with open(path, 'r') as fp:
+                    text = fp.read()
+                if selection is None:
+                    flattened = TPTPParser._flatten_text(text, path, stack + [path])
+                else:
+                    flattened = '\n'.join(text[start:end] for start, end, tokens in _statements(text)
+                                           if tokens[0] != 'include'
+                                           and _unquote(tokens[2]) in selection)
+                TPTPParser._flattened_axioms[key] = flattened.rstrip('\n') + '\n'
+            return TPTPParser._flattened_axioms[key]
+
     def get_statistics_based_on_fomula(self, file_path: str):
         """depracated
 
@@ -95,3 +406,277 @@ class TPTPParser(StatisticParser):
             result = re.search(pattern, file_contens)
             stats.total_number_of_variables = result.group(1) if result is not None else None
         return stats
+
+
+def _statements(text: str) -> Iterator[Tuple[int, int, List[str]]]:
+    """(start, end, tokens) of every statement (annotated formula or include) of TPTP text"""
+    tokens = []
+    depth = 0
+    start = None
+    for match in _token.finditer(text):
+        token = match.group('token')
+        if token is None:
+            continue
+        if start is None:
+            start = match.start()
+        tokens.append(token)
+        if token in ('(', '['):
+            depth += 1
+        elif token in (')', ']'):
+            depth -= 1
+        elif token == '.' and depth == 0:
+            yield start, match.end(), tokens
+            tokens = []
+            start = None
+
+
+def _unquote(token: str) -> str:
+    if len(token) > 1 and token[0] == token[-1] == "'":
+        return re.sub(r"\\(.)", r"\1", token[1:-1])
+    return token
+
+
+def _include(tokens: List[str]) -> Tuple[str, Optional[List[str]]]:
+    """include('file', [formula names]). -> ('file', [formula names] or None)"""
+    if tokens[1] != '(':
+        raise ValueError(tokens)
+    name = _unquote(tokens[2])
+    if tokens[3] == ',' and tokens[4] == '[':
+        end = tokens.index(']', 4)
+        return name, [_unquote(token) for token in tokens[5:end] if token != ',']
+    return name, None
+
+
+def _annotated_formula(tokens: List[str]) -> Tuple[str, List[str]]:
+    """language(name, role, formula, annotations). -> (name, formula tokens)"""
+    if tokens[1] != '(' or tokens[3] != ',' or tokens[5] != ',':
+        raise ValueError(tokens)
+    depth = 0
+    for end in range(6, len(tokens)):
+        if tokens[end] in ('(', '['):
+            depth += 1
+        elif tokens[end] in (')', ']'):
+            if depth == 0:
+                break
+            depth -= 1
+        elif tokens[end] == ',' and depth == 0:
+            break
+    else:
+        raise ValueError(tokens)
+    return _unquote(tokens[2]), tokens[6:end]
+
+
+def _is_variable(token: str) -> bool:
+    return token[0].isupper()
+
+
+def _is_term(token: str) -> bool:
+    return token[0].isalnum() or token[0] in '\'"$' or len(token) > 1 and token[0] in '+-' and token[1].isdigit()
+
+
+def _arguments(tokens: List[str], i: int, functors: Set[Tuple[str, int]], variables: Set[str]
+               ) -> Tuple[int, List[int]]:
+    """Parse arguments after symbol at i - 1, :return: index after arguments and depths of arguments"""
+    depths = []
+    if i < len(tokens) and tokens[i] == '(':
+        i += 1
+        while True:
+            i, depth = _term(tokens, i, functors, variables)
+            depths.append(depth)
+            if tokens[i] == ')':
+                return i + 1, depths
+            if tokens[i] != ',':
+                raise ValueError(tokens[i])
+            i += 1
+    return i, depths
+
+
+def _term(tokens: List[str], i: int, functors: Set[Tuple[str, int]], variables: Set[str]) -> Tuple[int, int]:
+    """:return: index after term and its depth"""
+    token = tokens[i]
+    if not _is_term(token):
+        raise ValueError(token)
+    if _is_variable(token):
+        variables.add(token)
+        return i + 1, 1
+    i, depths = _arguments(tokens, i + 1, functors, variables)
+    functors.add((token, len(depths)))
+    return i, 1 + max(depths, default=0)
+
+
+def _count_formula(language: str, tokens: List[str]) -> TPTPCounts:
+    counts = TPTPCounts(formulas={language: 1})
+    if language not in ('cnf', 'fof'):
+        return counts
+    variables = set()
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ('!', '?') and i + 1 < len(tokens) and tokens[i + 1] == '[':
+            end = tokens.index(']', i)
+            variables.update(variable for variable in tokens[i + 2:end] if _is_variable(variable))
+            i = end + 1
+            continue
+        if not _is_term(token):
+            i += 1
+            continue
+        i, depths = _arguments(tokens, i + 1, counts.functors, variables)
+        if i < len(tokens) and tokens[i] in ('=', '!='):
+            if _is_variable(token):
+                variables.add(token)
+            else:
+                counts.functors.add((token, len(depths)))
+            left_depth = 1 + max(depths, default=0)
+            i, right_depth = _term(tokens, i + 1, counts.functors, variables)
+            counts.predicates.add(('=', 2))
+            depths = [left_depth, right_depth]
+        else:
+            counts.predicates.add((token, len(depths)))
+        counts.number_of_atoms += 1
+        for depth in depths:
+            counts.term_instances_depths[depth] = counts.term_instances_depths.get(depth, 0) + 1
+    counts.number_of_variables = len(variables)
+    if language == 'cnf':
+        counts.clause_lengths = {counts.number_of_atoms: 1}
+    return counts
+
+
+def _term_tree(tokens: List[str], i: int) -> Tuple[int, tuple]:
+    """:return: index after term and term as (variable name,) or (symbol, arguments)"""
+    token = tokens[i]
+    if not _is_term(token):
+        raise ValueError(token)
+    if _is_variable(token):
+        return i + 1, (token,)
+    arguments = []
+    i += 1
+    if i < len(tokens) and tokens[i] == '(':
+        i += 1
+        while True:
+            i, argument = _term_tree(tokens, i)
+            arguments.append(argument)
+            if tokens[i] == ')':
+                i += 1
+                break
+            if tokens[i] != ',':
+                raise ValueError(tokens[i])
+            i += 1
+    return i, (token, tuple(arguments))
+
+
+def _clause(tokens: List[str]) -> List[Tuple[bool, tuple]]:
+    """Literals of cnf formula as (positive, atom), equality atom is ('=', (left, right))"""
+    literals = []
+    positive = True
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == '~':
+            positive = not positive
+            i += 1
+            continue
+        if token in ('(', ')', '|'):
+            i += 1
+            continue
+        i, atom = _term_tree(tokens, i)
+        if i < len(tokens) and tokens[i] in ('=', '!='):
+            if tokens[i] == '!=':
+                positive = not positive
+            i, right = _term_tree(tokens, i + 1)
+            atom = ('=', (atom, right))
+        literals.append((positive, atom))
+        positive = True
+    return literals
+
+
+def _is_interpreted(symbol: str) -> bool:
+    """Symbols that have meaning and can not be renamed (equality, $true, distinct objects, numbers)"""
+    return symbol == '=' or symbol[0] in '$"+-' or symbol[0].isdigit()
+
+
+def _encode(term: tuple, names: Callable[[str, int, bool], str], variables: Callable[[str], str],
+            predicate: bool = False) -> str:
+    if len(term) == 1:
+        return variables(term[0])
+    symbol, arguments = term
+    name = names(symbol, len(arguments), predicate)
+    if not arguments:
+        return name
+    return f"{name}({','.join(_encode(argument, names, variables) for argument in arguments)})"
+
+
+def _encode_literal(literal: Tuple[bool, tuple], names: Callable[[str, int, bool], str],
+                    variables: Callable[[str], str]) -> str:
+    positive, atom = literal
+    return ('' if positive else '~') + _encode(atom, names, variables, predicate=True)
+
+
+def _symbols(term: tuple, predicate: bool = False) -> Iterator[Tuple[str, int, bool]]:
+    if len(term) == 1:
+        return
+    symbol, arguments = term
+    yield symbol, len(arguments), predicate
+    for argument in arguments:
+        yield from _symbols(argument)
+
+
+def _canonical_clauses(clauses: List[List[Tuple[bool, tuple]]], rounds: int = 2) -> str:
+    """Text of clauses with symbols and variables renamed and clauses and literals sorted
+    symbols are first told apart by their occurrences (color refinement), literals and clauses are sorted by
+    colors, then symbols and variables are named in order of their first occurrence
+    """
+    def anonymous(_):
+        return '_'
+
+    colors = {}
+    for clause in clauses:
+        for _, atom in clause:
+            for symbol in _symbols(atom, predicate=True):
+                colors[symbol] = f'{"p" if symbol[2] else "f"}{symbol[1]}'
+    for _ in range(rounds):
+        signatures = {symbol: [] for symbol in colors}
+        for clause in clauses:
+            for literal in clause:
+                for marked in set(_symbols(literal[1], predicate=True)):
+                    signatures[marked].append(_encode_literal(
+                        literal, lambda *symbol: '*' if symbol == marked else colors[symbol], anonymous))
+        colors = {symbol: hashlib.blake2b(f"{colors[symbol]}|{'|'.join(sorted(signature))}".encode(),
+                                          digest_size=6).hexdigest()
+                  for symbol, signature in signatures.items()}
+
+    def colored(symbol, arity, predicate):
+        return symbol if _is_interpreted(symbol) else colors[symbol, arity, predicate]
+
+    ordered = []
+    for clause in clauses:
+        clause = sorted(clause, key=lambda literal: _encode_literal(literal, colored, anonymous))
+        variables = {}
+        key = ' | '.join(_encode_literal(literal, colored,
+                                         lambda variable: variables.setdefault(variable, f'X{len(variables)}'))
+                         for literal in clause)
+        ordered.append((key, clause))
+    ordered.sort(key=lambda keyed: keyed[0])
+
+    names = {}
+
+    def named(symbol, arity, predicate):
+        if _is_interpreted(symbol):
+            return symbol
+        return names.setdefault((symbol, arity, predicate), f'{"p" if predicate else "f"}{len(names)}')
+
+    canonical = []
+    for _, clause in ordered:
+        variables = {}
+        canonical.append(' | '.join(_encode_literal(literal, named,
+                                                    lambda variable: variables.setdefault(variable,
+                                                                                          f'X{len(variables)}'))
+                                    for literal in clause))
+    return '\n'.join(sorted(canonical))
+
+
+def _arities(symbols: Set[Tuple[str, int]]) -> Dict[int, int]:
+    """Dict[arity, number of symbols with this arity]"""
+    arities = {}
+    for _, arity in symbols:
+        arities[arity] = arities.get(arity, 0) + 1
+    return dict(sorted(arities.items()))
@@ -0,0 +1,147 @@
+"""Benchmark plan: jobs expanded from config with identical commands deduplicated and cost estimated
+
+Jobs are identical when they run the same executable (with the same PATH and output parser) with the same
+command on the same file (after translation) and capture the same output, e.g. test runs with the same options or file matched by globs
+of two test inputs. Only the first of identical jobs is run, the others (aliases) get copy of its result.
+Jobs of sweeps are never aliased, their configurations are run in rounds.
+Run time of every job is estimated from previous benchmark output (history), with timeout ladder job takes
+every step it times out in. Job without history takes mean of its test run in history, or all timeouts.
+Jobs run on one core each, so cpu hours are sum of run times of jobs that are run.
+Compiling plan does not write files, paths of translated files are computed and files are translated when jobs run.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
+
+from src.log import get_logger
+from src.statistics.stats import SATStatus, PlanStatistics, PlannedJobStatistics
+
+logger = get_logger()
+
+
+@dataclass
+class Plan:
+    jobs: List[Job]
+    aliases: Dict[int, int] = field(default_factory=dict)
+    """Dict[job index, index of identical job that is run]"""
+    estimates: List[Tuple[float, str]] = field(default_factory=list)
+    """(estimated seconds, source of estimate) of every job"""
+    timeout_ladder: List[float] = field(default_factory=list)
+    history: Optional[str] = None
+
+    @staticmethod
+    def compile(test_suites: List[TestSuite], timeout_ladder: List[float], history: Optional[str] = None) -> Plan:
+        """Expand test suites into jobs, find identical jobs and estimate cost of every job
+        :param timeout_ladder: timeouts every job can be run with (in order)
+        :param history: output of previous benchmark (statistics JSON)
+        """
+        jobs = [job for test_suite in test_suites for job in test_suite.jobs()]
+        plan = Plan(jobs=jobs, timeout_ladder=list(timeout_ladder), history=history)
+        first = {}
+        for index, job in enumerate(jobs):
+            if job.test_run.sweep is not None:
+                continue
+            identity = _identity(job)
+            if identity in first:
+                plan.aliases[index] = first[identity]
+            else:
+                first[identity] = index
+
+        past = _load_history(history)
+        means = {key: sum(cost for _, cost in runs.values()) / len(runs) for key, runs in past.items() if runs}
+        for job in jobs:
+            key = job.test_suite.executable, job.test_run.name
+            record = past.get(key, {}).get(job.original_path)
+            if record is not None:
+                status, cost = record
+                plan.estimates.append((plan._ladder_cost(None if status == SATStatus.TIMEOUT.value else cost),
+                                       'history'))
+            elif key in means:
+                plan.estimates.append((plan._ladder_cost(means[key]), 'test run mean'))
+            else:
+                plan.estimates.append((plan._ladder_cost(None), 'timeout'))
+        return plan
+
+    def run_jobs(self) -> List[int]:
+        """Indexes of jobs that are run (not aliases)"""
+        return [index for index in range(len(self.jobs)) if index not in self.aliases]
+
+    def statistics(self, with_jobs: bool = True) -> PlanStatistics:
+        run_jobs = self.run_jobs()
+        statistics = PlanStatistics(jobs=len(self.jobs), run_jobs=len(run_jobs), aliases=len(self.aliases),
+                                    timeout_ladder=self.timeout_ladder, history=self.history,
+                                    estimated_cpu_hours=sum(self.estimates[index][0] for index in run_jobs) / 3600,
+                                    estimated_from_history=sum(self.estimates[index][1] == 'history'
+                                                               for index in run_jobs))
+        if with_jobs:
+            for index, job in enumerate(self.jobs):
+                alias_of = self.aliases.get(index)
+                statistics.planned_jobs.append(PlannedJobStatistics(
+                    index=index, test_suite=job.test_suite.name, test_run=job.test_run.name,
+                    path=job.original_path, command=_command(job),
+                    alias_of=None if alias_of is None else f'{self.jobs[alias_of].test_suite.name}/'
+                                                           f'{self.jobs[alias_of].test_run.name}',
+                    estimated_time=self.estimates[index][0], estimate=self.estimates[index][1]))
+        return statistics
+
+    def log(self):
+        statistics = self.statistics(with_jobs=False)
+        logger.info(f'Plan: {statistics.jobs} jobs, {statistics.aliases} identical to other jobs, '
+                    f'{statistics.run_jobs} will be run, estimated {statistics.estimated_cpu_hours:.2f} cpu hours '
+                    f'({statistics.estimated_from_history} jobs estimated from history)')
+
+    def table(self) -> str:
+        """Plan as tab separated table"""
+        lines = ['index\ttest suite\ttest run\tfile\testimated seconds\testimate\talias of']
+        for job in self.statistics().planned_jobs:
+            lines.append(f'{job.index}\t{job.test_suite}\t{job.test_run}\t{job.path}\t{job.estimated_time:.1f}\t'
+                         f'{job.estimate}\t{job.alias_of or ""}')
+        return '\n'.join(lines)
+
+    def _ladder_cost(self, time: Optional[float]) -> float:
+        """Time spent on job that finishes after time seconds (None if it times out) by all ladder steps"""
+        cost = 0
+        for timeout in self.timeout_ladder:
+            if time is not None and time <= timeout:
+                return cost + time
+            cost += timeout
+        return cost
+
+
+def _identity(job: Job) -> tuple:
+    test_suite = job.test_suite
+    test_run = job.test_run
+    return (test_suite.executable, test_suite.PATH, test_suite.solver or test_suite.executable,
+            tuple(_command(job, os.path.realpath(job.input_path))),
+            not test_run.input_after_option and not test_run.input_as_last_argument, os.path.realpath(job.input_path),
+            test_suite.capture_stdout)
+
+
+def _command(job: Job, input_path: str = None) -> List[str]:
+    return job.test_run.build_command(executable=job.test_suite.executable,
+                                      input_filepath=input_path or job.input_path,
+                                      suite_options=job.test_suite.options)
+
+
+def _load_history(history: Optional[str]) -> Dict[Tuple[str, str], Dict[str, Tuple[str, float]]]:
+    """Dict[(program name, test run name), Dict[file, (status, execution time)]] of previous benchmark"""
+    if history is None or not os.path.isfile(history):
+        return {}
+    try:
+        with open(history, 'r') as fp:
+            statistics = json.load(fp)
+        past = {}
+        for test_suite in statistics['test_suites']:
+            for test_run in test_suite['test_run']:
+                if test_run['output']['status'] == SATStatus.PRUNED.value:
+                    continue
+                runs = past.setdefault((test_suite['program_name'], test_run['name']), {})
+                runs[test_run['minimal_input_statistics']['path']] = (
+                    test_run['output']['status'], test_run['execution_statistics']['execution_time'])
+        return past
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f'History {history} for plan estimate could not be read: {e}')
+        return {}
@@ -0,0 +1,122 @@
+"""Monotone pruning of problem families
+
+Inputs are grouped into families and ordered by size, size and family are taken from
+generated problem family of test input, from file name (regex with named group size and optionally family)
+or from input statistics (family is test input).
+Job is pruned (recorded as pruned without running it) when every finished instance of the after_timeouts largest
+sizes of its family (of the same test run) that are smaller than it timed out, so several instances of the same
+size are one step and a solved instance of the step keeps larger instances running.
+Jobs run concurrently, so instances that started before smaller ones timed out are not pruned.
+With timeout ladder jobs are pruned in every tier separately, pruned jobs are reconsidered in next tier
+(smaller instances may be solved with longer timeout), only pruning in last tier is final.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, List, Pattern
+
+from src import input_files
+from src.statistics.stats import SATStatus, TestRunStatistics, PruningStatistics, PrunedFamilyStatistics
+
+
+@dataclass
+class Pruning:
+    after_timeouts: int = 2
+    pattern: Optional[Pattern] = None
+    """regex matched against file name, group size is instance size, group family (optional) is family,
+    by default family is file name without size"""
+    size_key: Optional[str] = None
+    """input statistics attribute used as size, e.g. number_of_clauses"""
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._finished: Dict[tuple, Dict[float, bool]] = {}
+        """Dict[family, Dict[size, all finished jobs of the size timed out]] in current tier"""
+        self._groups: Dict[int, Optional[Tuple[tuple, float]]] = {}
+        """cache of group results by job index"""
+        self._pruned: Dict[int, Tuple[tuple, float, float]] = {}
+        """Dict[job index, (family, size, timeout)] of jobs pruned in last tier they were considered in"""
+
+    def reset(self):
+        """Forget jobs of previous benchmark"""
+        with self._lock:
+            self._finished.clear()
+            self._groups.clear()
+            self._pruned.clear()
+
+    def group(self, job: Job) -> Optional[Tuple[tuple, float]]:
+        """(family, size) of job, None if job does not belong to family"""
+        test_input = job.test_input
+        family = size = None
+        if test_input.family is not None and job.original_path in test_input.family.files:
+            family, size = test_input.name, test_input.family.files[job.original_path]
+        elif self.pattern is not None:
+            path = input_files.plain_name(job.original_path)
+            name = os.path.basename(path)
+            match = self.pattern.search(name)
+            if match is not None and match.group('size') is not None:
+                size = float(match.group('size'))
+                if 'family' in self.pattern.groupindex and match.group('family') is not None:
+                    family = os.path.join(os.path.dirname(path), match.group('family'))
+                else:
+                    start, end = match.span('size')
+                    family = os.path.join(os.path.dirname(path), name[:start] + '{size}' + name[end:])
+        elif self.size_key is not None:
+            _, statistics = test_input.get_file_statistics(file_path=job.original_path)
+            value = getattr(statistics, self.size_key, None)
+            if isinstance(value, (int, float)):
+                family, size = test_input.name, value
+        if family is None:
+            return None
+        return (job.test_suite.name, job.test_run.name, family), size
+
+    def order(self, jobs: List[Job], pending: List[int]) -> List[int]:
+        """Start new tier, jobs of families are ordered by size (smaller first), other jobs keep their order"""
+        with self._lock:
+            self._finished.clear()
+            for index in pending:
+                if index not in self._groups:
+                    self._groups[index] = self.group(jobs[index])
+                self._pruned.pop(index, None)
+        return sorted(pending, key=lambda index: self._groups[index][1] if self._groups[index] is not None else 0)
+
+    def prune(self, jobs: List[Job], index: int, timeout: float) -> Optional[TestRunStatistics]:
+        """:return: result of pruned job, None if job should be run"""
+        group = self._groups.get(index)
+        if group is None:
+            return None
+        family, size = group
+        with self._lock:
+            finished = self._finished.get(family, {})
+            smaller = sorted(finished_size for finished_size in finished if finished_size < size)
+            if len(smaller) < self.after_timeouts \
+                    or not all(finished[step] for step in smaller[len(smaller) - self.after_timeouts:]):
+                return None
+            self._pruned[index] = family, size, timeout
+        return jobs[index].pruned(timeout)
+
+    def record(self, index: int, result: TestRunStatistics):
+        """Record finished job"""
+        group = self._groups.get(index)
+        if group is None or result.output.status == SATStatus.PRUNED:
+            return
+        family, size = group
+        with self._lock:
+            steps = self._finished.setdefault(family, {})
+            steps[size] = steps.get(size, True) and result.output.status == SATStatus.TIMEOUT
+
+    def statistics(self) -> PruningStatistics:
+        statistics = PruningStatistics(after_timeouts=self.after_timeouts, pruned_runs=len(self._pruned))
+        families = {}
+        for family, size, timeout in self._pruned.values():
+            statistics.saved_time += timeout
+            if family not in families:
+                families[family] = PrunedFamilyStatistics(test_suite=family[0], test_run=family[1],
+                                                          family=family[2], smallest_pruned_size=size)
+                statistics.families.append(families[family])
+            families[family].pruned_runs += 1
+            families[family].saved_time += timeout
+            families[family].smallest_pruned_size = min(families[family].smallest_pruned_size, size)
+        return statistics
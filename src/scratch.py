@@ -0,0 +1,63 @@
+"""Per-run scratch directories
+
+Every run gets its own empty working directory (also TMPDIR of the process), so files written by solvers
+do not land in the project directory and concurrent runs do not overwrite each other's files.
+Directory is removed after the run. Directories are created in root, e.g. /dev/shm (tmpfs) so runs do not
+compete for disk. Input paths are absolute, but relative paths of TPTP include directives are resolved
+against the scratch directory (use TPTP environment variable or flatten_includes).
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Iterator
+
+from src.errors import BenchmarkException
+
+
+@dataclass
+class Scratch:
+    root: Optional[str] = None
+    """directory scratch directories are created in, system temporary directory if None"""
+    max_size: Optional[int] = None
+    """bytes, run is killed when its scratch directory grows over it and runs that wrote more to disk are flagged"""
+
+    def __post_init__(self):
+        if self.root is not None and not os.path.isdir(self.root):
+            raise BenchmarkException(f'scratch root {self.root} is not a directory', self)
+        if self.max_size is not None and self.max_size <= 0:
+            raise BenchmarkException('scratch max_size should be positive', self)
+
+    @contextmanager
+    def directory(self) -> Iterator[str]:
+        """Create empty scratch directory, it is removed on exit"""
+        path = tempfile.mkdtemp(prefix='run-', dir=self.root)
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def exceeded(self, size: int) -> bool:
+        return self.max_size is not None and size > self.max_size
+
+
+def size(path: str) -> int:
+    """Bytes of files in directory tree, symbolic links are not followed"""
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += size(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    # removed by running process
+                    pass
+    except OSError:
+        pass
+    return total
@@ -0,0 +1,156 @@
+"""Streaming aggregates of results of every (test suite, test run)
+
+Aggregates are updated when result arrives, result of job that is run again (next step of timeout ladder)
+replaces its previous result. Quantiles are estimated by DDSketch (logarithmic buckets with bounded relative
+error), so memory of every aggregate does not depend on number of runs.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple, List
+
+from src.log import get_logger
+from src.statistics.stats import SATStatus, TestRunStatistics, AggregateStatistics, QuantileStatistics
+
+logger = get_logger()
+
+
+class QuantileSketch:
+    """DDSketch, quantile estimate is within relative_accuracy of the exact value (for values above min_value)
+    values can be removed, when there are more than max_buckets buckets, the lowest buckets are merged
+    """
+    __slots__ = ('relative_accuracy', 'max_buckets', '_log_gamma', '_min_index', 'buckets', 'zeros', 'count', 'sum')
+
+    min_value = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._min_index = None
+        """index of the lowest bucket after merging, lower values are counted in it"""
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        """values below min_value"""
+        self.count = 0
+        self.sum = 0
+
+    def add(self, value: float, weight: int = 1):
+        self.count += weight
+        self.sum += value * weight
+        if value < QuantileSketch.min_value:
+            self.zeros += weight
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        if self._min_index is not None and index < self._min_index:
+            index = self._min_index
+        count = self.buckets.get(index, 0) + weight
+        if count:
+            self.buckets[index] = count
+        else:
+            del self.buckets[index]
+        if len(self.buckets) > self.max_buckets:
+            self._merge_lowest()
+
+    def remove(self, value: float):
+        self.add(value, weight=-1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return 2 * math.exp(index * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def statistics(self) -> QuantileStatistics:
+        return QuantileStatistics(count=self.count, mean=self.sum / self.count if self.count > 0 else None,
+                                  p50=self.quantile(0.5), p90=self.quantile(0.9), p99=self.quantile(0.99))
+
+    def _merge_lowest(self):
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+        self._min_index = second
+
+
+class RunAggregate:
+    __slots__ = ('test_suite', 'test_run', 'statuses', 'execution_time', 'cpu_time', 'peak_memory')
+
+    def __init__(self, test_suite: str, test_run: str):
+        self.test_suite = test_suite
+        self.test_run = test_run
+        self.statuses: Dict[str, int] = {}
+        self.execution_time = QuantileSketch()
+        self.cpu_time = QuantileSketch()
+        self.peak_memory = QuantileSketch()
+
+    def add(self, result: TestRunStatistics, weight: int = 1):
+        status = result.output.status.value if result.output.status is not None else 'none'
+        self.statuses[status] = self.statuses.get(status, 0) + weight
+        if not self.statuses[status]:
+            del self.statuses[status]
+        execution_statistics = result.execution_statistics
+        if execution_statistics is None or result.output.status == SATStatus.PRUNED:
+            return
+        self.execution_time.add(execution_statistics.execution_time, weight)
+        if execution_statistics.cpu_time is not None:
+            self.cpu_time.add(execution_statistics.cpu_time[0] + execution_statistics.cpu_time[1], weight)
+        if execution_statistics.peak_memory is not None:
+            self.peak_memory.add(execution_statistics.peak_memory, weight)
+
+    def statistics(self) -> AggregateStatistics:
+        return AggregateStatistics(test_suite=self.test_suite, test_run=self.test_run,
+                                   runs=sum(self.statuses.values()), statuses=dict(self.statuses),
+                                   execution_time=self.execution_time.statistics(),
+                                   cpu_time=self.cpu_time.statistics(), peak_memory=self.peak_memory.statistics())
+
+
+class Aggregator:
+    """Aggregates of results by (test suite name, test run name), snapshot is logged every report_interval seconds"""
+
+    def __init__(self, report_interval: Optional[float] = None):
+        self.report_interval = report_interval
+        self._aggregates: Dict[Tuple[str, str], RunAggregate] = {}
+        self._lock = threading.Lock()
+        self._last_report = time.monotonic()
+
+    def replace(self, test_suite: str, test_run: str, previous: Optional[TestRunStatistics],
+                result: TestRunStatistics):
+        """Add result, previous result of the same job is removed"""
+        with self._lock:
+            key = test_suite, test_run
+            if key not in self._aggregates:
+                self._aggregates[key] = RunAggregate(test_suite=test_suite, test_run=test_run)
+            if previous is not None:
+                self._aggregates[key].add(previous, weight=-1)
+            self._aggregates[key].add(result)
+            report = self.report_interval is not None and time.monotonic() - self._last_report >= self.report_interval
+            if report:
+                self._last_report = time.monotonic()
+        if report:
+            self.report()
+
+    def statistics(self) -> List[AggregateStatistics]:
+        with self._lock:
+            return [aggregate.statistics() for aggregate in self._aggregates.values()]
+
+    def report(self):
+        for aggregate in self.statistics():
+            time_statistics = aggregate.execution_time
+            memory_statistics = aggregate.peak_memory
+            logger.info(f"'{aggregate.test_suite}' '{aggregate.test_run}': {aggregate.runs} runs {aggregate.statuses}, "
+                        f"time p50/p90/p99 {_format(time_statistics, 's')}, "
+                        f"peak memory p50/p90/p99 {_format(memory_statistics, 'MB', 2 ** 20)}")
+
+
+def _format(statistics: QuantileStatistics, unit: str, scale: float = 1) -> str:
+    if statistics.count <= 0:
+        return '-'
+    return '/'.join(f'{value / scale:.2f}' for value in (statistics.p50, statistics.p90, statistics.p99)) + unit
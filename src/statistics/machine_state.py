@@ -0,0 +1,187 @@
+"""State of machine during every run, runs disturbed by other load are flagged with reasons of interference
+
+Snapshot is taken before and after the run from /proc and /sys (Linux only, other systems get empty snapshots):
+steal time and pressure stall information (PSI) are fractions of the run time (only for runs of at least min_window
+seconds, steal is counted in jiffies), other busy processes are runnable processes that are not benchmark jobs
+(maximum of both snapshots, child processes of solvers and threads of benchmark are counted too, so run is flagged
+only when there are more of them than free cores and at least two), frequency and governor are read at the end
+of the run for the core the run was last scheduled on.
+PSI is system wide, so time the threads of benchmark and the benchmark jobs waited for cpu (run delay from schedstat,
+jobs are read on every poll) is subtracted from stall time, only stall of other tasks is left.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Dict
+
+import psutil
+
+from src.statistics.stats import MachineStateStatistics
+
+_active = 0
+"""benchmark jobs running in this process"""
+_active_lock = threading.Lock()
+_logical_cpus = psutil.cpu_count(logical=True) or 1
+_job_delays: Dict[int, int] = {}
+"""Dict[pid of running job, nanoseconds it waited for cpu at last poll]"""
+_finished_delay = 0
+"""nanoseconds finished jobs waited for cpu"""
+_min_jiffies = 100
+"""steal is not computed from fewer jiffies (one jiffy is stolen or not, so short windows are too coarse)"""
+
+
+@dataclass
+class Snapshot:
+    time: float
+    cpu_times: Optional[Tuple[int, int]] = None
+    """(steal, total) jiffies of all cpus"""
+    procs_running: Optional[int] = None
+    pressure: Dict[str, int] = field(default_factory=dict)
+    """Dict[resource, total stall microseconds of some tasks]"""
+    own_delay: Optional[int] = None
+    """nanoseconds threads of benchmark and its jobs waited for cpu"""
+
+
+@dataclass
+class Interference:
+    """Thresholds of interference, run is flagged when some of them is exceeded"""
+    steal: float = 0.05
+    """fraction of cpu time taken by hypervisor"""
+    cpu_pressure: float = 0.2
+    """fraction of run time some tasks waited for cpu (threads of benchmark wait too when it shares core with run)"""
+    memory_pressure: float = 0.1
+    """fraction of run time some tasks waited for memory"""
+    min_frequency: float = 0.8
+    """fraction of maximal frequency of the core"""
+    governors: List[str] = field(default_factory=lambda: ['powersave'])
+    """frequency governors that make timings unreliable"""
+    min_window: float = 0.1
+    """seconds, steal and pressure of shorter runs are not computed"""
+
+    @staticmethod
+    def begin() -> Snapshot:
+        """Snapshot before run, release() should be called when run finishes"""
+        global _active
+        with _active_lock:
+            _active += 1
+        return _snapshot()
+
+    @staticmethod
+    def release():
+        global _active
+        with _active_lock:
+            _active -= 1
+
+    def end(self, start: Snapshot, cpu: Optional[int]) -> MachineStateStatistics:
+        """Snapshot after run compared with snapshot before it (before release)
+        :param cpu: core the run was last scheduled on
+        """
+        end = _snapshot()
+        with _active_lock:
+            concurrent_jobs = _active
+        # this process (taking snapshot) and its running jobs may be runnable
+        own = concurrent_jobs + 1
+        state = MachineStateStatistics(cpu=cpu, concurrent_jobs=concurrent_jobs)
+        if hasattr(os, 'getloadavg'):
+            state.load_average = os.getloadavg()[0]
+        if end.procs_running is not None:
+            state.other_busy_processes = max(0, max(end.procs_running, start.procs_running or 0) - own)
+        if end.time - start.time >= self.min_window:
+            if start.cpu_times is not None and end.cpu_times is not None \
+                    and end.cpu_times[1] - start.cpu_times[1] >= _min_jiffies:
+                state.steal = (end.cpu_times[0] - start.cpu_times[0]) / (end.cpu_times[1] - start.cpu_times[1])
+            wall = (end.time - start.time) * 1e6
+            for resource in end.pressure.keys() & start.pressure.keys():
+                stall = end.pressure[resource] - start.pressure[resource]
+                if resource == 'cpu' and start.own_delay is not None and end.own_delay is not None:
+                    stall -= (end.own_delay - start.own_delay) / 1000
+                setattr(state, f'{resource}_pressure', min(1.0, max(0.0, stall / wall)))
+        if cpu is not None:
+            cpufreq = f'/sys/devices/system/cpu/cpu{cpu}/cpufreq'
+            frequency = _read(os.path.join(cpufreq, 'scaling_cur_freq'))
+            max_frequency = _read(os.path.join(cpufreq, 'cpuinfo_max_freq'))
+            state.cpu_frequency = None if frequency is None else int(frequency) / 1000
+            state.max_cpu_frequency = None if max_frequency is None else int(max_frequency) / 1000
+            state.governor = _read(os.path.join(cpufreq, 'scaling_governor'))
+        return state
+
+    def reasons(self, state: MachineStateStatistics) -> List[str]:
+        """Reasons of interference of run with state, empty if run was not disturbed"""
+        reasons = []
+        if state.steal is not None and state.steal > self.steal:
+            reasons.append('steal')
+        if state.cpu_pressure is not None and state.cpu_pressure > self.cpu_pressure:
+            reasons.append('cpu_pressure')
+        if state.memory_pressure is not None and state.memory_pressure > self.memory_pressure:
+            reasons.append('memory_pressure')
+        if state.other_busy_processes is not None \
+                and state.other_busy_processes > max(1, _logical_cpus - state.concurrent_jobs):
+            reasons.append('busy_processes')
+        if state.cpu_frequency is not None and state.max_cpu_frequency \
+                and state.cpu_frequency < self.min_frequency * state.max_cpu_frequency:
+            reasons.append('frequency')
+        if state.governor is not None and state.governor in self.governors:
+            reasons.append('governor')
+        return reasons
+
+
+def record_delay(pid: int):
+    """Record time job with pid waited for cpu so far, called on every poll of the job"""
+    delay = _run_delay(pid)
+    if delay is not None:
+        with _active_lock:
+            _job_delays[pid] = delay
+
+
+def finish_delay(pid: int):
+    """Job with pid exited, its last recorded delay is kept"""
+    global _finished_delay
+    with _active_lock:
+        _finished_delay += _job_delays.pop(pid, 0)
+
+
+def _run_delay(pid) -> Optional[int]:
+    """Nanoseconds all threads of process waited on run queue, None if schedstat is not available"""
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return None
+    total = None
+    for task in tasks:
+        schedstat = _read(f'/proc/{pid}/task/{task}/schedstat')
+        if schedstat is not None:
+            total = (total or 0) + int(schedstat.split()[1])
+    return total
+
+
+def _snapshot() -> Snapshot:
+    snapshot = Snapshot(time=time.perf_counter())
+    own_delay = _run_delay('self')
+    if own_delay is not None:
+        with _active_lock:
+            snapshot.own_delay = own_delay + _finished_delay + sum(_job_delays.values())
+    stat = _read('/proc/stat')
+    if stat is not None:
+        for line in stat.splitlines():
+            if line.startswith('cpu '):
+                jiffies = [int(value) for value in line.split()[1:]]
+                # guest time is already included in user time
+                snapshot.cpu_times = jiffies[7] if len(jiffies) > 7 else 0, sum(jiffies[:8])
+            elif line.startswith('procs_running '):
+                snapshot.procs_running = int(line.split()[1])
+    for resource in ('cpu', 'memory', 'io'):
+        pressure = _read(f'/proc/pressure/{resource}')
+        if pressure is not None and pressure.startswith('some '):
+            snapshot.pressure[resource] = int(pressure.split('\n')[0].rpartition('total=')[2])
+    return snapshot
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as fp:
+            return fp.read().strip()
+    except (OSError, ValueError):
+        return None
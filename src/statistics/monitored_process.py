@@ -3,33 +3,84 @@ import time
 
 import psutil
 
+from src.statistics import machine_state
+from src.statistics.resource_sampler import ResourceSampler
 from src.statistics.stats import ExecutionStatistics
 
 
+_has_cpu_num = hasattr(psutil.Process, 'cpu_num')
+
+
 class MonitoredProcess(subprocess.Popen):
     """Start process that can be monitored by periodic calling poll() in active loop
     Note that:
     poll() must be called at least once to get proper statistics
     short running process can exit before poll method was executed
-    use with context manager to auto stop execution time
+    use with context manager to auto stop execution time, it ends when poll() sees the process exit or on kill()
+    sampler records resource usage time series, it is read on every poll (sampler decides when to sample)
+    wrapped - process is wrapper (e.g. perf stat) that runs measured command as its child,
+    statistics are gathered from the child and kill() kills both
+    track_delay - time process waits for cpu is recorded on every poll (see machine_state)
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, sampler: ResourceSampler = None, wrapped: bool = False, track_delay: bool = False,
+                 **kwargs):
         self.exec_stats = ExecutionStatistics()
+        self.sampler = sampler
+        self.track_delay = track_delay
+        self.cpu = None
+        """core the process was scheduled on at last poll (not available on every platform)"""
         super().__init__(*args, **kwargs)
-        self._start = time.perf_counter()
+        self.start_time = time.perf_counter()
+        """time.perf_counter() when process was started, execution_time is measured from it"""
+        self.end_time = None
+        """time.perf_counter() when exit of process was seen or when it was killed"""
         self.proc = psutil.Process(self.pid)
+        self._wrapper = self.proc if wrapped else None
+        self._measured_found = not wrapped
         self.poll()
 
     def poll(self):
         if super().poll() is not None:
+            self._stop_clock()
             return super().poll()
 
+        if not self._measured_found:
+            try:
+                children = self._wrapper.children()
+            except psutil.Error:
+                children = []
+            if not children:
+                # wrapper did not start measured process yet
+                return None
+            self.proc = children[0]
+            self._measured_found = True
+
         # can not do it in __exit__, because process no longer not exists there
-        self.exec_stats.update(self.proc)
+        try:
+            self.exec_stats.update(self.proc)
+            if _has_cpu_num:
+                self.cpu = self.proc.cpu_num()
+            if self.track_delay:
+                machine_state.record_delay(self.proc.pid)
+        except psutil.NoSuchProcess:
+            # measured child of wrapper exited, wrapper is finishing
+            return None
+        if self.sampler is not None:
+            self.sampler.sample(self.proc)
 
         return None
 
+    def kill(self):
+        if self._wrapper is not None and self._measured_found:
+            # wrapper does not forward SIGKILL to measured process
+            try:
+                self.proc.kill()
+            except psutil.Error:
+                pass
+        self._stop_clock()
+        super().kill()
+
     def stop(self):
         """If not used with contex manager, stop counting execution time"""
         self.__exit__(None, None, None)
@@ -38,6 +89,15 @@ class MonitoredProcess(subprocess.Popen):
         """Return gathered statistics"""
         return self.exec_stats
 
+    def _stop_clock(self):
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.exec_stats.execution_time = time.perf_counter() - self._start
+        self._stop_clock()
+        self.exec_stats.execution_time = self.end_time - self.start_time
+        if self.track_delay:
+            machine_state.finish_delay(self.proc.pid)
         self.exec_stats.returncode = self.returncode
+        if self.sampler is not None:
+            self.exec_stats.resource_series = self.sampler.series()
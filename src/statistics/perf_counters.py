@@ -0,0 +1,125 @@
+"""Hardware performance counters of solver runs
+
+In perf mode solver command is wrapped in 'perf stat', which writes counters in CSV format to temporary file.
+If perf is not installed or counters are not accessible (no PMU, perf_event_paranoid), runs are executed
+without wrapper and counters are not recorded.
+In stub mode solver is not wrapped, synthetic counters are derived from cpu time of the run and parsed
+as perf output, so the whole path can be tested on machines without PMU access.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, ClassVar, Dict
+
+from src.log import get_logger
+from src.statistics.stats import PerfCounters, ExecutionStatistics
+
+logger = get_logger()
+
+
+@dataclass
+class PerfStat:
+    mode: str = 'perf'
+    executable: str = 'perf'
+    events: Dict[str, str] = field(default_factory=lambda: dict(PerfStat.default_events))
+    """Dict[perf event name, PerfCounters attribute]"""
+
+    modes: ClassVar[List[str]] = ['perf', 'stub']
+    default_events: ClassVar[Dict[str, str]] = {'instructions': 'instructions', 'cycles': 'cycles',
+                                                'cache-misses': 'cache_misses', 'branch-misses': 'branch_misses'}
+
+    def __post_init__(self):
+        self._available = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """perf can count events, it is checked once"""
+        if self.mode == 'stub':
+            return True
+        with self._lock:
+            if self._available is None:
+                self._available = self._probe()
+        return self._available
+
+    def wrap(self, command: List[str]) -> Tuple[List[str], Optional[str]]:
+        """:return: command to execute and file perf stat writes counters to (None if command is not wrapped)"""
+        if self.mode == 'stub' or not self.available:
+            return command, None
+        handle, output_path = tempfile.mkstemp(prefix='perf-stat-', suffix='.csv')
+        os.close(handle)
+        return [self.executable, 'stat', '-x', ',', '-o', output_path, '-e', ','.join(self.events), '--',
+                *command], output_path
+
+    def counters(self, output_path: Optional[str], execution_statistics: ExecutionStatistics) \
+            -> Optional[PerfCounters]:
+        """Read counters of finished run and remove output file of perf stat"""
+        if self.mode == 'stub':
+            return self.parse(_stub_output(execution_statistics), source='stub')
+        if output_path is None:
+            return None
+        try:
+            with open(output_path, 'r') as fp:
+                return self.parse(fp.read(), source='perf')
+        except OSError as e:
+            logger.warning(f'perf stat output {output_path} could not be read: {e}')
+            return None
+        finally:
+            if os.path.exists(output_path):
+                os.unlink(output_path)
+
+    def parse(self, output: str, source: str) -> PerfCounters:
+        """Parse output of perf stat -x ,
+        lines are value,unit,event,... value is <not supported> or <not counted> if event was not counted
+        """
+        counters = PerfCounters(source=source)
+        for line in output.splitlines():
+            if not line or line.startswith('#'):
+                continue
+            columns = line.split(',')
+            if len(columns) < 3:
+                continue
+            value, event = columns[0], columns[2].split(':')[0]
+            if event not in self.events:
+                continue
+            try:
+                setattr(counters, self.events[event], int(float(value)))
+            except ValueError:
+                counters.not_counted.append(event)
+        if counters.instructions is not None and counters.cycles:
+            counters.instructions_per_cycle = counters.instructions / counters.cycles
+        return counters
+
+    def _probe(self) -> bool:
+        if shutil.which(self.executable) is None:
+            logger.warning(f'{self.executable} not found, performance counters will not be recorded')
+            return False
+        try:
+            result = subprocess.run([self.executable, 'stat', '-x', ',', '-e', ','.join(self.events), '--', 'true'],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=10)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f'{self.executable} stat failed, performance counters will not be recorded: {e}')
+            return False
+        counters = self.parse(result.stderr, source='perf')
+        if result.returncode != 0 or len(counters.not_counted) == len(self.events):
+            logger.warning(f'{self.executable} stat can not count {list(self.events)} (no PMU access?), '
+                           f'performance counters will not be recorded: {result.stderr.strip()[-200:]}')
+            return False
+        if counters.not_counted:
+            logger.warning(f'{self.executable} stat can not count {counters.not_counted}')
+        return True
+
+
+def _stub_output(execution_statistics: ExecutionStatistics) -> str:
+    """perf stat output of 1 GHz CPU executing 2 instructions per cycle"""
+    cpu_time = execution_statistics.cpu_time
+    cycles = int(((cpu_time[0] + cpu_time[1]) if cpu_time is not None else 0) * 10 ** 9)
+    return '\n'.join([f'{cycles * 2},,instructions,100.00,,',
+                      f'{cycles},,cycles,100.00,,',
+                      f'{cycles // 1000},,cache-misses,100.00,,',
+                      f'{cycles // 500},,branch-misses,100.00,,'])
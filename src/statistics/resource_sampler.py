@@ -0,0 +1,82 @@
+import time
+from array import array
+from typing import NoReturn
+
+import psutil
+
+from src.statistics.stats import ResourceSeries
+
+
+class ResourceSampler:
+    """Samples (time, rss, cpu user, cpu system, io read, io write, threads) of process into packed arrays
+    sample() is called from polling loop of process, it reads process only if interval elapsed since last sample
+    when max_samples are collected, samples are merged in pairs and interval is doubled,
+    so long runs keep at most max_samples samples
+    """
+
+    def __init__(self, interval: float, max_samples: int = 1000):
+        self.interval = interval
+        self.max_samples = max(2, max_samples)
+        self.downsampled = 0
+        self.overhead = 0
+        self._start = time.perf_counter()
+        self._next = self._start
+        self._time = array('q')
+        self._rss = array('q')
+        self._cpu_user = array('q')
+        self._cpu_system = array('q')
+        self._io_read = array('q')
+        self._io_write = array('q')
+        self._threads = array('q')
+        self._io = (0, 0)
+
+    def sample(self, proc: psutil.Process) -> NoReturn:
+        now = time.perf_counter()
+        if now < self._next:
+            return
+        self._next = now + self.interval
+        try:
+            with proc.oneshot():
+                rss = proc.memory_info().rss
+                cpu_times = proc.cpu_times()
+                threads = proc.num_threads()
+                try:
+                    io_counters = proc.io_counters()
+                    self._io = io_counters.read_bytes, io_counters.write_bytes
+                except psutil.AccessDenied:
+                    # keep last known value
+                    pass
+        except psutil.Error:
+            # process exited between polls
+            return
+        if len(self._time) >= self.max_samples:
+            self._downsample()
+        self._time.append(int((now - self._start) * 1000))
+        self._rss.append(rss)
+        self._cpu_user.append(int(cpu_times.user * 1000))
+        self._cpu_system.append(int(cpu_times.system * 1000))
+        self._io_read.append(self._io[0])
+        self._io_write.append(self._io[1])
+        self._threads.append(threads)
+        self.overhead += time.perf_counter() - now
+
+    def series(self) -> ResourceSeries:
+        return ResourceSeries(interval=self.interval, time=_delta_encode(self._time), rss=_delta_encode(self._rss),
+                              cpu_user=_delta_encode(self._cpu_user), cpu_system=_delta_encode(self._cpu_system),
+                              io_read=_delta_encode(self._io_read), io_write=_delta_encode(self._io_write),
+                              threads=_delta_encode(self._threads), downsampled=self.downsampled,
+                              overhead=self.overhead)
+
+    def _downsample(self) -> NoReturn:
+        """Merge samples in pairs, counters keep later sample, rss and threads keep maximum, so peaks are not lost"""
+        for samples in (self._time, self._cpu_user, self._cpu_system, self._io_read, self._io_write):
+            samples[:] = samples[1::2] + samples[len(samples) - len(samples) % 2:]
+        for samples in (self._rss, self._threads):
+            merged = array('q', map(max, samples[0::2], samples[1::2]))
+            samples[:] = merged + samples[len(samples) - len(samples) % 2:]
+        self.interval *= 2
+        self.downsampled += 1
+
+
+def _delta_encode(samples: array) -> list:
+    return [current - previous for previous, current in zip(array('q', [0]) + samples, samples)]
@@ -0,0 +1,109 @@
+"""Serialization of statistics
+
+Every dataclass gets serializer generated once from its fields, it returns dict of fields (without fields that
+start with _) in order of fields, which is the order of __dict__ that was serialized before.
+Attributes that are not fields (set on __dict__ backed objects) follow the fields.
+Statistics can be written as JSON (json from standard library or orjson) or msgpack.
+"""
+import dataclasses
+import datetime
+import importlib
+import json
+import threading
+from enum import Enum
+from inspect import isclass
+from typing import Any, Callable, Dict, Optional, NoReturn
+
+from src.errors import BenchmarkException
+
+_serializers: Dict[type, Optional[Callable[[Any], dict]]] = {}
+_serializers_lock = threading.Lock()
+
+output_formats = ['json', 'orjson', 'msgpack']
+
+
+def serializer(cls: type) -> Optional[Callable[[Any], dict]]:
+    """Serializer of dataclass, None for other classes"""
+    try:
+        return _serializers[cls]
+    except KeyError:
+        pass
+    with _serializers_lock:
+        if cls not in _serializers:
+            _serializers[cls] = _compile(cls) if dataclasses.is_dataclass(cls) else None
+        return _serializers[cls]
+
+
+def _compile(cls: type) -> Callable[[Any], dict]:
+    names = [field.name for field in dataclasses.fields(cls) if not field.name.startswith('_')]
+    items = ', '.join(f'{name!r}: o.{name}' for name in names)
+    source = f'def serialize(o):\n    plain = {{{items}}}\n'
+    if '__slots__' not in cls.__dict__:
+        # attributes set outside of fields
+        source += ('    if len(o.__dict__) > len(plain):\n'
+                   '        for key, value in o.__dict__.items():\n'
+                   '            if key not in plain and not key.startswith("_"):\n'
+                   '                plain[key] = value\n')
+    source += '    return plain\n'
+    namespace = {}
+    exec(compile(source, f'<serializer of {cls.__qualname__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+def to_plain(o: Any) -> Any:
+    """One level of conversion of object to types that can be serialized, used as default of encoders"""
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, datetime.datetime):
+        return o.isoformat()
+    serialize = serializer(type(o))
+    if serialize is not None:
+        return serialize(o)
+    if isinstance(o, tuple):
+        return list(o)
+    if hasattr(o, '__dict__'):
+        return _as_plain_dict(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not serializable')
+
+
+def _as_plain_dict(o: Any) -> dict:
+    """Convert object that is not dataclass to dict of its attributes"""
+    class_dict = {}
+    for key, value in o.__dict__.items():
+        if key.startswith('_'):
+            continue
+        class_dict[key] = _as_plain_dict(value) if isclass(value) else value
+    return class_dict
+
+
+def dumps(statistics: Any, output_format: str = 'json') -> bytes:
+    """Serialize statistics, json is indented by 2 spaces
+    orjson writes the same structure as json, but faster (non ASCII characters are not escaped)
+    orjson and msgpack are optional packages
+    """
+    if output_format == 'json':
+        from src.statistics.json_encoder import ClassAsDictJSONEncoder
+        return json.dumps(statistics, indent=2, cls=ClassAsDictJSONEncoder).encode()
+    if output_format == 'orjson':
+        orjson = _optional_import('orjson')
+        return orjson.dumps(statistics, default=to_plain,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+                            | orjson.OPT_PASSTHROUGH_DATETIME)
+    if output_format == 'msgpack':
+        msgpack = _optional_import('msgpack')
+        return msgpack.packb(statistics, default=to_plain, use_bin_type=True)
+    raise BenchmarkException(f'output format should be one of {output_formats}', output_format)
+
+
+def dump(statistics: Any, path: str, output_format: str = 'json') -> NoReturn:
+    """Serialize statistics to file, whole output is encoded before file is opened"""
+    data = dumps(statistics, output_format)
+    with open(path, 'wb') as fp:
+        fp.write(data)
+
+
+def _optional_import(module: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise BenchmarkException(f'{module} package is required for output format {module}')
@@ -1,27 +1,108 @@
+import dataclasses
 import datetime
+import itertools
 import platform
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Union
+from typing import List, Dict, Union, ClassVar, Tuple
 
 import psutil
 
 
+def slots(cls: type) -> type:
+    """Recreate dataclass with __slots__ of its fields, records of every run are kept in memory
+    (dataclass(slots=True) needs Python 3.10)
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+@slots
+@dataclass
+class ResourceSeries:
+    """Resource usage of process sampled while it was running, every series is delta encoded
+    (first value is absolute, next values are differences to previous value)
+    """
+    interval: float
+    """seconds between samples, it is doubled every time series is downsampled"""
+    time: List[int] = field(default_factory=list)
+    """milliseconds since start of process"""
+    rss: List[int] = field(default_factory=list)
+    """bytes, maximum of merged samples when downsampled"""
+    cpu_user: List[int] = field(default_factory=list)
+    """milliseconds"""
+    cpu_system: List[int] = field(default_factory=list)
+    """milliseconds"""
+    io_read: List[int] = field(default_factory=list)
+    """bytes"""
+    io_write: List[int] = field(default_factory=list)
+    """bytes"""
+    threads: List[int] = field(default_factory=list)
+    """maximum of merged samples when downsampled"""
+    downsampled: int = 0
+    """how many times samples were merged in pairs"""
+    overhead: float = 0
+    """seconds spent in sampling"""
+
+    series: ClassVar[Tuple[str, ...]] = ('time', 'rss', 'cpu_user', 'cpu_system', 'io_read', 'io_write', 'threads')
+
+    def decode(self) -> Dict[str, List[int]]:
+        """Absolute values of every series"""
+        return {name: list(itertools.accumulate(getattr(self, name))) for name in ResourceSeries.series}
+
+
+@slots
+@dataclass
+class PerfCounters:
+    """Hardware performance counters of process (counted in user and kernel space)"""
+    source: str
+    """perf - counted by perf stat, stub - synthetic values derived from cpu time"""
+    instructions: int = None
+    cycles: int = None
+    instructions_per_cycle: float = None
+    cache_misses: int = None
+    branch_misses: int = None
+    not_counted: List[str] = field(default_factory=list)
+    """events that were not supported or not counted"""
+
+
+@slots
 @dataclass
 class ExecutionStatistics:
-    # todo which cpu times do we need?
-    cpu_time = None
     execution_time: float = 0
     peak_memory: int = None
     disk_reads: int = None
+    """bytes read from storage"""
     disk_writes: int = None
+    """bytes written to storage (writes to tmpfs are not included)"""
+    read_chars: int = None
+    """bytes read by read syscalls (also from page cache and pipes), only on Linux"""
+    write_chars: int = None
+    """bytes written by write syscalls (also to tmpfs and pipes), only on Linux"""
     returncode: int = None
+    # todo which cpu times do we need?
+    cpu_time: tuple = None
+    resource_series: ResourceSeries = None
+    """set only if resource sampling is enabled"""
+    perf_counters: PerfCounters = None
+    """set only if perf counters are enabled"""
+    time_to_first_output: float = None
+    """seconds from start to first line of stdout or stderr"""
+    time_to_verdict: float = None
+    """seconds from start to first line matching verdict pattern of solver parser"""
 
     def update(self, proc: psutil.Process):
         try:
             io_counters = proc.io_counters()
-            self.disk_reads = io_counters.read_bytes + io_counters.read_chars
-            self.disk_writes = io_counters.write_bytes + io_counters.read_chars
+            self.disk_reads = io_counters.read_bytes
+            self.disk_writes = io_counters.write_bytes
+            self.read_chars = getattr(io_counters, 'read_chars', None)
+            self.write_chars = getattr(io_counters, 'write_chars', None)
         except psutil.AccessDenied:
             pass
 
@@ -57,6 +138,46 @@ class HardwareStatistics:
     total_memory: int = psutil.virtual_memory().total
 
 
+@slots
+@dataclass
+class MachineStateStatistics:
+    load_average: float = None
+    """1 minute load average at the end of run"""
+    cpu: int = None
+    """core the run was last scheduled on"""
+    cpu_frequency: float = None
+    """MHz"""
+    max_cpu_frequency: float = None
+    governor: str = None
+    steal: float = None
+    """fraction of cpu time of all cores taken by hypervisor during run"""
+    cpu_pressure: float = None
+    """fraction of run time some tasks waited for cpu (pressure stall information)"""
+    memory_pressure: float = None
+    io_pressure: float = None
+    other_busy_processes: int = None
+    """runnable processes that are not benchmark jobs"""
+    concurrent_jobs: int = None
+    """benchmark jobs running at the end of run (including this one)"""
+
+
+@slots
+@dataclass
+class TranslationStatistics:
+    from_format: str
+    to_format: str
+    command: List[str]
+    execution_statistics: ExecutionStatistics = None
+    succeeded: bool = False
+    """translator exited with 0 and wrote non empty output"""
+    input_size: int = None
+    """bytes"""
+    output_size: int = None
+    """bytes"""
+    stderr: str = ''
+
+
+@slots
 @dataclass
 class MinimalSATStatistics:
     name: str = None
@@ -64,6 +185,8 @@ class MinimalSATStatistics:
     format: str = None
     # list of commands used to translate
     translated_with: List[List[str]] = field(default_factory=list)
+    translation: TranslationStatistics = None
+    """cost of translation of input to format of test run"""
 
 
 @dataclass
@@ -108,15 +231,67 @@ class SATStatus(Enum):
     UNKOWN = "unknown"
     TIMEOUT = "timeout"
     OUT_OF_MEMORY = "out of memory"
+    PRUNED = "pruned"
+    """not run, because smaller instances of the same problem family timed out"""
+
+
+@slots
+@dataclass
+class Prover9Metrics:
+    given: int = None
+    generated: int = None
+    kept: int = None
+    proofs: int = None
+    megabytes: float = None
+    user_cpu: float = None
+    system_cpu: float = None
+    wall_clock: float = None
+    clauses_per_second: float = None
+    """generated clauses per second of user CPU time"""
+
+
+@slots
+@dataclass
+class SpassMetrics:
+    derived: int = None
+    backtracked: int = None
+    splits: int = None
+    kept: int = None
+    allocated_kilobytes: int = None
+    total_time: float = None
+    input_time: float = None
+    translation_time: float = None
+    """FLOTTER CNF translation"""
+    inference_time: float = None
+    backtracking_time: float = None
+    reduction_time: float = None
+    clauses_per_second: float = None
+    """derived clauses per second of total time"""
+
+
+@slots
+@dataclass
+class InkresatMetrics:
+    variables_added: int = None
+    clauses_added: int = None
+    sat_cycles: int = None
+    pattern_store_hits: int = None
+    pattern_store_misses: int = None
+    time: float = None
+    cycles_per_second: float = None
 
 
+@slots
 @dataclass
 class OutputStatistics:
     status: SATStatus = None
     stderr: str = ''
     stdout: str = ''
+    metrics: Union[Prover9Metrics, SpassMetrics, InkresatMetrics] = None
+    """search statistics printed by solver"""
 
 
+@slots
 @dataclass
 class TestRunStatistics:
     name: str
@@ -127,6 +302,29 @@ class TestRunStatistics:
         ConjunctiveNormalFormFirstOrderLogicSATStatistics,
         ConjunctiveNormalFormPropositionalTemporalLogicFormulaInfo] = None
     output: OutputStatistics = None
+    timeout: float = None
+    """time limit (seconds) of the run that produced this result"""
+    timeout_tier: int = None
+    """index of test_case_timeout_ladder step that produced this result"""
+    memory_requeues: int = 0
+    """how many times run was killed to free memory for concurrent runs and started again"""
+    worker: str = None
+    """name of distributed worker that executed this run"""
+    duplicate_of: str = None
+    """input equivalent to this input, result of its run was reused"""
+    alias_of: str = None
+    """test suite/test run of identical job (same command on the same file), result of its run was reused"""
+    page_cache: str = None
+    """page cache policy applied to input before the run (warm or cold)"""
+    scratch_size: int = None
+    """largest observed size (bytes) of scratch directory of the run"""
+    excessive_writes: bool = False
+    """scratch directory or disk writes of the run exceeded scratch max_size"""
+    machine_state: MachineStateStatistics = None
+    interference: List[str] = field(default_factory=list)
+    """reasons why run was disturbed by other load, empty if it was not"""
+    interference_requeues: int = 0
+    """how many times run was disturbed by other load and started again"""
 
 
 @dataclass
@@ -136,8 +334,197 @@ class TestSuiteStatistics:
     test_run: List[TestRunStatistics] = field(default_factory=list)
 
 
+@dataclass
+class SweepConfigurationStatistics:
+    name: str
+    parameters: Dict[str, Union[str, int, float, bool]] = field(default_factory=dict)
+    runs: int = 0
+    solved: int = 0
+    par2_time: float = 0
+    """sum of execution times of solved inputs and twice the timeout for every unsolved input"""
+    pruned: bool = False
+
+
+@dataclass
+class SampleStratumStatistics:
+    stratum: List[str]
+    population: int
+    sampled: int
+
+
+@dataclass
+class SampleEstimateStatistics:
+    program_name: str
+    test_run: str
+    runs: int
+    solved_fraction: float = None
+    """stratified estimate of fraction of solved inputs of whole test input"""
+    solved_fraction_standard_error: float = None
+    mean_time: float = None
+    mean_time_standard_error: float = None
+    history_solved_fraction: float = None
+    """fraction of solved inputs of whole test input in previous benchmark (if it ran all inputs)"""
+    history_solved_fraction_estimate: float = None
+    """estimate of history_solved_fraction from sampled inputs"""
+
+
+@dataclass
+class SampleStatistics:
+    population: int
+    size: int
+    seed: int
+    strata: List[SampleStratumStatistics] = field(default_factory=list)
+    estimates: List[SampleEstimateStatistics] = field(default_factory=list)
+
+
+@dataclass
+class ScalingPointStatistics:
+    size: int
+    runs: int
+    solved: int
+    mean_time: float = None
+    """mean execution time of solved runs"""
+    mean_peak_memory: float = None
+    """mean peak memory of solved runs"""
+
+
+@dataclass
+class ScalingFitStatistics:
+    model: str
+    """power: coefficient * size ^ exponent, exponential: coefficient * e ^ (exponent * size)"""
+    coefficient: float
+    exponent: float
+    r_squared: float
+    """of least squares fit of logarithm of values"""
+
+
+@dataclass
+class ScalingStatistics:
+    program_name: str
+    test_run: str
+    family: str
+    """test input name"""
+    kind: str
+    timeout: float = None
+    points: List[ScalingPointStatistics] = field(default_factory=list)
+    time_fits: List[ScalingFitStatistics] = field(default_factory=list)
+    memory_fits: List[ScalingFitStatistics] = field(default_factory=list)
+    best_time_model: str = None
+    scaling_limit: float = None
+    """size at which best time model reaches timeout"""
+    largest_solved_size: int = None
+
+
+@dataclass
+class PrunedFamilyStatistics:
+    test_suite: str
+    test_run: str
+    family: str
+    smallest_pruned_size: float
+    pruned_runs: int = 0
+    saved_time: float = 0
+
+
+@dataclass
+class PruningStatistics:
+    after_timeouts: int
+    pruned_runs: int = 0
+    saved_time: float = 0
+    """timeouts of pruned runs (seconds), upper bound of compute they would use"""
+    families: List[PrunedFamilyStatistics] = field(default_factory=list)
+
+
+@dataclass
+class QuantileStatistics:
+    count: int
+    mean: float = None
+    p50: float = None
+    p90: float = None
+    p99: float = None
+    """quantiles are approximate (1% relative error)"""
+
+
+@dataclass
+class AggregateStatistics:
+    test_suite: str
+    test_run: str
+    runs: int
+    statuses: Dict[str, int] = field(default_factory=dict)
+    """number of runs by status"""
+    execution_time: QuantileStatistics = None
+    cpu_time: QuantileStatistics = None
+    """user and system cpu time"""
+    peak_memory: QuantileStatistics = None
+
+
+@dataclass
+class PlannedJobStatistics:
+    index: int
+    test_suite: str
+    test_run: str
+    path: str
+    command: List[str]
+    estimated_time: float
+    """seconds"""
+    estimate: str
+    """source of estimated time: history, test run mean or timeout"""
+    alias_of: str = None
+    """test suite/test run of identical job whose result is reused"""
+
+
+@dataclass
+class PlanStatistics:
+    jobs: int
+    run_jobs: int
+    """jobs that are not aliases of identical jobs"""
+    aliases: int
+    timeout_ladder: List[float] = field(default_factory=list)
+    history: str = None
+    """output of previous benchmark used for estimates"""
+    estimated_cpu_hours: float = 0
+    estimated_from_history: int = 0
+    """run jobs with time in history"""
+    planned_jobs: List[PlannedJobStatistics] = field(default_factory=list)
+
+
+@dataclass
+class TranslatorThroughputStatistics:
+    test_input: str
+    from_format: str
+    to_format: str
+    executable: str
+    files: int = 0
+    failed: int = 0
+    total_time: float = 0
+    """sum of execution times of translations (seconds)"""
+    peak_memory: int = None
+    """maximum of peak memory of translations"""
+    input_bytes: int = 0
+    output_bytes: int = 0
+    files_per_second: float = None
+    input_bytes_per_second: float = None
+
+
 @dataclass
 class Statistics:
+    aggregates: List[AggregateStatistics] = field(default_factory=list)
+    """summary of results by test suite and test run (first, so it can be read without parsing whole output)"""
     test_suites: List[TestSuiteStatistics] = field(default_factory=list)
-    date: datetime.datetime = datetime.datetime.now()
+    date: datetime.datetime = field(default_factory=datetime.datetime.now)
     hardware: HardwareStatistics = HardwareStatistics()
+    workers: Dict[str, HardwareStatistics] = field(default_factory=dict)
+    """hardware of distributed workers by worker name"""
+    sweeps: Dict[str, List[SweepConfigurationStatistics]] = field(default_factory=dict)
+    """configurations of every test run sweep"""
+    samples: Dict[str, SampleStatistics] = field(default_factory=dict)
+    """sampling of test inputs by test input name"""
+    duplicates: List[List[str]] = field(default_factory=list)
+    """groups of equivalent input files"""
+    translations: List[TranslatorThroughputStatistics] = field(default_factory=list)
+    """throughput of translators by test input"""
+    scaling: List[ScalingStatistics] = field(default_factory=list)
+    """scaling of time and memory with problem size of problem families"""
+    pruning: PruningStatistics = None
+    """runs skipped by monotone pruning"""
+    plan: PlanStatistics = None
+    """jobs and estimated cost of the benchmark (without table of jobs)"""
@@ -1,8 +1,16 @@
+from .family import ProblemFamily
+from .job import Job
+from .sample import Sample
+from .sweep import Sweep
 from .test_input import TestInput
 from .test_run import TestRun
 from .test_suite import TestSuite
 
 __all__ = [
+    'Job',
+    'ProblemFamily',
+    'Sample',
+    'Sweep',
     'TestRun',
     'TestInput',
     'TestSuite',
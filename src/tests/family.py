@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, ClassVar, Optional
+
+from src.errors import BenchmarkException
+from src.log import get_logger
+from src.statistics.stats import SATStatus, ScalingFitStatistics, ScalingStatistics, ScalingPointStatistics
+
+logger = get_logger()
+
+
+@dataclass
+class ProblemFamily:
+    """Generator of scalable propositional CNF problems in TPTP syntax
+    kinds: random_k_cnf - k literals per clause, clause_ratio * size clauses over size variables,
+    pigeonhole - size + 1 pigeons in size holes (unsatisfiable),
+    chain - p1, p1 => p2, ..., p(size-1) => p(size), ~p(size) (unsatisfiable)
+    """
+    kind: str
+    sizes: List[int]
+    instances: int = 1
+    """generated problems of every size (only random_k_cnf problems differ)"""
+    seed: int = 0
+    k: int = 3
+    clause_ratio: float = 4.26
+    """random 3-CNF is hardest at ratio about 4.26"""
+    files: Dict[str, int] = field(default_factory=dict, repr=False)
+    """Dict[generated file, size]"""
+
+    kinds: ClassVar[List[str]] = ['random_k_cnf', 'pigeonhole', 'chain']
+
+    def __post_init__(self):
+        if self.kind not in ProblemFamily.kinds:
+            raise BenchmarkException(f"problem family kind should be one of {ProblemFamily.kinds}", self)
+        if not self.sizes or any(size < 1 for size in self.sizes):
+            raise BenchmarkException("problem family sizes should be positive", self)
+        if self.instances < 1:
+            raise BenchmarkException("problem family instances should be positive", self)
+        if self.kind == 'random_k_cnf' and any(self.k > size for size in self.sizes):
+            raise BenchmarkException("random_k_cnf sizes (variables) should not be less than k", self)
+
+    def generate(self, directory: str) -> List[str]:
+        """Write problems to directory, existing files are not written again
+        :return: generated files ordered by size
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.files = {}
+        for size in sorted(set(self.sizes)):
+            for instance in range(self.instances):
+                path = os.path.join(directory, f'{self._name(size, instance)}.p')
+                if not os.path.isfile(path):
+                    tmp_path = f'{path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'w') as fp:
+                        fp.write(self._problem(size, instance))
+                    os.replace(tmp_path, path)
+                self.files[path] = size
+        logger.info(f'Problem family {self.kind}: {len(self.files)} problems in {directory}')
+        return list(self.files)
+
+    def statistics(self, family: str, results: List[Tuple[str, TestRunStatistics]]) -> List[ScalingStatistics]:
+        """Fit scaling of execution time and peak memory with problem size of every test run
+        :param results: (test suite program name, result) of runs of generated files
+        """
+        runs = {}
+        for program_name, result in results:
+            size = self.files.get(result.minimal_input_statistics.path)
+            if size is not None:
+                runs.setdefault((program_name, result.name), []).append((size, result))
+
+        statistics = []
+        for (program_name, name), run_results in runs.items():
+            timeout = max((result.timeout for _, result in run_results if result.timeout is not None), default=None)
+            scaling = ScalingStatistics(program_name=program_name, test_run=name, family=family, kind=self.kind,
+                                        timeout=timeout)
+            by_size = {}
+            for size, result in run_results:
+                by_size.setdefault(size, []).append(result)
+            for size, size_results in sorted(by_size.items()):
+                solved = [result for result in size_results if result.output.status in _solved]
+                point = ScalingPointStatistics(size=size, runs=len(size_results), solved=len(solved))
+                if solved:
+                    point.mean_time = sum(result.execution_statistics.execution_time for result in solved) \
+                                      / len(solved)
+                    memory = [result.execution_statistics.peak_memory for result in solved
+                              if result.execution_statistics.peak_memory]
+                    point.mean_peak_memory = sum(memory) / len(memory) if memory else None
+                    scaling.largest_solved_size = size
+                scaling.points.append(point)
+
+            scaling.time_fits = _fits([(point.size, point.mean_time) for point in scaling.points])
+            scaling.memory_fits = _fits([(point.size, point.mean_peak_memory) for point in scaling.points])
+            if scaling.time_fits:
+                best = max(scaling.time_fits, key=lambda fit: fit.r_squared)
+                scaling.best_time_model = best.model
+                if timeout is not None:
+                    scaling.scaling_limit = _inverse(best, timeout)
+            statistics.append(scaling)
+        return statistics
+
+    def _name(self, size: int, instance: int) -> str:
+        if self.kind == 'random_k_cnf':
+            return f'random_{self.k}_cnf_{size}_r{self.clause_ratio:g}_s{self.seed}_{instance}'
+        return f'{self.kind}_{size}_{instance}'
+
+    def _problem(self, size: int, instance: int) -> str:
+        if self.kind == 'random_k_cnf':
+            rng = random.Random(f'{self.seed} {self.k} {self.clause_ratio} {size} {instance}')
+            clauses = []
+            for _ in range(max(1, round(self.clause_ratio * size))):
+                variables = rng.sample(range(1, size + 1), self.k)
+                clauses.append([f'{"~" if rng.random() < 0.5 else ""}p{variable}' for variable in variables])
+        elif self.kind == 'pigeonhole':
+            pigeons = range(1, size + 2)
+            holes = range(1, size + 1)
+            clauses = [[f'p{pigeon}_{hole}' for hole in holes] for pigeon in pigeons]
+            clauses.extend([f'~p{first}_{hole}', f'~p{second}_{hole}']
+                           for hole in holes for first in pigeons for second in pigeons if first < second)
+        else:
+            clauses = [['p1']]
+            clauses.extend([f'~p{i}', f'p{i + 1}'] for i in range(1, size))
+            clauses.append([f'~p{size}'])
+        lines = [f'% {self.kind} problem of size {size}']
+        lines.extend(f'cnf(c{index}, axiom, ({" | ".join(literals)})).'
+                     for index, literals in enumerate(clauses, start=1))
+        return '\n'.join(lines) + '\n'
+
+
+_solved = (SATStatus.SATISFIABLE, SATStatus.UNSATISFIABLE)
+
+
+def _fits(points: List[Tuple[int, Optional[float]]]) -> List[ScalingFitStatistics]:
+    """Least squares fits of power (y = a * size ^ b) and exponential (y = a * e ^ (b * size)) models
+    fits are done on logarithm of y, r_squared is computed on logarithm of y too
+    """
+    points = [(size, value) for size, value in points if value is not None and value > 0]
+    if len({size for size, _ in points}) < 2:
+        return []
+    log_values = [math.log(value) for _, value in points]
+    fits = []
+    for model, xs in (('power', [math.log(size) for size, _ in points]),
+                      ('exponential', [float(size) for size, _ in points])):
+        n = len(xs)
+        mean_x = sum(xs) / n
+        mean_y = sum(log_values) / n
+        sxx = sum((x - mean_x) ** 2 for x in xs)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, log_values))
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+        total = sum((y - mean_y) ** 2 for y in log_values)
+        residual = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, log_values))
+        fits.append(ScalingFitStatistics(model=model, coefficient=math.exp(intercept), exponent=slope,
+                                         r_squared=1 - residual / total if total else 1.0))
+    return fits
+
+
+def _inverse(fit: ScalingFitStatistics, value: float) -> Optional[float]:
+    """Size at which fitted model reaches value, None if model does not grow"""
+    if fit.exponent <= 0:
+        return None
+    if fit.model == 'power':
+        return (value / fit.coefficient) ** (1 / fit.exponent)
+    return math.log(value / fit.coefficient) / fit.exponent
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Callable, Tuple
+
+from src.statistics.stats import TestRunStatistics, ExecutionStatistics, OutputStatistics, SATStatus
+
+
+@dataclass
+class Job:
+    """Single execution unit of benchmark: one test run of one test suite against one input file"""
+    test_suite: TestSuite
+    test_run: TestRun
+    test_input: TestInput
+    original_path: str
+    input_path: str
+    translator: Optional[Translator] = None
+    translated_path: Optional[str] = None
+    """file in format of test run, input_path is its flattened copy if test run flattens includes"""
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Jobs with the same key run the same command on different files"""
+        return self.test_suite.name, self.test_run.name
+
+    def prepare(self):
+        """Translate (and flatten) input files, they are written once by the first job of test input"""
+        self.test_input.as_format(self.test_run.format)
+        # translator removes output of failed translation, run reports it
+        if self.test_run.flatten_includes and (self.translator is None or os.path.isfile(self.translated_path)):
+            self.test_input.flattened(self.original_path, self.translated_path)
+
+    def run(self, timeout: float, memory_guard: Callable[[MonitoredProcess], bool] = None,
+            prepare: bool = True) -> TestRunStatistics:
+        """Synchronously run this job, kill it after timeout seconds
+        :param prepare: prepare input files first, False if they were prepared by other process (coordinator)
+        """
+        if prepare:
+            self.prepare()
+        return self.test_run.run_file(executable=self.test_suite.executable, options=self.test_suite.options,
+                                      PATH=self.test_suite.PATH, test_input=self.test_input,
+                                      original_path=self.original_path, test_input_path=self.input_path,
+                                      translator=self.translator, capture_stdout=self.test_suite.capture_stdout,
+                                      timeout=timeout, memory_guard=memory_guard,
+                                      solver=self.test_suite.solver)
+
+    def pruned(self, timeout: float) -> TestRunStatistics:
+        """Result of this job when it is not run"""
+        return self._not_run(timeout, OutputStatistics(status=SATStatus.PRUNED))
+
+    def failed(self, timeout: float, error: str) -> TestRunStatistics:
+        """Result of this job when running it raised error"""
+        return self._not_run(timeout, OutputStatistics(status=SATStatus.ERROR, stderr=error))
+
+    def _not_run(self, timeout: float, output: OutputStatistics) -> TestRunStatistics:
+        minimal_statistics, input_statistics = self.test_input.get_file_statistics(file_path=self.original_path)
+        minimal_statistics.translated_with = self.translator
+        return TestRunStatistics(name=self.test_run.name,
+                                 command=self.test_run.build_command(executable=self.test_suite.executable,
+                                                                     input_filepath=self.input_path,
+                                                                     suite_options=self.test_suite.options),
+                                 minimal_input_statistics=minimal_statistics, input_statistics=input_statistics,
+                                 execution_statistics=ExecutionStatistics(), timeout=timeout,
+                                 output=output)
@@ -1,21 +1,27 @@
 """see http://eyalarubas.com/python-subproc-nonblock.html"""
+import time
 from queue import Queue, Empty
 from threading import Thread
 
 # from Queue import Queue, Empty
-from typing import IO, NoReturn
+from typing import IO, NoReturn, Optional, Pattern
 
 
 class NonBlockingStreamReader:
 
-    def __init__(self, stream):
+    def __init__(self, stream, marker: Optional[Pattern] = None):
         """
         stream: the stream to read from.
                 Usually a process' stdout or stderr.
+        marker: time of first line matching it is recorded
+        times are time.perf_counter() when line was read, solvers that buffer output written to pipe
+        report it when they flush it
         """
 
         self._s = stream
         self._q = Queue()
+        self.first_line_time: Optional[float] = None
+        self.marker_time: Optional[float] = None
 
         def _populate_queue(stream: IO, queue: Queue) -> NoReturn:
             """
@@ -25,6 +31,10 @@ class NonBlockingStreamReader:
             while True:
                 line = stream.readline()
                 if line:
+                    if self.first_line_time is None:
+                        self.first_line_time = time.perf_counter()
+                    if self.marker_time is None and marker is not None and marker.search(line):
+                        self.marker_time = time.perf_counter()
                     queue.put(line)
                 else:
                     # raise error?
@@ -42,6 +52,10 @@ class NonBlockingStreamReader:
         except Empty:
             return ''
 
+    def join(self, timeout=None) -> NoReturn:
+        """Wait until stream is read to the end (process exited and closed its output)"""
+        self._t.join(timeout)
+
     def readall(self):
         while not self._q.empty():
             yield self._q.get_nowait()
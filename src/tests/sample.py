@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, ClassVar, Optional
+
+from src.errors import BenchmarkException
+from src.log import get_logger
+from src.statistics.stats import SATStatus, SampleStatistics, SampleStratumStatistics, SampleEstimateStatistics
+
+logger = get_logger()
+
+_solved = (SATStatus.SATISFIABLE.value, SATStatus.UNSATISFIABLE.value)
+
+
+@dataclass
+class Sample:
+    """Stratified random sample of files of test input
+    files are grouped into strata by input statistics and by difficulty in previous benchmark (history),
+    every stratum gets number of sampled files proportional to its size
+    strata: clauses - number of clauses (file size if statistics are not available) in powers of 2,
+    clause_sizes - average clause size, sat_type - SAT type, difficulty - best solve time in history (in powers of 10)
+    """
+    size: int
+    seed: int = 0
+    strata: List[str] = field(default_factory=lambda: list(Sample.strata_kinds))
+    history: Optional[str] = None
+    """output of previous benchmark (statistics JSON) used for difficulty"""
+    population: Dict[str, Tuple[str, ...]] = field(default_factory=dict, repr=False)
+    """Dict[file, stratum] of all files of test input"""
+    files: List[str] = field(default_factory=list, repr=False)
+
+    strata_kinds: ClassVar[List[str]] = ['clauses', 'clause_sizes', 'sat_type', 'difficulty']
+
+    def __post_init__(self):
+        if self.size < 1:
+            raise BenchmarkException("sample size should be positive", self)
+        if any(stratum not in Sample.strata_kinds for stratum in self.strata):
+            raise BenchmarkException(f"sample strata should be some of {Sample.strata_kinds}", self)
+
+    def select(self, test_input: TestInput) -> List[str]:
+        """Stratify files of test_input and select sample, :return: sampled files in original order"""
+        history = self._load_history()
+        self.population = {file: self._stratum(test_input, file, history) for file in test_input.files}
+        strata = {}
+        for file, stratum in self.population.items():
+            strata.setdefault(stratum, []).append(file)
+
+        rng = random.Random(self.seed)
+        selected = set()
+        for stratum, allocation in self._allocate(strata).items():
+            selected.update(rng.sample(strata[stratum], allocation))
+        self.files = [file for file in test_input.files if file in selected]
+        logger.info(f'Sampled {len(self.files)} of {len(self.population)} files of {test_input.name} '
+                    f'from {len(strata)} strata')
+        return self.files
+
+    def statistics(self, results: List[Tuple[str, TestRunStatistics]]) -> SampleStatistics:
+        """Estimate full set metrics of every test run from results of sampled files
+        :param results: (test suite program name, result) of runs of sampled files
+        """
+        strata = {}
+        for file, stratum in self.population.items():
+            strata.setdefault(stratum, [0, 0])[0] += 1
+        for file in self.files:
+            strata[self.population[file]][1] += 1
+        statistics = SampleStatistics(population=len(self.population), size=len(self.files), seed=self.seed,
+                                      strata=[SampleStratumStatistics(stratum=list(stratum), population=population,
+                                                                      sampled=sampled)
+                                              for stratum, (population, sampled) in sorted(strata.items())])
+
+        runs = {}
+        for program_name, result in results:
+            path = result.minimal_input_statistics.path
+            if path in self.population:
+                runs.setdefault((program_name, result.name), []).append(
+                    (path, result.output.status.value, result.execution_statistics.execution_time))
+        history = self._load_history()
+        for (program_name, name), run_results in runs.items():
+            estimate = SampleEstimateStatistics(program_name=program_name, test_run=name, runs=len(run_results))
+            estimate.solved_fraction, estimate.solved_fraction_standard_error = self._estimate(
+                [(path, float(status in _solved)) for path, status, _ in run_results])
+            estimate.mean_time, estimate.mean_time_standard_error = self._estimate(
+                [(path, time) for path, _, time in run_results])
+            past = history.get((program_name, name), {})
+            if self.population.keys() <= past.keys():
+                # how far the estimate from the same sample was from the full set in previous benchmark
+                estimate.history_solved_fraction = sum(past[path][0] in _solved for path in self.population) \
+                                                   / len(self.population)
+                estimate.history_solved_fraction_estimate, _ = self._estimate(
+                    [(path, float(past[path][0] in _solved)) for path in self.files])
+            statistics.estimates.append(estimate)
+        return statistics
+
+    def _estimate(self, values: List[Tuple[str, float]]) -> Tuple[Optional[float], Optional[float]]:
+        """Stratified estimate of mean of values over population and its standard error,
+        strata without values are left out (their weight is spread over the other strata)
+        """
+        by_stratum = {}
+        for path, value in values:
+            by_stratum.setdefault(self.population[path], []).append(value)
+        population = {}
+        for stratum in self.population.values():
+            population[stratum] = population.get(stratum, 0) + 1
+        covered = sum(population[stratum] for stratum in by_stratum)
+        if not covered:
+            return None, None
+
+        mean = 0
+        variance = 0
+        for stratum, stratum_values in by_stratum.items():
+            weight = population[stratum] / covered
+            n = len(stratum_values)
+            stratum_mean = sum(stratum_values) / n
+            mean += weight * stratum_mean
+            if n > 1:
+                stratum_variance = sum((value - stratum_mean) ** 2 for value in stratum_values) / (n - 1)
+                variance += weight ** 2 * (1 - n / population[stratum]) * stratum_variance / n
+        return mean, math.sqrt(variance)
+
+    def _allocate(self, strata: Dict[tuple, List[str]]) -> Dict[tuple, int]:
+        """Proportional allocation of sample size to strata (largest remainder method)"""
+        total = sum(len(files) for files in strata.values())
+        size = min(self.size, total)
+        quotas = {stratum: size * len(files) / total for stratum, files in strata.items()}
+        allocation = {stratum: int(quota) for stratum, quota in quotas.items()}
+        for stratum in sorted(quotas, key=lambda stratum: allocation[stratum] - quotas[stratum])[
+                         :size - sum(allocation.values())]:
+            allocation[stratum] += 1
+        return allocation
+
+    def _stratum(self, test_input: TestInput, file: str, history: Dict[tuple, Dict[str, tuple]]) -> Tuple[str, ...]:
+        stratum = []
+        stats = None
+        if any(kind in self.strata for kind in ('clauses', 'clause_sizes', 'sat_type')):
+            _, stats = test_input.get_file_statistics(file_path=file)
+        for kind in self.strata:
+            if kind == 'clauses':
+                clauses = getattr(stats, 'number_of_clauses', None)
+                if clauses is not None:
+                    stratum.append(f'clauses {_bucket(int(clauses))}')
+                else:
+                    size = test_input.catalog.size(file) if test_input.catalog is not None else None
+                    if size is None:
+                        size = os.path.getsize(file) if os.path.isfile(file) else 0
+                    stratum.append(f'size {_bucket(size)}')
+            elif kind == 'clause_sizes':
+                sizes = getattr(stats, 'clause_lengths', None) or getattr(stats, 'clause_sizes', None) or {}
+                clauses = sum(sizes.values())
+                average = sum(int(size) * count for size, count in sizes.items()) / clauses if clauses else None
+                stratum.append('clause size unknown' if average is None else f'clause size {round(average)}')
+            elif kind == 'sat_type':
+                sat_type = getattr(stats, 'SAT_type', None)
+                stratum.append(f'type {sat_type.name if sat_type is not None else "unknown"}')
+            else:
+                past = [runs[file] for runs in history.values() if file in runs]
+                times = [time for status, time in past if status in _solved]
+                if not past:
+                    stratum.append('difficulty unknown')
+                elif not times:
+                    stratum.append('unsolved')
+                else:
+                    limit = 1
+                    while min(times) > limit:
+                        limit *= 10
+                    stratum.append(f'solved within {limit}s')
+        return tuple(stratum)
+
+    def _load_history(self) -> Dict[tuple, Dict[str, tuple]]:
+        """Dict[(program name, test run name), Dict[file, (status, execution time)]] of previous benchmark"""
+        if self.history is None or not os.path.isfile(self.history):
+            return {}
+        try:
+            with open(self.history, 'r') as fp:
+                statistics = json.load(fp)
+            history = {}
+            for test_suite in statistics['test_suites']:
+                for test_run in test_suite['test_run']:
+                    runs = history.setdefault((test_suite['program_name'], test_run['name']), {})
+                    runs[test_run['minimal_input_statistics']['path']] = (
+                        test_run['output']['status'], test_run['execution_statistics']['execution_time'])
+            return history
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'History {self.history} for sampling could not be read: {e}')
+            return {}
+
+
+def _bucket(number: int) -> str:
+    """Power of 2 range the number is in"""
+    if number <= 0:
+        return '0'
+    low = 2 ** (number.bit_length() - 1)
+    return f'{low}-{2 * low - 1}'
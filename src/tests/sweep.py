@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, ClassVar, Optional, NoReturn
+
+from src.errors import BenchmarkException
+from src.statistics.stats import SATStatus, SweepConfigurationStatistics
+
+
+@dataclass
+class Sweep:
+    """Expand test run into one test run per combination of option values
+    options maps option prefix to list of values, option is prefix + value,
+    true adds only prefix, false omits option
+    modes: grid - all combinations, random - samples random combinations,
+    latin_hypercube - samples combinations so every value of every option is used evenly
+    if prune_after is set, configurations are compared with successive halving: after first prune_after inputs
+    only keep fraction of best configurations continue, every next round has twice as many inputs
+    """
+    name: str
+    options: Dict[str, List[Any]]
+    mode: str = 'grid'
+    samples: int = None
+    seed: int = 0
+    prune_after: int = 0
+    keep: float = 0.5
+    configurations: List[SweepConfigurationStatistics] = field(default_factory=list)
+
+    modes: ClassVar[List[str]] = ['grid', 'random', 'latin_hypercube']
+
+    def __post_init__(self):
+        if self.mode not in Sweep.modes:
+            raise BenchmarkException(f"sweep mode should be one of {Sweep.modes}", self)
+        if not self.options or any(not isinstance(values, list) or not values for values in self.options.values()):
+            raise BenchmarkException("sweep options should map option to non empty list of values", self)
+        if self.mode != 'grid' and (self.samples is None or self.samples < 1):
+            raise BenchmarkException(f"sweep mode {self.mode} requires positive samples", self)
+        if not 0 < self.keep < 1:
+            raise BenchmarkException("sweep keep should be between 0 and 1", self)
+
+    def parameters(self) -> List[Dict[str, Any]]:
+        """Combinations of option values that should be tested"""
+        names = list(self.options)
+        values = [self.options[name] for name in names]
+        rng = random.Random(self.seed)
+        if self.mode == 'grid':
+            combinations = list(itertools.product(*values))
+        elif self.mode == 'random':
+            sizes = [len(option_values) for option_values in values]
+            total = _product(sizes)
+            combinations = []
+            for number in rng.sample(range(total), min(self.samples, total)):
+                combination = []
+                for option_values in values:
+                    number, index = divmod(number, len(option_values))
+                    combination.append(option_values[index])
+                combinations.append(tuple(combination))
+        else:
+            columns = []
+            for option_values in values:
+                strata = rng.sample(range(self.samples), self.samples)
+                columns.append([option_values[int((stratum + rng.random()) / self.samples * len(option_values))]
+                                for stratum in strata])
+            combinations = list(zip(*columns))
+
+        parameters = []
+        for combination in combinations:
+            combination = dict(zip(names, combination))
+            if combination not in parameters:
+                parameters.append(combination)
+        return parameters
+
+    @staticmethod
+    def option(prefix: str, value: Any) -> Optional[str]:
+        if value is True:
+            return prefix
+        if value is False:
+            return None
+        return f'{prefix}{value}'
+
+    def expand(self, test_run: TestRun) -> List[TestRun]:
+        """One test run (with the same inputs) per combination of option values"""
+        test_runs = []
+        for parameters in self.parameters():
+            options = [Sweep.option(prefix, value) for prefix, value in parameters.items()]
+            options = [option for option in options if option is not None]
+            name = f"{test_run.name} [{' '.join(options)}]"
+            test_runs.append(dataclasses.replace(test_run, name=name, options=test_run.options + options,
+                                                 sweep=self))
+            self.configurations.append(SweepConfigurationStatistics(name=name, parameters=parameters))
+        return test_runs
+
+    def stage(self, position: int) -> int:
+        """Round of successive halving in which input with this position is run"""
+        if not self.prune_after:
+            return 0
+        stage = 0
+        boundary = self.prune_after
+        while position >= boundary:
+            stage += 1
+            boundary += self.prune_after * 2 ** stage
+        return stage
+
+    def reset(self) -> NoReturn:
+        """Forget results of previous benchmark"""
+        for configuration in self.configurations:
+            configuration.runs = configuration.solved = 0
+            configuration.par2_time = 0
+            configuration.pruned = False
+
+    def evaluate(self, results: List[TestRunStatistics]) -> NoReturn:
+        """Count solved inputs and PAR2 time (unsolved input costs twice its timeout) of every configuration"""
+        configurations = {configuration.name: configuration for configuration in self.configurations}
+        for configuration in self.configurations:
+            configuration.runs = configuration.solved = 0
+            configuration.par2_time = 0
+        for result in results:
+            configuration = configurations.get(result.name)
+            if configuration is None:
+                continue
+            configuration.runs += 1
+            if result.output.status in (SATStatus.SATISFIABLE, SATStatus.UNSATISFIABLE):
+                configuration.solved += 1
+                configuration.par2_time += result.execution_statistics.execution_time
+            else:
+                configuration.par2_time += 2 * (result.timeout or 0)
+
+    def prune(self, results: List[TestRunStatistics]) -> List[str]:
+        """Rank configurations that were not pruned yet by results so far (solved count, then PAR2 time)
+        and keep the best ones
+        :return: names of pruned configurations
+        """
+        self.evaluate(results)
+        ranking = sorted((configuration for configuration in self.configurations if not configuration.pruned),
+                         key=lambda configuration: (-configuration.solved, configuration.par2_time))
+        pruned = ranking[max(1, math.ceil(len(ranking) * self.keep)):]
+        for configuration in pruned:
+            configuration.pruned = True
+        return [configuration.name for configuration in pruned]
+
+
+def _product(numbers: List[int]) -> int:
+    result = 1
+    for number in numbers:
+        result *= number
+    return result
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import os
-from concurrent.futures.process import ProcessPoolExecutor
-from dataclasses import dataclass, field
-from typing import List, ClassVar, Tuple, Optional
+import threading
+from concurrent.futures.thread import ThreadPoolExecutor
+from dataclasses import dataclass, field, InitVar
+from typing import List, ClassVar, Tuple, Optional, Dict
 
+from src import input_files
 from src.errors import BenchmarkException
 from src.log import get_logger
-from src.parsers.parsers import get_statistics_parser
-from src.statistics.stats import MinimalSATStatistics
+from src.parsers.parsers import get_statistics_parser, Formats
+from src.parsers.statistics_parsers.tptp_parser import TPTPParser
+from src.statistics.stats import MinimalSATStatistics, TranslationStatistics, TranslatorThroughputStatistics
 from src.translators import Translator
 
 logger = get_logger()
@@ -23,21 +28,50 @@ class TestInput:
     files: List[str] = field(default_factory=list)
     gather_statistics_from_json_file: bool = False
     gather_statistics_from_formula_file: bool = False
+    sample: Sample = None
+    """stratified sample files were selected by"""
+    family: ProblemFamily = None
+    """generator of files of this input"""
+    check_files: InitVar[bool] = True
+    """check that every file exists, files resolved with catalog do not need it"""
+    _translated: Dict[str, Tuple[List[str], List[str], List[Optional[Translator]]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    """cache of as_format results by format"""
+    _statistics: Dict[str, tuple] = field(default_factory=dict, init=False, repr=False, compare=False)
+    """cache of get_file_statistics results by file path"""
+    _flattened: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    """cache of flattened results by file path"""
+    _canonical_hashes: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    """cache of canonical_hash results by file path"""
+    _translations: Dict[str, Dict[str, TranslationStatistics]] = field(default_factory=dict, init=False,
+                                                                       repr=False, compare=False)
+    """Dict[format, Dict[file path, statistics of its translation]]"""
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    """files are translated and flattened once, by the first job that needs them"""
 
     translators: ClassVar[List[Translator]] = []
 
+    catalog: ClassVar[Optional[InputCatalog]] = None
+    """index of input files (sizes, content hashes) loaded by Config"""
+
     cache_path: ClassVar[str] = ".cache"
 
-    def __post_init__(self):
+    def __post_init__(self, check_files):
         if self.path is not None and not os.path.isabs(self.path):
             self.path = os.path.realpath(os.path.join(self.cwd, self.path))
 
-        for file in self.files:
+        for file in self.files if check_files else []:
             if not os.path.isfile(os.path.join(self.path, file)):
                 raise BenchmarkException(f"file {file} does not exists (is not a file)", self)
 
-    # todo add caching, make it static
     def get_file_statistics(self, file_path: str):
+        """Statistics of file, input statistics are read once, minimal statistics are new for every call"""
+        if file_path not in self._statistics:
+            self._statistics[file_path] = self._get_file_statistics(file_path)
+        min_stats, stats = self._statistics[file_path]
+        return copy.copy(min_stats), stats
+
+    def _get_file_statistics(self, file_path: str):
         # [MinimalSATStatistics, ConjunctiveNormalFormFirstOrderLogicSATStatistics, ConjunctiveNormalFormPropositionalTemporalLogicFormulaInfo]:
         parser = get_statistics_parser(format_name=self.format)
         min_stats = MinimalSATStatistics(name=self.name, path=file_path, format=self.format)
@@ -52,7 +86,7 @@ class TestInput:
             return min_stats, stats
         if self.gather_statistics_from_json_file:
             try:
-                stats = parser.get_file_input_statistics(file_path + '.json')
+                stats = parser.get_file_input_statistics(input_files.plain_name(file_path) + '.json')
                 stats.name = self.name
                 return min_stats, stats
             except FileNotFoundError:
@@ -61,12 +95,9 @@ class TestInput:
 
         return MinimalSATStatistics(name=self.name, path=file_path), None
 
-    # todo add caching
-    def as_format(self, desired_format: str) -> Tuple[List[str], List[str], List[Optional[Translator]]]:
-        """Convert self.files to different format
-        Cache files will be written to cwd/self._cache_path/self.name/desired_format
-        new extension is specified by translator
-        :return path to files in specified format and statistics about this file
+    def format_paths(self, desired_format: str) -> Tuple[List[str], List[str], List[Optional[Translator]]]:
+        """Paths of self.files in different format (see as_format), nothing is translated or written
+        :return original paths, paths in desired format and translator of every file
         """
         if desired_format == self.format:
             # keep the followwing lists the same size
@@ -79,28 +110,116 @@ class TestInput:
         else:
             raise BenchmarkException(f"No translator from {self.format} to {desired_format} found")
 
-        pool = ProcessPoolExecutor(max_workers=8)
         out_file_paths = []
-        translators = []
         for file in self.files:
-            in_file_path = os.path.realpath(os.path.join(self.path, file))
             # /cwd/self._cache_path/self.name/desired_format/dir_structure(file)/file.extension
             out_file_path = os.path.join(self.cwd, TestInput.cache_path, self.name, desired_format,
-                                         os.path.relpath(file, start=self.path))
+                                         os.path.relpath(input_files.plain_name(file), start=self.path))
             dirname, filename = os.path.split(out_file_path)
-            if not os.path.exists(dirname):
-                os.makedirs(dirname)
             extension = '' if translator.extension is None else translator.extension
-            out_file_path = os.path.join(dirname, os.path.splitext(filename)[0] + extension)
+            out_file_paths.append(os.path.join(dirname, os.path.splitext(filename)[0] + extension))
+        return self.files, out_file_paths, [translator for _ in self.files]
 
-            future = pool.submit(translator.translate, in_file_path, out_file_path)
-            future.add_done_callback(lambda x: logger.info(
-                f"Translated {in_file_path} from {translator.from_format} to {translator.to_format} to {out_file_path}"))
+    def as_format(self, desired_format: str) -> Tuple[List[str], List[str], List[Optional[Translator]]]:
+        """Convert self.files to different format, files are translated once
+        Cache files will be written to cwd/self._cache_path/self.name/desired_format
+        new extension is specified by translator
+        :return path to files in specified format and statistics about this file
+        """
+        with self._lock:
+            if desired_format not in self._translated:
+                self._translated[desired_format] = self._as_format(desired_format)
+            return self._translated[desired_format]
+
+    def _as_format(self, desired_format: str) -> Tuple[List[str], List[str], List[Optional[Translator]]]:
+        files, out_file_paths, translators = self.format_paths(desired_format)
+        if desired_format == self.format:
+            return files, out_file_paths, translators
+
+        translator = translators[0] if translators else None
+        futures = {}
+        # translators are separate processes, threads only wait for them
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for file, out_file_path in zip(files, out_file_paths):
+                in_file_path = os.path.realpath(os.path.join(self.path, file))
+                os.makedirs(os.path.dirname(out_file_path), exist_ok=True)
+                futures[file] = pool.submit(translator.translate, in_file_path, out_file_path)
+
+        self._translations[desired_format] = {}
+        for (file, future), out_file_path in zip(futures.items(), out_file_paths):
+            statistics = future.result()
+            self._translations[desired_format][file] = statistics
+            if statistics.succeeded:
+                logger.info(f"Translated {file} from {translator.from_format} to {translator.to_format} "
+                            f"to {out_file_path}")
+        return files, out_file_paths, translators
+
+    def translation(self, desired_format: str, file_path: str) -> Optional[TranslationStatistics]:
+        """Statistics of translation of file to desired_format, None if file was not translated"""
+        return self._translations.get(desired_format, {}).get(file_path)
+
+    def translation_throughput(self) -> List[TranslatorThroughputStatistics]:
+        """Throughput of translators of this input, one per translated format"""
+        throughput = []
+        for desired_format, translations in self._translations.items():
+            if not translations:
+                continue
+            first = next(iter(translations.values()))
+            statistics = TranslatorThroughputStatistics(test_input=self.name, from_format=first.from_format,
+                                                        to_format=first.to_format, executable=first.command[0])
+            for translation in translations.values():
+                statistics.files += 1
+                statistics.failed += not translation.succeeded
+                statistics.input_bytes += translation.input_size or 0
+                statistics.output_bytes += translation.output_size or 0
+                execution_statistics = translation.execution_statistics
+                if execution_statistics is not None:
+                    statistics.total_time += execution_statistics.execution_time
+                    if execution_statistics.peak_memory is not None:
+                        statistics.peak_memory = max(statistics.peak_memory or 0, execution_statistics.peak_memory)
+            if statistics.total_time:
+                statistics.files_per_second = statistics.files / statistics.total_time
+                statistics.input_bytes_per_second = statistics.input_bytes / statistics.total_time
+            throughput.append(statistics)
+        return throughput
+
+    def canonical_hash(self, file_path: str) -> str:
+        """Hash that is equal for equivalent files, TPTP files are compared up to renaming of symbols and
+        order of clauses, files of other formats by content
+        """
+        if file_path not in self._canonical_hashes:
+            if self.format == Formats.TPTP.value:
+                canonical_hash = TPTPParser.canonical_hash(file_path)
+            elif input_files.is_plain(file_path) and TestInput.catalog is not None:
+                canonical_hash = TestInput.catalog.content_hash(file_path)
+            else:
+                canonical_hash = hashlib.blake2b(input_files.read_input(file_path), digest_size=16).hexdigest()
+            self._canonical_hashes[file_path] = canonical_hash
+        return self._canonical_hashes[file_path]
+
+    def flattened_path(self, original_path: str) -> str:
+        """Path of copy of TPTP file with include directives replaced by included formulas (see flattened),
+        nothing is written
+        """
+        return os.path.join(self.cwd, TestInput.cache_path, self.name, 'tptp-flattened',
+                            os.path.relpath(input_files.plain_name(original_path), start=self.path))
 
-            out_file_paths.append(out_file_path)
-            translators.append(translator)
-        pool.shutdown(wait=True)
-        return self.files, out_file_paths, translators
+    def flattened(self, original_path: str, file_path: str) -> str:
+        """Path of copy of TPTP file with include directives replaced by included formulas
+        Copy is written to cwd/self._cache_path/self.name/format-flattened once,
+        it is written again only if file is newer than the copy
+        """
+        with self._lock:
+            if file_path not in self._flattened:
+                out_file_path = self.flattened_path(original_path)
+                source_path, _ = input_files.split_member(file_path)
+                if not os.path.isfile(out_file_path) \
+                        or os.path.getmtime(out_file_path) < os.path.getmtime(source_path):
+                    os.makedirs(os.path.dirname(out_file_path), exist_ok=True)
+                    TPTPParser.flatten(file_path, out_file_path)
+                    logger.info(f"Flattened includes of {file_path} to {out_file_path}")
+                self._flattened[file_path] = out_file_path
+            return self._flattened[file_path]
 
 
 if __name__ == '__main__':
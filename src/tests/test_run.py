@@ -3,23 +3,56 @@ from __future__ import annotations
 import os
 import subprocess
 import time
+from contextlib import ExitStack
 from dataclasses import dataclass, field
-from typing import List, Generator
+from threading import Thread
+from typing import List, Optional, Callable, IO, NoReturn, ClassVar
 
 import psutil
 
-from src.benchmark import Benchmark
+from src import input_files
+from src import page_cache as page_cache_state
 from src.errors import BenchmarkException
+from src.launcher import get_launcher
 from src.log import get_logger
-from src.parsers.parsers import get_output_parser
+from src.parsers.parsers import get_output_parser, Formats
+from src.scratch import Scratch, size as scratch_size
+from src.statistics.machine_state import Interference
 from src.statistics.monitored_process import MonitoredProcess
-from src.statistics.stats import TestRunStatistics, SATStatus, OutputStatistics
+from src.statistics.perf_counters import PerfStat
+from src.statistics.resource_sampler import ResourceSampler
+from src.statistics.stats import TestRunStatistics, SATStatus, OutputStatistics, ExecutionStatistics
 from src.tests.non_blocking_stream_reader import NonBlockingStreamReader
+from src.tests.job import Job
 from src.tests.test_input import TestInput
+from src.translators import Translator
 
 logger = get_logger()
 
 
+def _feed(stream: IO[str], data: str) -> NoReturn:
+    """Write data to stdin of process and close it"""
+    try:
+        stream.write(data)
+        stream.close()
+    except (BrokenPipeError, ValueError):
+        # process exited (or was killed) before it read whole input
+        pass
+
+
+def _open_fd(stack: ExitStack, path: str) -> int:
+    """File descriptor for reading path (stdin of process), it is closed on exit of stack"""
+    fd = os.open(path, os.O_RDONLY)
+    stack.callback(os.close, fd)
+    return fd
+
+
+def _elapsed(start: float, *times: Optional[float]) -> Optional[float]:
+    """Seconds from start to the earliest of times, None if no time is set"""
+    times = [moment for moment in times if moment is not None]
+    return min(times) - start if times else None
+
+
 @dataclass
 class TestRun:
     name: str
@@ -29,6 +62,22 @@ class TestRun:
     input_as_last_argument: bool = False
     include_only: List[str] = field(default_factory=list)
     exclude: List[str] = field(default_factory=list)
+    sweep: Sweep = None
+    """sweep this test run was expanded from"""
+    flatten_includes: bool = False
+    """run prover with copies of TPTP inputs that have include directives replaced by included formulas"""
+
+    resource_sampling_interval: ClassVar[Optional[float]] = None
+    """seconds between samples of resource usage of every run, series are not recorded if None"""
+    resource_max_samples: ClassVar[int] = 1000
+    perf_stat: ClassVar[Optional[PerfStat]] = None
+    """hardware performance counters of every run are recorded if set"""
+    page_cache: ClassVar[Optional[str]] = None
+    """page cache policy of input files (warm or cold), page cache is not touched if None"""
+    scratch: ClassVar[Optional[Scratch]] = None
+    """every run gets its own working directory if set, otherwise runs in current directory"""
+    interference: ClassVar[Optional[Interference]] = None
+    """machine state of every run is recorded and runs disturbed by other load are flagged if set"""
 
     def __post_init__(self):
         if self.input_after_option and self.input_as_last_argument:
@@ -38,6 +87,9 @@ class TestRun:
         if self.exclude and self.include_only:
             raise BenchmarkException(f"exclude and include_only are mutually exclusive", self)
 
+        if self.flatten_includes and self.format.lower() != Formats.TPTP.value:
+            raise BenchmarkException("flatten_includes is supported only for TPTP format", self)
+
     def build_command(self, executable: str, input_filepath: str, suite_options: List[str] = None) -> List[str]:
         """Get command for this test case"""
         command = [executable]
@@ -68,75 +120,175 @@ class TestRun:
             result.extend(test_input for test_input in test_inputs if test_input.name not in self.include_only)
         return result
 
-    def run(self, executable: str, options: List[str], PATH: str, test_input: TestInput, capture_stdout: bool, ) -> \
-            Generator[
-                TestRunStatistics]:
-        """Synchronously runs executable with options and self.options against all files in test_input"""
-        logger.info(f'Running testcase {self.name}')
-        original_paths, translated_file_paths, translators = test_input.as_format(self.format)
-        for original_paths, test_input_path, translator in zip(original_paths, translated_file_paths, translators):
-            minimal_statistics, input_statistics = test_input.get_file_statistics(file_path=original_paths)
-            minimal_statistics.translated_with = translator
-            command = self.build_command(executable=executable, input_filepath=test_input_path, suite_options=options)
-            if not self.input_after_option and not self.input_as_last_argument:
-                if test_input_path != original_paths:
-                    logger.info(f'Executing {command} with file {os.path.abspath(original_paths)} '
-                                f'(translated {os.path.abspath(test_input_path)})')
-                else:
-                    logger.info(f'Executing {command} with file {os.path.abspath(original_paths)}')
+    def jobs(self, test_suite: TestSuite, test_input: TestInput) -> List[Job]:
+        """Expand this test case into one job per file of test_input (translated to self.format)
+        files are not translated (or flattened) here, job prepares its file before it runs
+        """
+        original_paths, translated_file_paths, translators = test_input.format_paths(self.format)
+        return [Job(test_suite=test_suite, test_run=self, test_input=test_input, original_path=original_path,
+                    input_path=test_input.flattened_path(original_path) if self.flatten_includes else test_input_path,
+                    translated_path=test_input_path, translator=translator)
+                for original_path, test_input_path, translator in zip(original_paths, translated_file_paths,
+                                                                      translators)]
+
+    def run_file(self, executable: str, options: List[str], PATH: str, test_input: TestInput, original_path: str,
+                 test_input_path: str, translator: Optional[Translator], capture_stdout: bool,
+                 timeout: float, memory_guard: Callable[[MonitoredProcess], bool] = None,
+                 solver: str = None) -> TestRunStatistics:
+        """Synchronously runs executable with options and self.options against single file from test_input
+        memory_guard is called while process runs, process is killed as out of memory if it returns True,
+        by default process is killed when system free memory is below 100MB
+        output is parsed by parser of solver (executable if not set)
+        """
+        minimal_statistics, input_statistics = test_input.get_file_statistics(file_path=original_path)
+        minimal_statistics.translated_with = translator
+        command = self.build_command(executable=executable, input_filepath=test_input_path, suite_options=options)
+        if translator is not None and not os.path.isfile(test_input_path):
+            # translator removes output of failed translation
+            logger.warning(f'Skipping {command}, translation of {original_path} to {self.format} failed')
+            return TestRunStatistics(name=self.name, command=command, minimal_input_statistics=minimal_statistics,
+                                     input_statistics=input_statistics,
+                                     execution_statistics=ExecutionStatistics(), timeout=timeout,
+                                     output=OutputStatistics(status=SATStatus.ERROR,
+                                                             stderr=f'translation to {self.format} failed'))
+        if not self.input_after_option and not self.input_as_last_argument:
+            if test_input_path != original_path:
+                logger.info(f'Executing {command} with file {os.path.abspath(original_path)} '
+                            f'(translated {os.path.abspath(test_input_path)})')
             else:
-                logger.info(f'Executing {command}')
+                logger.info(f'Executing {command} with file {os.path.abspath(original_path)}')
+        else:
+            logger.info(f'Executing {command}')
 
-            out_stats = OutputStatistics()
-            env = os.environ
-            if PATH:
-                env['PATH'] = PATH + ':' + env['PATH']
+        out_stats = OutputStatistics()
+        out_parser = get_output_parser(solver=solver or executable)
+        verdict_pattern = getattr(out_parser, 'verdict_pattern', None)
+        launcher = get_launcher(executable, PATH)
+        page_cache = None
+        scratch_peak = 0
+        with ExitStack() as stack:
+            stdin_data = None
+            run_command = launcher.command(command)
+            popen_options = launcher.options
+            directory = None
+            if TestRun.scratch is not None:
+                directory = stack.enter_context(TestRun.scratch.directory())
+                popen_options = dict(popen_options, cwd=directory, env={**launcher.env, 'TMPDIR': directory})
+                run_command = self.build_command(executable=launcher.executable,
+                                                 input_filepath=os.path.abspath(test_input_path),
+                                                 suite_options=options)
+            if input_files.is_plain(test_input_path):
+                page_cache = page_cache_state.prepare(test_input_path, TestRun.page_cache)
+                stdin = _open_fd(stack, test_input_path)
+            elif self.input_after_option or self.input_as_last_argument:
+                # prover needs file, decompress it to temporary file
+                plain_path = stack.enter_context(input_files.materialize(test_input_path))
+                run_command = self.build_command(executable=launcher.executable, input_filepath=plain_path,
+                                                 suite_options=options)
+                page_cache = page_cache_state.prepare(plain_path, TestRun.page_cache)
+                stdin = _open_fd(stack, plain_path)
+            else:
+                # decompress before measurement starts, then stream it to stdin (page cache does not matter)
+                stdin_data = input_files.read_input(test_input_path).decode()
+                stdin = subprocess.PIPE
+            sampler = None
+            if TestRun.resource_sampling_interval is not None:
+                sampler = ResourceSampler(interval=TestRun.resource_sampling_interval,
+                                          max_samples=TestRun.resource_max_samples)
+            perf_output = None
+            if TestRun.perf_stat is not None:
+                run_command, perf_output = TestRun.perf_stat.wrap(run_command)
+            machine_state = None
+            if TestRun.interference is not None:
+                machine_state = TestRun.interference.begin()
+                stack.callback(TestRun.interference.release)
             start = time.perf_counter()
-            with MonitoredProcess(command, stdin=open(test_input_path, 'r'), stdout=subprocess.PIPE,
-                                  stderr=subprocess.PIPE, env=env, text=True) as proc:
-                nbsr_stdout = NonBlockingStreamReader(stream=proc.stdout)
-                nbsr_stderr = NonBlockingStreamReader(stream=proc.stderr)
-                last_read = time.time()
-                while proc.poll() is None:
-                    time.sleep(0.01)
-                    if time.perf_counter() - start > Benchmark.test_case_timeout:
-                        proc.kill()
-                        out_stats.status = SATStatus.TIMEOUT
-                        break
-                    if psutil.virtual_memory().free < 100 * 1024 * 1024:  # 100MB
-                        proc.kill()
-                        out_stats.status = SATStatus.OUT_OF_MEMORY
-                        break
-                    if time.time() - last_read > 1:
-                        if capture_stdout:
-                            out_stats.stdout = ''.join(nbsr_stdout.readall())
-                        out_stats.stderr = ''.join(nbsr_stderr.readall())
-                        last_read = time.time()
-                if capture_stdout:
-                    out_stats.stdout += ''.join(nbsr_stdout.readall())
-                else:
-                    # clean buffer
-                    nbsr_stdout.readall()
-                # we want all stderr
-                out_stats.stderr += ''.join(nbsr_stderr.readall())
-
-            test_case_stats = TestRunStatistics(
-                name=self.name, command=command, minimal_input_statistics=minimal_statistics,
-                input_statistics=input_statistics, execution_statistics=proc.get_statistics())
-            if out_stats.status is None:
-                out_parser = get_output_parser(solver=executable)
-                if out_parser:
-                    out_stats.status = out_parser.parse_output(
-                        returncode=test_case_stats.execution_statistics.returncode,
-                        stdout=out_stats.stdout, stderr=out_stats.stderr)
-                else:
-                    logger.warning('There is no parser to set output SAT status. Status will be not set')
-            test_case_stats.output = out_stats
-            logger.info(f"Testcase '{self.name}' took "
-                        f"{test_case_stats.execution_statistics.execution_time:.2f}, "
-                        f"status: {test_case_stats.output.status}, "
-                        f"return code: {test_case_stats.execution_statistics.returncode}")
-            yield test_case_stats
+            proc = stack.enter_context(MonitoredProcess(run_command, stdin=stdin, stdout=subprocess.PIPE,
+                                                        stderr=subprocess.PIPE, text=True, sampler=sampler,
+                                                        wrapped=perf_output is not None,
+                                                        track_delay=machine_state is not None, **popen_options))
+            if stdin_data is not None:
+                feeder = Thread(target=_feed, args=(proc.stdin, stdin_data))
+                feeder.daemon = True
+                feeder.start()
+            nbsr_stdout = NonBlockingStreamReader(stream=proc.stdout, marker=verdict_pattern)
+            nbsr_stderr = NonBlockingStreamReader(stream=proc.stderr, marker=verdict_pattern)
+            last_read = time.time()
+            while proc.poll() is None:
+                time.sleep(0.01)
+                if time.perf_counter() - start > timeout:
+                    proc.kill()
+                    out_stats.status = SATStatus.TIMEOUT
+                    break
+                if memory_guard(proc) if memory_guard else psutil.virtual_memory().free < 100 * 1024 * 1024:
+                    proc.kill()
+                    out_stats.status = SATStatus.OUT_OF_MEMORY
+                    break
+                if time.time() - last_read > 1:
+                    if capture_stdout:
+                        out_stats.stdout += ''.join(nbsr_stdout.readall())
+                    out_stats.stderr += ''.join(nbsr_stderr.readall())
+                    last_read = time.time()
+                    if directory is not None:
+                        scratch_peak = max(scratch_peak, scratch_size(directory))
+                        if TestRun.scratch.exceeded(scratch_peak):
+                            logger.warning(f'Killing {command}, scratch directory has {scratch_peak} bytes')
+                            proc.kill()
+                            out_stats.status = SATStatus.ERROR
+                            break
+            # execution time ends when exit was seen or process was killed, nothing below is measured
+            proc.stop()
+            if machine_state is not None:
+                # window of snapshots is the run itself, release() is called when stack exits
+                machine_state = TestRun.interference.end(machine_state, cpu=proc.cpu)
+            # process exited, but reader threads may not have read its whole output yet
+            nbsr_stdout.join(timeout=1)
+            nbsr_stderr.join(timeout=1)
+            if capture_stdout:
+                out_stats.stdout += ''.join(nbsr_stdout.readall())
+            else:
+                # clean buffer
+                nbsr_stdout.readall()
+            # we want all stderr
+            out_stats.stderr += ''.join(nbsr_stderr.readall())
+            if directory is not None:
+                # final size, files written just before exit
+                scratch_peak = max(scratch_peak, scratch_size(directory))
+
+        test_case_stats = TestRunStatistics(
+            name=self.name, command=command, minimal_input_statistics=minimal_statistics,
+            input_statistics=input_statistics, execution_statistics=proc.get_statistics(), timeout=timeout,
+            page_cache=page_cache, machine_state=machine_state)
+        if machine_state is not None:
+            test_case_stats.interference = TestRun.interference.reasons(machine_state)
+        if TestRun.scratch is not None:
+            disk_writes = test_case_stats.execution_statistics.disk_writes
+            test_case_stats.scratch_size = scratch_peak
+            test_case_stats.excessive_writes = TestRun.scratch.exceeded(scratch_peak) or \
+                disk_writes is not None and TestRun.scratch.exceeded(disk_writes)
+        if TestRun.perf_stat is not None:
+            test_case_stats.execution_statistics.perf_counters = TestRun.perf_stat.counters(
+                perf_output, test_case_stats.execution_statistics)
+        test_case_stats.execution_statistics.time_to_first_output = _elapsed(
+            proc.start_time, nbsr_stdout.first_line_time, nbsr_stderr.first_line_time)
+        test_case_stats.execution_statistics.time_to_verdict = _elapsed(
+            proc.start_time, nbsr_stdout.marker_time, nbsr_stderr.marker_time)
+        if out_stats.status is None:
+            if out_parser:
+                out_stats.status = out_parser.parse_output(
+                    returncode=test_case_stats.execution_statistics.returncode,
+                    stdout=out_stats.stdout, stderr=out_stats.stderr)
+            else:
+                logger.warning('There is no parser to set output SAT status. Status will be not set')
+        if out_parser:
+            # solvers print statistics also when they are stopped by their own limits
+            out_stats.metrics = out_parser.parse_metrics(stdout=out_stats.stdout, stderr=out_stats.stderr)
+        test_case_stats.output = out_stats
+        logger.info(f"Testcase '{self.name}' took "
+                    f"{test_case_stats.execution_statistics.execution_time:.2f}, "
+                    f"status: {test_case_stats.output.status}, "
+                    f"return code: {test_case_stats.execution_statistics.returncode}")
+        return test_case_stats
 
 
 if __name__ == '__main__':
@@ -6,7 +6,7 @@ from typing import List
 
 from src.errors import BenchmarkException
 from src.log import get_logger
-from src.statistics.stats import TestSuiteStatistics
+from src.tests.job import Job
 from src.tests.test_input import TestInput
 
 logger = get_logger()
@@ -19,6 +19,8 @@ class TestSuite:
     PATH: str = None
     capture_stdout: bool = True
     version: str = None
+    solver: str = None
+    """name of solver output parser, executable is used to find it if not set"""
     options: List[str] = field(default_factory=list)
     test_runs: List[TestRun] = field(default_factory=list)
     test_inputs: List[TestInput] = field(default_factory=list)
@@ -30,22 +32,14 @@ class TestSuite:
         # todo warn if PATH does not exits
         # todo check if all formats are achievable (static method?) also unify this with Config
 
-    def run(self) -> TestSuiteStatistics:
-        """Synchronously run all test cases defined in this test suite"""
-        from src.tests import TestRun
-        test_suite_stats = TestSuiteStatistics(program_name=self.executable, program_version=self.version)
+    def jobs(self) -> List[Job]:
+        """Expand all test cases defined in this test suite into jobs"""
+        jobs = []
         for test_run in self.test_runs:
-            try:
-                for test_input in test_run.filter_inputs(self.test_inputs):
-                    test_run: TestRun
-                    test_run_stats = test_run.run(executable=self.executable, options=self.options, PATH=self.PATH,
-                                                  test_input=test_input, capture_stdout=self.capture_stdout)
-                    test_suite_stats.test_run.extend(test_run_stats)
-            except BenchmarkException as e:
-                logger.error(e)
-                continue
-            except KeyboardInterrupt:
-                logger.info("Keyboard interrupt")
-                continue
-
-        yield test_suite_stats
+            for test_input in test_run.filter_inputs(self.test_inputs):
+                try:
+                    jobs.extend(test_run.jobs(test_suite=self, test_input=test_input))
+                except BenchmarkException as e:
+                    logger.error(e)
+                    continue
+        return jobs
@@ -1,10 +1,16 @@
 import os
-import subprocess
+import tempfile
+import time
+from contextlib import ExitStack
 from dataclasses import dataclass, field, InitVar
-from typing import List, Optional
+from typing import List
 
+from src import input_files
 from src.errors import BenchmarkException
+from src.launcher import get_launcher
 from src.log import get_logger
+from src.statistics.monitored_process import MonitoredProcess
+from src.statistics.stats import TranslationStatistics
 
 logger = get_logger()
 
@@ -41,12 +47,43 @@ class Translator:
             raise BenchmarkException("Options input_after_option and input_as_last_argument are mutually exclusive",
                                      self)
 
-    def translate(self, input_filename: str, output_filename: str) -> Optional[subprocess.Popen]:
-        command = self.get_command(input_filename, output_filename)
-        env = os.environ
-        if self.PATH:
-            env['PATH'] = self.PATH + ':' + env['PATH']
-        return subprocess.Popen(command, stdin=open(input_filename, 'r'), stdout=open(output_filename, 'w'), env=env)
+    def translate(self, input_filename: str, output_filename: str) -> TranslationStatistics:
+        """Run translator and wait until it exits, process is monitored like solver run
+        output file is removed if translation failed (non zero exit code or empty output)
+        """
+        launcher = get_launcher(self.executable, self.PATH)
+        with ExitStack() as stack:
+            plain_filename = stack.enter_context(input_files.materialize(input_filename))
+            command = launcher.command(self.get_command(plain_filename, output_filename))
+            statistics = TranslationStatistics(from_format=self.from_format, to_format=self.to_format,
+                                               command=self.get_command(input_filename, output_filename),
+                                               input_size=os.path.getsize(plain_filename))
+            stdin = stack.enter_context(open(plain_filename, 'r'))
+            stdout = stack.enter_context(open(output_filename, 'w'))
+            stderr = stack.enter_context(tempfile.TemporaryFile(mode='w+'))
+            try:
+                proc = stack.enter_context(MonitoredProcess(command, stdin=stdin, stdout=stdout, stderr=stderr,
+                                                            **launcher.options))
+            except OSError as e:
+                proc = None
+                statistics.stderr = str(e)
+            while proc is not None and proc.poll() is None:
+                time.sleep(0.01)
+            stdout.close()
+            stderr.seek(0)
+            statistics.stderr += stderr.read()
+
+        if proc is not None:
+            statistics.execution_statistics = proc.get_statistics()
+            statistics.output_size = os.path.getsize(output_filename)
+            statistics.succeeded = proc.returncode == 0 and statistics.output_size > 0
+        if not statistics.succeeded:
+            logger.warning(f"Translation of {input_filename} from {self.from_format} to {self.to_format} failed "
+                           f"(return code {proc.returncode if proc is not None else None}, "
+                           f"output size {statistics.output_size}): {statistics.stderr.strip()[-200:]}")
+            if os.path.exists(output_filename):
+                os.unlink(output_filename)
+        return statistics
 
     def get_command(self, input_filename: str, output_filename: str) -> List[str]:
         """Command is composed as follows:
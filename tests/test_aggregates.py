@@ -0,0 +1,68 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from src.statistics.aggregates import Aggregator, QuantileSketch
+from src.statistics.stats import ExecutionStatistics, OutputStatistics, SATStatus
+
+QUANTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+
+
+def exact(values: list, q: float) -> float:
+    """quantile with the rank QuantileSketch uses"""
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def result(execution_time: float):
+    return SimpleNamespace(output=OutputStatistics(status=SATStatus.SATISFIABLE),
+                           execution_statistics=ExecutionStatistics(execution_time=execution_time))
+
+
+class QuantileSketchTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(0)
+
+    def values(self, n: int) -> list:
+        return [self.random.lognormvariate(0, 2) for _ in range(n)]
+
+    def assertQuantiles(self, statistics, values: list):
+        self.assertEqual(statistics.count, len(values))
+        for name, q in QUANTILES.items():
+            expected = exact(values, q)
+            self.assertLessEqual(abs(getattr(statistics, name) - expected), 0.01 * expected, name)
+
+    def test_add(self):
+        sketch = QuantileSketch()
+        values = self.values(5000)
+        for value in values:
+            sketch.add(value)
+        self.assertQuantiles(sketch.statistics(), values)
+
+    def test_replace(self):
+        aggregator = Aggregator()
+        values = self.values(2000)
+        for value in values:
+            aggregator.replace('suite', 'run', None, result(value))
+        # every other job is run again (next timeout), its result replaces the previous one
+        for index in range(0, len(values), 2):
+            value = self.random.lognormvariate(1, 1)
+            aggregator.replace('suite', 'run', result(values[index]), result(value))
+            values[index] = value
+        statistics, = aggregator.statistics()
+        self.assertEqual(statistics.runs, len(values))
+        self.assertQuantiles(statistics.execution_time, values)
+
+    def test_merge_lowest(self):
+        sketch = QuantileSketch(max_buckets=300)
+        values = self.values(5000)
+        for value in values:
+            sketch.add(value)
+        # lowest buckets were merged, only values below the merged buckets lose accuracy
+        self.assertIsNotNone(sketch._min_index)
+        self.assertLessEqual(len(sketch.buckets), 300)
+        self.assertLess(exact(values, 0.2), sketch.quantile(0.2))
+        self.assertQuantiles(sketch.statistics(), values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import importlib.util
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from src import daemon
+from src.daemon import Daemon
+from src.errors import BenchmarkException
+from src.tests import TestRun
+
+AUTHKEY = b'test secret'
+
+SOLVER = '''#!/bin/sh
+cat > /dev/null
+echo "SPASS beiseite: Proof found."
+'''
+
+CONFIG = '''[general]
+output_dir = "{name}.json"
+test_case_timeout = 5
+{general}
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["*.p"]
+format = "TPTP"
+
+[[testSuites]]
+name = "{name}"
+executable = "solver"
+solver = "spass"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "run"
+format = "tptp"
+options = []
+'''
+
+
+class ServeTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        with open('problem.p', 'w') as fp:
+            fp.write('cnf(c1,axiom,p(a)).\ncnf(c2,axiom,~p(X)).\n')
+        with open('solver', 'w') as fp:
+            fp.write(SOLVER)
+        os.chmod('solver', os.stat('solver').st_mode | stat.S_IEXEC)
+        for name, general in (('a', ''), ('b', f'page_cache = "warm"\nscratch = {{root = "{self.directory}"}}')):
+            with open(f'{name}.toml', 'w') as fp:
+                fp.write(CONFIG.format(name=name, general=general, directory=self.directory))
+        self.socket = os.path.join(self.directory, 'benchmark.sock')
+        self.server = threading.Thread(target=Daemon(socket_path=self.socket, authkey=AUTHKEY).serve)
+        self.server.daemon = True
+        self.server.start()
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.socket):
+            if not self.server.is_alive() or time.monotonic() > deadline:
+                self.fail(f'Daemon did not create socket {self.socket}')
+            time.sleep(0.01)
+
+    def tearDown(self):
+        daemon.request(self.socket, ('shutdown',), AUTHKEY)
+        self.server.join(timeout=1)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        TestRun.scratch = None
+        TestRun.page_cache = None
+
+    def run_config(self, name: str, loads=json.loads) -> dict:
+        submission = daemon.submit(self.socket, f'{name}.toml', authkey=AUTHKEY)
+        self.assertEqual(daemon.wait(self.socket, submission['id'], authkey=AUTHKEY)['state'], 'finished')
+        statistics = loads(daemon.results(self.socket, submission['id'], authkey=AUTHKEY))
+        return statistics['test_suites'][0]['test_run'][0]
+
+    def test_settings_of_every_config_are_restored(self):
+        first = self.run_config('a')
+        self.assertIsNone(first['page_cache'])
+        self.assertIsNone(first['scratch_size'])
+        second = self.run_config('b')
+        self.assertIsNotNone(second['page_cache'])
+        self.assertIsNotNone(second['scratch_size'])
+        again = self.run_config('a')
+        self.assertIsNone(again['page_cache'])
+        self.assertIsNone(again['scratch_size'])
+        self.assertEqual(again['output']['status'], first['output']['status'])
+
+
+    def test_socket_is_private_and_secret_is_required(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+        with self.assertRaises(BenchmarkException):
+            Daemon(socket_path=os.path.join(self.directory, 'other.sock'))
+        with self.assertRaises(BenchmarkException):
+            daemon.status(self.socket, 1)
+
+    @unittest.skipUnless(importlib.util.find_spec('msgpack'), 'msgpack is not installed')
+    def test_results_are_in_output_format_of_config(self):
+        import msgpack
+        with open('c.toml', 'w') as fp:
+            fp.write(CONFIG.format(name='c', general='output_format = "msgpack"', directory=self.directory))
+        self.assertEqual(self.run_config('c', loads=msgpack.unpackb)['name'], 'run')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from src.benchmark import Benchmark
+from src.config import Config
+from src.distributed import Coordinator, Worker
+from src.statistics.stats import SATStatus
+
+AUTHKEY = b'test secret'
+
+SOLVER = '''#!/bin/sh
+cat > /dev/null
+echo "SPASS beiseite: Proof found."
+'''
+
+CONFIG = '''[general]
+output_dir = "output.json"
+test_case_timeout = 5
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["*.p"]
+format = "TPTP"
+
+[[testSuites]]
+name = "prover"
+executable = "solver"
+solver = "spass"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "run"
+format = "tptp"
+options = []
+
+[[testSuites]]
+name = "missing prover"
+executable = "missing-solver"
+solver = "spass"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "run"
+format = "tptp"
+options = []
+'''
+
+
+def wait_for_listener(address: tuple, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(address).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class DistributedTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        for i in range(4):
+            with open(f'p{i}.p', 'w') as fp:
+                fp.write(f'cnf(c1,axiom,p(a{i})).\ncnf(c2,axiom,~p(X)).\n')
+        with open('solver', 'w') as fp:
+            fp.write(SOLVER)
+        os.chmod('solver', os.stat('solver').st_mode | stat.S_IEXEC)
+        self.config_text = CONFIG.format(directory=self.directory)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_coordinator_with_two_workers(self):
+        config = Config(config_file='config.toml')
+        config.load_config(config_text=self.config_text)
+        address = ('127.0.0.1', free_port())
+        Benchmark.test_case_timeout = config.test_case_timeout
+        coordinator = Coordinator(test_suite=config.test_suites, config_text=self.config_text, address=address,
+                                  authkey=AUTHKEY, heartbeat_interval=1)
+        statistics = []
+        runner = threading.Thread(target=lambda: statistics.append(coordinator.run()))
+        runner.daemon = True
+        runner.start()
+        wait_for_listener(address)
+        workers = [Worker(address=address, slots=2, authkey=AUTHKEY, name=f'worker {i}') for i in range(2)]
+        threads = [threading.Thread(target=worker.run) for worker in workers]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        runner.join(timeout=60)
+        for thread in threads:
+            thread.join(timeout=10)
+        self.assertEqual(len(statistics), 1)
+        statistics = statistics[0]
+
+        results = {test_suite.test_run[0].command[0]: [] for test_suite in statistics.test_suites}
+        for test_suite in statistics.test_suites:
+            for result in test_suite.test_run:
+                results[result.command[0]].append(result)
+        self.assertEqual(sum(len(runs) for runs in results.values()), 8)
+        for result in results['solver']:
+            self.assertEqual(result.output.status, SATStatus.SATISFIABLE)
+            self.assertIn(result.worker, {'worker 0', 'worker 1'})
+        for result in results['missing-solver']:
+            self.assertEqual(result.output.status, SATStatus.ERROR)
+            self.assertIn(result.worker, {'worker 0', 'worker 1'})
+
+if __name__ == '__main__':
+    unittest.main()
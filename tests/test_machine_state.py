@@ -0,0 +1,114 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from src.statistics import machine_state
+from src.statistics.machine_state import Interference
+
+CPUFREQ = '/sys/devices/system/cpu/cpu0/cpufreq'
+
+
+class Machine:
+    """Fixed contents of /proc and /sys files read by machine_state"""
+
+    def __init__(self):
+        self.time = 0.0
+        self.files = {}
+        self.delays = {}
+        """Dict[pid, nanoseconds it waited for cpu]"""
+
+    def set(self, time: float, jiffies: int, steal: int = 0, procs_running: int = 1, cpu_stall: int = 0,
+            own_delay: int = 0):
+        """:param cpu_stall: total microseconds some tasks waited for cpu"""
+        self.time = time
+        self.files['/proc/stat'] = f'cpu  {jiffies - steal} 0 0 0 0 0 0 {steal} 0 0\n' \
+                                   f'procs_running {procs_running}'
+        for resource, stall in (('cpu', cpu_stall), ('memory', 0), ('io', 0)):
+            self.files[f'/proc/pressure/{resource}'] = f'some avg10=0.00 avg60=0.00 avg300=0.00 total={stall}\n' \
+                                                       f'full avg10=0.00 avg60=0.00 avg300=0.00 total=0'
+        self.delays['self'] = own_delay
+
+    def read(self, path: str):
+        return self.files.get(path)
+
+    def run_delay(self, pid):
+        return self.delays.get(pid)
+
+
+class InterferenceTest(unittest.TestCase):
+    def setUp(self):
+        self.machine = Machine()
+        patcher = mock.patch.multiple(machine_state, _read=self.machine.read, _run_delay=self.machine.run_delay,
+                                      time=SimpleNamespace(perf_counter=lambda: self.machine.time),
+                                      _logical_cpus=4, _active=0, _job_delays={}, _finished_delay=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.interference = Interference()
+
+    def run_jobs(self, before: dict, after: dict, jobs: int = 1, cpu: int = None):
+        """Jobs run concurrently between snapshots before and after, return machine state of the first one"""
+        self.machine.set(**before)
+        starts = [Interference.begin() for _ in range(jobs)]
+        self.machine.set(**after)
+        state = self.interference.end(starts[0], cpu=cpu)
+        for _ in starts:
+            Interference.release()
+        return state
+
+    def test_idle_machine_is_not_flagged(self):
+        state = self.run_jobs(dict(time=0, jiffies=1000), dict(time=1, jiffies=1400, steal=4, cpu_stall=10000))
+        self.assertAlmostEqual(state.steal, 0.01)
+        self.assertAlmostEqual(state.cpu_pressure, 0.01)
+        self.assertEqual(state.memory_pressure, 0)
+        self.assertEqual(state.other_busy_processes, 0)
+        self.assertEqual(self.interference.reasons(state), [])
+
+    def test_concurrent_jobs_are_not_interference(self):
+        # this process and both jobs are runnable
+        state = self.run_jobs(dict(time=0, jiffies=1000, procs_running=3),
+                              dict(time=1, jiffies=1400, procs_running=3), jobs=2)
+        self.assertEqual(state.concurrent_jobs, 2)
+        self.assertEqual(state.other_busy_processes, 0)
+        self.assertEqual(self.interference.reasons(state), [])
+
+    def test_short_run_has_no_fractions(self):
+        state = self.run_jobs(dict(time=0, jiffies=1000), dict(time=0.05, jiffies=1020, steal=20, cpu_stall=50000))
+        self.assertIsNone(state.steal)
+        self.assertIsNone(state.cpu_pressure)
+        self.assertEqual(self.interference.reasons(state), [])
+
+    def test_few_jiffies_have_no_steal(self):
+        state = self.run_jobs(dict(time=0, jiffies=1000), dict(time=1, jiffies=1050, steal=50))
+        self.assertIsNone(state.steal)
+
+    def test_other_load_is_flagged(self):
+        state = self.run_jobs(dict(time=0, jiffies=1000, procs_running=2),
+                              dict(time=1, jiffies=1400, steal=40, procs_running=7, cpu_stall=500000))
+        self.assertAlmostEqual(state.steal, 0.1)
+        self.assertAlmostEqual(state.cpu_pressure, 0.5)
+        self.assertEqual(state.other_busy_processes, 5)
+        self.assertEqual(self.interference.reasons(state), ['steal', 'cpu_pressure', 'busy_processes'])
+
+    def test_own_delay_is_not_pressure(self):
+        # job waited for cpu (run delay recorded on poll), it is the only task that stalled
+        self.machine.set(time=0, jiffies=1000)
+        start = Interference.begin()
+        self.machine.delays[42] = 400_000_000
+        machine_state.record_delay(42)
+        machine_state.finish_delay(42)
+        self.machine.set(time=1, jiffies=1400, cpu_stall=450000, own_delay=20_000_000)
+        state = self.interference.end(start, cpu=None)
+        Interference.release()
+        self.assertAlmostEqual(state.cpu_pressure, 0.03)
+        self.assertEqual(self.interference.reasons(state), [])
+
+    def test_frequency_and_governor(self):
+        self.machine.files.update({f'{CPUFREQ}/scaling_cur_freq': '1200000', f'{CPUFREQ}/cpuinfo_max_freq': '3000000',
+                                   f'{CPUFREQ}/scaling_governor': 'powersave'})
+        state = self.run_jobs(dict(time=0, jiffies=1000), dict(time=1, jiffies=1400), cpu=0)
+        self.assertEqual((state.cpu_frequency, state.max_cpu_frequency, state.governor), (1200, 3000, 'powersave'))
+        self.assertEqual(self.interference.reasons(state), ['frequency', 'governor'])
+
+
+if __name__ == '__main__':
+    unittest.main()
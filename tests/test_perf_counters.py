@@ -0,0 +1,91 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from src.config import Config
+from src.statistics.stats import SATStatus
+from src.tests import TestRun
+
+# busy loop, counters of stub are derived from cpu time
+SOLVER = '''#!/bin/sh
+cat > /dev/null
+i=0
+while [ $i -lt 100000 ]; do i=$((i + 1)); done
+echo "SPASS beiseite: Proof found."
+'''
+
+CONFIG = '''[general]
+output_dir = "output.json"
+test_case_timeout = 10
+perf_counters = "{mode}"
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["p1.p"]
+format = "TPTP"
+
+[[testSuites]]
+name = "prover"
+executable = "solver"
+solver = "spass"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "run"
+format = "tptp"
+options = []
+'''
+
+
+class PerfCountersTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        with open('p1.p', 'w') as fp:
+            fp.write('cnf(c1,axiom,p(a)).\ncnf(c2,axiom,~p(X)).\n')
+        with open('solver', 'w') as fp:
+            fp.write(SOLVER)
+        os.chmod('solver', os.stat('solver').st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        TestRun.perf_stat = None
+
+    def run_job(self, mode: str):
+        config = Config(config_file='config.toml')
+        config.load_config(config_text=CONFIG.format(mode=mode, directory=self.directory))
+        jobs = config.test_suites[0].jobs()
+        self.assertEqual(len(jobs), 1)
+        result = jobs[0].run(timeout=10)
+        self.assertEqual(result.output.status, SATStatus.SATISFIABLE)
+        return result
+
+    def test_stub_counters_are_recorded(self):
+        counters = self.run_job('stub').execution_statistics.perf_counters
+        self.assertIsNotNone(counters)
+        self.assertEqual(counters.source, 'stub')
+        for counter in (counters.instructions, counters.cycles, counters.cache_misses, counters.branch_misses):
+            self.assertIsInstance(counter, int)
+            self.assertGreater(counter, 0)
+        self.assertAlmostEqual(counters.instructions_per_cycle, 2, places=3)
+        self.assertEqual(counters.not_counted, [])
+
+    def test_unavailable_perf_skips_counters(self):
+        which = shutil.which
+        with mock.patch('shutil.which', side_effect=lambda name, *args, **kwargs:
+                        None if name == 'perf' else which(name, *args, **kwargs)):
+            result = self.run_job('perf')
+        self.assertFalse(TestRun.perf_stat.available)
+        self.assertIsNone(result.execution_statistics.perf_counters)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.benchmark import Benchmark
+from src.config import Config
+from src.plan import Plan
+from src.statistics.stats import SATStatus
+from src.tests import TestInput
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRANSLATOR = '''#!/bin/sh
+cat
+'''
+
+CONFIG = '''[general]
+output_dir = "output.json"
+test_case_timeout = 5
+
+[[translators]]
+from_format = "tptp"
+to_format = "LADR"
+extension = "in"
+executable = "translate"
+PATH = "{directory}"
+options = []
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["*.p"]
+format = "TPTP"
+
+[[testSuites]]
+name = "prover"
+executable = "prover"
+PATH = "{directory}"
+version = "1"
+capture_stdout = false
+options = []
+
+[[testSuites.testRuns]]
+name = "ladr"
+format = "LADR"
+options = []
+
+[[testSuites.testRuns]]
+name = "flattened"
+format = "tptp"
+flatten_includes = true
+options = []
+
+[[testSuites]]
+name = "prover with output"
+executable = "prover"
+PATH = "{directory}"
+version = "1"
+capture_stdout = true
+options = []
+
+[[testSuites.testRuns]]
+name = "ladr"
+format = "LADR"
+options = []
+'''
+
+SOLVER = '''#!/bin/sh
+cat > /dev/null
+echo run >> runs.log
+echo "SPASS beiseite: Proof found."
+'''
+
+ALIAS_CONFIG = '''[general]
+output_dir = "output.json"
+test_case_timeout = 5
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["*.p"]
+format = "TPTP"
+
+[[testInputs]]
+name = "first problem"
+path = "{directory}"
+files = ["p1.*"]
+format = "TPTP"
+
+[[testSuites]]
+name = "prover"
+executable = "solver"
+solver = "spass"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "first"
+format = "tptp"
+options = []
+
+[[testSuites.testRuns]]
+name = "second"
+format = "tptp"
+options = []
+'''
+
+
+def files(directory: str) -> set:
+    return {os.path.join(path, name) for path, _, names in os.walk(directory) for name in names}
+
+
+class PlanTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        for name in ('p1.p', 'p2.p'):
+            with open(name, 'w') as fp:
+                fp.write('cnf(c1,axiom,p(a)).\ncnf(c2,axiom,~p(X)).\n')
+        with open('translate', 'w') as fp:
+            fp.write(TRANSLATOR)
+        os.chmod('translate', os.stat('translate').st_mode | stat.S_IEXEC)
+        with open('config.toml', 'w') as fp:
+            fp.write(CONFIG.format(directory=self.directory))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        TestInput.translators.clear()
+
+    def test_dry_run_creates_no_files(self):
+        before = files(self.directory)
+        process = subprocess.run([sys.executable, os.path.join(ROOT, 'provers_benchmark.py'), '-f', 'config.toml',
+                                  '--dry-run'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertIn('ladr', process.stdout)
+        self.assertEqual(files(self.directory), before)
+
+    def test_jobs_capturing_output_are_not_identical(self):
+        config = Config(config_file='config.toml', read_only=True)
+        config.load_config()
+        plan = Plan.compile(config.test_suites, [5])
+        self.assertEqual(len(plan.jobs), 6)
+        self.assertEqual(plan.aliases, {})
+        self.assertFalse(os.path.exists(TestInput.cache_path))
+
+    def test_identical_jobs_are_run_once(self):
+        with open('solver', 'w') as fp:
+            fp.write(SOLVER)
+        os.chmod('solver', os.stat('solver').st_mode | stat.S_IEXEC)
+        config = Config(config_file='config.toml')
+        config.load_config(config_text=ALIAS_CONFIG.format(directory=self.directory))
+        Benchmark.test_case_timeout = config.test_case_timeout
+        plan = Plan.compile(config.test_suites, [5])
+        # same options in both test runs, p1.p matched by globs of both test inputs
+        self.assertEqual(len(plan.jobs), 6)
+        self.assertEqual(len(plan.aliases), 4)
+
+        statistics = Benchmark(test_suite=config.test_suites, plan=plan, report_interval=None).run()
+        with open('runs.log') as fp:
+            self.assertEqual(len(fp.readlines()), 2)
+        results = [result for test_suite in statistics.test_suites for result in test_suite.test_run]
+        self.assertEqual(len(results), 6)
+        for result in results:
+            self.assertEqual(result.output.status, SATStatus.SATISFIABLE)
+        aliases = [result for result in results if result.alias_of is not None]
+        self.assertEqual(len(aliases), 4)
+        self.assertEqual({result.alias_of for result in aliases}, {'prover/first'})
+        self.assertEqual(sorted(result.name for result in aliases), ['first', 'second', 'second', 'second'])
+
+
+if __name__ == '__main__':
+    unittest.main()
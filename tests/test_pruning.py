@@ -0,0 +1,53 @@
+import re
+import unittest
+from types import SimpleNamespace
+
+from src.pruning import Pruning
+from src.statistics.stats import SATStatus
+
+
+def job(size: int, instance: int) -> SimpleNamespace:
+    return SimpleNamespace(test_input=SimpleNamespace(family=None), original_path=f'family_{size}_{instance}.p',
+                           test_suite=SimpleNamespace(name='suite'), test_run=SimpleNamespace(name='run'),
+                           pruned=lambda timeout: SimpleNamespace(output=SimpleNamespace(status=SATStatus.PRUNED)))
+
+
+def result(status: SATStatus) -> SimpleNamespace:
+    return SimpleNamespace(output=SimpleNamespace(status=status))
+
+
+class PruningTest(unittest.TestCase):
+    def run_family(self, finished, after_timeouts: int = 2) -> bool:
+        """:param finished: (size, status) of finished jobs
+        :return: job of size 200 is pruned
+        """
+        pruning = Pruning(after_timeouts=after_timeouts, pattern=re.compile(r'(?P<family>.*)_(?P<size>\d+)_\d+\.p$'))
+        jobs = [job(size, instance) for instance, (size, _) in enumerate(finished)] + [job(200, 0)]
+        pruning.order(jobs, list(range(len(jobs))))
+        # jobs that started before smaller ones timed out are run
+        for index, (_, status) in enumerate(finished):
+            pruning.record(index, result(status))
+        return pruning.prune(jobs, len(jobs) - 1, timeout=1) is not None
+
+    def test_solved_instance_of_size_keeps_larger_instances(self):
+        finished = [(100, SATStatus.SATISFIABLE), (100, SATStatus.TIMEOUT), (100, SATStatus.UNSATISFIABLE),
+                    (100, SATStatus.TIMEOUT)]
+        self.assertFalse(self.run_family(finished, after_timeouts=1))
+        self.assertFalse(self.run_family(finished, after_timeouts=2))
+
+    def test_sizes_with_all_instances_timed_out_prune_larger_instances(self):
+        finished = [(100, SATStatus.TIMEOUT), (100, SATStatus.TIMEOUT), (150, SATStatus.TIMEOUT),
+                    (150, SATStatus.TIMEOUT)]
+        self.assertTrue(self.run_family(finished, after_timeouts=2))
+        # one size is not enough for two steps
+        self.assertFalse(self.run_family(finished[:2], after_timeouts=2))
+
+    def test_only_largest_smaller_sizes_count(self):
+        finished = [(50, SATStatus.SATISFIABLE), (100, SATStatus.TIMEOUT), (100, SATStatus.TIMEOUT),
+                    (150, SATStatus.SATISFIABLE), (150, SATStatus.TIMEOUT)]
+        self.assertFalse(self.run_family(finished, after_timeouts=1))
+        self.assertTrue(self.run_family(finished[:3], after_timeouts=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.parsers.statistics_parsers.tptp_parser import TPTPParser
+
+
+class CanonicalHashTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def canonical_hash(self, text: str) -> str:
+        path = os.path.join(self.directory, f'{len(os.listdir(self.directory))}.p')
+        with open(path, 'w') as fp:
+            fp.write(text)
+        return TPTPParser.canonical_hash(path)
+
+    def test_swapped_roles_hash_differently(self):
+        self.assertNotEqual(self.canonical_hash('fof(a, axiom, p). fof(c, conjecture, q).'),
+                            self.canonical_hash('fof(a, conjecture, p). fof(c, axiom, q).'))
+        self.assertNotEqual(self.canonical_hash('tff(a, hypothesis, p). tff(c, negated_conjecture, q).'),
+                            self.canonical_hash('tff(a, negated_conjecture, p). tff(c, hypothesis, q).'))
+
+    def test_renamed_and_reordered_problems_hash_equally(self):
+        self.assertEqual(self.canonical_hash('cnf(c1, axiom, p(a)). cnf(c2, axiom, ~p(X) | q(X)).'),
+                         self.canonical_hash('cnf(x, axiom, q(Y) | ~r(Y)). cnf(y, axiom, r(b)).'))
+        self.assertEqual(self.canonical_hash('fof(a, axiom, p). fof(c, conjecture, q).'),
+                         self.canonical_hash('fof(x, conjecture, q). fof(y, axiom, p).'))
+
+
+if __name__ == '__main__':
+    unittest.main()
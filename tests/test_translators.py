@@ -0,0 +1,101 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from src.benchmark import Benchmark
+from src.config import Config
+from src.plan import Plan
+from src.statistics.stats import SATStatus
+from src.tests import TestInput
+
+# writes part of output before it fails
+TRANSLATOR = '''#!/bin/sh
+head -n 1
+exit 1
+'''
+
+SOLVER = '''#!/bin/sh
+cat > /dev/null
+echo run >> runs.log
+echo "Exiting with 1 proof."
+'''
+
+CONFIG = '''[general]
+output_dir = "output.json"
+test_case_timeout = 5
+
+[[translators]]
+from_format = "tptp"
+to_format = "LADR"
+extension = "in"
+executable = "translate"
+PATH = "{directory}"
+options = []
+
+[[testInputs]]
+name = "problems"
+path = "{directory}"
+files = ["*.p"]
+format = "TPTP"
+
+[[testSuites]]
+name = "prover"
+executable = "solver"
+solver = "prover9"
+PATH = "{directory}"
+version = "1"
+options = []
+
+[[testSuites.testRuns]]
+name = "ladr"
+format = "LADR"
+options = []
+'''
+
+
+def executable(name: str, content: str):
+    with open(name, 'w') as fp:
+        fp.write(content)
+    os.chmod(name, os.stat(name).st_mode | stat.S_IEXEC)
+
+
+class TranslatorTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        for name in ('p1.p', 'p2.p'):
+            with open(name, 'w') as fp:
+                fp.write('cnf(c1,axiom,p(a)).\ncnf(c2,axiom,~p(X)).\n')
+        executable('translate', TRANSLATOR)
+        executable('solver', SOLVER)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        TestInput.translators.clear()
+
+    def test_failed_translation(self):
+        config = Config(config_file='config.toml')
+        config.load_config(config_text=CONFIG.format(directory=self.directory))
+        Benchmark.test_case_timeout = config.test_case_timeout
+        plan = Plan.compile(config.test_suites, [5])
+        self.assertEqual(len(plan.jobs), 2)
+
+        statistics = Benchmark(test_suite=config.test_suites, plan=plan, report_interval=None).run()
+        for job in plan.jobs:
+            self.assertFalse(os.path.exists(job.translated_path))
+        self.assertFalse(os.path.exists('runs.log'))
+        results = [result for test_suite in statistics.test_suites for result in test_suite.test_run]
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(result.output.status, SATStatus.ERROR)
+            self.assertEqual(result.output.stderr, 'translation to LADR failed')
+        translations, = statistics.translations
+        self.assertEqual((translations.files, translations.failed), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()